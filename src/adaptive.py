@@ -0,0 +1,303 @@
+import bisect
+import random
+import threading
+from array import array
+from collections import OrderedDict
+
+# Adaptive question selection.
+#
+# Every question in the chosen courses gets a weight from how the student
+# has done on it (unseen and recently missed questions come up more, ones
+# answered right several times in a row less) and how hard everyone finds
+# it. Weights live in a sum tree: a heap-shaped array where each node holds
+# the total weight below it. Picking a question walks from the root to a
+# leaf and changing one weight updates its path to the root, so both are
+# O(log n) however big the bank is.
+#
+# The tree is built once per set of courses from everyone's stats (a
+# SelectionBase, as if the student had seen nothing) and shared by every
+# student. A student's AdaptiveSelector only stores how their own answers
+# change it: the questions they have answered and, for each tree node on
+# the way up from those, the change to its total. So starting a known or a
+# new student's quiz costs O(k log n) for their k answered questions, not a
+# pass over the bank, and a selector's memory grows with k, not n.
+
+MAX_BASES = 8 # Sets of courses whose base trees are kept (one O(n) build each)
+MAX_SELECTORS = 256 # Students' selectors kept between quizzes
+
+UNSEEN_BOOST = 2.0 # Questions the student has never answered
+MISSED_BOOST = 3.0 # Questions the student got wrong last time
+MASTERED_DECAY = 0.3 # Weight factor per correct answer in a row
+MAX_STREAK = 5 # Streaks longer than this don't lower the weight any further
+
+
+def question_weight(user_attempts, user_streak, attempts, correct):
+    # user_attempts / user_streak: this student's answers and current run of
+    # correct ones; attempts / correct: everyone's answers to the question
+    difficulty = 1 - (correct + 1) / (attempts + 2) # 0.5 with no answers yet
+    weight = 0.5 + difficulty
+    if user_attempts == 0:
+        return weight * UNSEEN_BOOST
+    if user_streak == 0:
+        return weight * MISSED_BOOST
+    return weight * MASTERED_DECAY ** min(user_streak, MAX_STREAK)
+
+
+class SumTree:
+    # Weights of n items; leaves start at index `capacity` of `nodes`
+
+    def __init__(self, weights):
+        self.size = len(weights)
+        self.capacity = 1
+        while self.capacity < max(self.size, 1):
+            self.capacity *= 2
+        self.nodes = array("d", bytes(16 * self.capacity)) # 2 * capacity doubles, all 0.0
+        self.nodes[self.capacity:self.capacity + self.size] = array("d", weights)
+        for node in range(self.capacity - 1, 0, -1):
+            self.nodes[node] = self.nodes[2 * node] + self.nodes[2 * node + 1]
+
+    @property
+    def total(self):
+        return self.nodes[1]
+
+    def weight(self, index):
+        return self.nodes[self.capacity + index]
+
+    def update(self, index, weight):
+        node = self.capacity + index
+        change = weight - self.nodes[node]
+        while node >= 1:
+            self.nodes[node] += change
+            node //= 2
+
+    def find(self, value, deltas=None):
+        # Index of the item whose cumulative weight range holds value.
+        # deltas ({node: change}) overlays a student's changes on the tree.
+        nodes = self.nodes
+        node = 1
+        while node < self.capacity:
+            left = 2 * node
+            left_weight, right_weight = nodes[left], nodes[left + 1]
+            if deltas:
+                left_weight += deltas.get(left, 0.0)
+                right_weight += deltas.get(left + 1, 0.0)
+            if value < left_weight or right_weight <= 0:
+                node = left
+            else:
+                value -= left_weight
+                node = left + 1
+        return min(node - self.capacity, self.size - 1)
+
+
+class SelectionBase:
+    # Everyone's answer counts for one set of courses, in qid order, and the
+    # sum tree of the weights a student who has answered none of them sees.
+    # Shared by every student's selector over those courses; `lock` guards
+    # the tree for them all.
+
+    def __init__(self, stats, courses=None):
+        # stats: iterable of (qid, attempts, correct) in ascending qid order
+        self.courses = list(courses) if courses is not None else None
+        self.qids = array("q")
+        self.attempts = array("I")
+        self.correct = array("I")
+        weights = []
+        for qid, attempts, correct in stats:
+            self.qids.append(qid)
+            self.attempts.append(attempts)
+            self.correct.append(correct)
+            weights.append(question_weight(0, 0, attempts, correct))
+        self.tree = SumTree(weights)
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_repository(cls, repo, courses):
+        return cls(repo.selection_base_stats(courses), courses)
+
+    def __len__(self):
+        return len(self.qids)
+
+    def position(self, qid):
+        # Index of qid, by binary search (a qid -> index dict would cost ~150
+        # bytes per question); None if it isn't in these courses
+        index = bisect.bisect_left(self.qids, qid)
+        if index < len(self.qids) and self.qids[index] == qid:
+            return index
+        return None
+
+    def record(self, index, is_correct):
+        # Count one answer from anyone. Caller holds lock.
+        self.attempts[index] += 1
+        self.correct[index] += int(is_correct)
+        self.tree.update(index, question_weight(0, 0, self.attempts[index], self.correct[index]))
+
+
+class AdaptiveSelector:
+    # One student's weights over a SelectionBase: the base tree plus
+    # `deltas`, the change their own answers make to each node's total
+
+    def __init__(self, base, user, history=()):
+        # history: the student's (qid, attempts, streak) rows; ones outside
+        # the base's courses are skipped
+        self.base = base
+        self.user = user
+        self.courses = base.courses # Where the qids come from
+        self.history = {} # index in base -> (attempts, streak), answered questions only
+        self.deltas = {}
+        with base.lock:
+            for qid, attempts, streak in history:
+                index = base.position(qid)
+                if index is not None:
+                    self.history[index] = (attempts, min(streak, MAX_STREAK))
+                    self._set_weight(self.deltas, index, self._question_weight(index))
+
+    @classmethod
+    def from_repository(cls, repo, user, courses):
+        return cls(SelectionBase.from_repository(repo, courses), user, repo.user_history(user))
+
+    def __len__(self):
+        return len(self.base)
+
+    def _node(self, deltas, node):
+        return self.base.tree.nodes[node] + deltas.get(node, 0.0)
+
+    def weight(self, index):
+        return self._node(self.deltas, self.base.tree.capacity + index)
+
+    @property
+    def total(self):
+        return self._node(self.deltas, 1)
+
+    def _question_weight(self, index):
+        attempts, streak = self.history.get(index, (0, 0))
+        return question_weight(attempts, streak, self.base.attempts[index], self.base.correct[index])
+
+    def _set_weight(self, deltas, index, weight):
+        node = self.base.tree.capacity + index
+        change = weight - self._node(deltas, node)
+        while node >= 1:
+            deltas[node] = deltas.get(node, 0.0) + change
+            node //= 2
+
+    def pick(self, n, rng=random):
+        # n distinct qids, each drawn with probability proportional to its
+        # weight. Picked questions are zeroed in a copy of the deltas, so the
+        # selector itself is left as it was.
+        picked = []
+        with self.base.lock:
+            deltas = dict(self.deltas)
+            tree = self.base.tree
+            for _ in range(min(n, len(self.base))):
+                total = self._node(deltas, 1)
+                if total <= 0:
+                    break
+                index = tree.find(rng.random() * total, deltas)
+                picked.append(self.base.qids[index])
+                self._set_weight(deltas, index, 0.0)
+        return picked
+
+    def record(self, qid, is_correct):
+        # Fold one of the student's answers into their weights, after the
+        # base has counted it (SelectorCache.record does both). Caller holds
+        # base.lock.
+        index = self.base.position(qid)
+        if index is None:
+            return
+        attempts, streak = self.history.get(index, (0, 0))
+        self.history[index] = (attempts + 1, min(streak + 1, MAX_STREAK) if is_correct else 0)
+        self._set_weight(self.deltas, index, self._question_weight(index))
+
+
+class RandomSelector:
+    # Anonymous students have no history to adapt to, and must not share
+    # one: their questions come from the plain id sampler
+
+    def __init__(self, repo, courses):
+        self.repo = repo
+        self.courses = list(courses)
+
+    def pick(self, n):
+        return self.repo.question_ids(self.courses, n)
+
+
+class SelectorCache:
+    # Bases (one per set of courses) and students' selectors over them, each
+    # least recently used first. Thread-safe; a Database holds one so that
+    # the repository can find selectors, drop them when questions are added
+    # or deleted, and keep them current as answers are written.
+
+    def __init__(self, max_selectors=MAX_SELECTORS, max_bases=MAX_BASES):
+        self.max_selectors = max_selectors
+        self.max_bases = max_bases
+        self._bases = OrderedDict() # courses -> SelectionBase
+        self._selectors = OrderedDict() # (user, courses) -> AdaptiveSelector
+        self._generation = 0 # Bumped by forget(), to spot builds that raced a write
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _courses_key(courses):
+        return tuple(sorted(set(courses)))
+
+    def cached(self, user, courses):
+        with self._lock:
+            return (user, self._courses_key(courses)) in self._selectors
+
+    def get(self, repo, user, courses):
+        courses = self._courses_key(courses)
+        key = (user, courses)
+        with self._lock:
+            selector = self._selectors.get(key)
+            if selector is not None:
+                self._selectors.move_to_end(key)
+                return selector
+            base = self._bases.get(courses)
+            if base is not None:
+                self._bases.move_to_end(courses)
+            generation = self._generation
+
+        if base is None:
+            base = SelectionBase.from_repository(repo, courses) # O(n), once per set of courses
+        selector = AdaptiveSelector(base, user, repo.user_history(user))
+
+        with self._lock:
+            # A question written meanwhile may have made them stale: use the
+            # selector for this quiz only
+            if generation != self._generation:
+                return selector
+            self._bases[courses] = base
+            self._bases.move_to_end(courses)
+            while len(self._bases) > self.max_bases:
+                self._bases.popitem(last=False)
+            self._selectors[key] = selector
+            while len(self._selectors) > self.max_selectors:
+                self._selectors.popitem(last=False)
+        return selector
+
+    def record(self, answers):
+        # answers: [(user, qid, is_correct), ...] just written to the database
+        with self._lock:
+            bases = {id(base): base for base in self._bases.values()}
+            bases.update((id(selector.base), selector.base) for selector in self._selectors.values())
+            for user, qid, is_correct in answers:
+                for base in bases.values():
+                    index = base.position(qid)
+                    if index is not None:
+                        with base.lock:
+                            base.record(index, is_correct)
+                if user is None:
+                    continue
+                for (selector_user, _), selector in self._selectors.items():
+                    if selector_user == user:
+                        with selector.base.lock:
+                            selector.record(qid, is_correct)
+
+    def forget(self, courses):
+        # Questions were added to or deleted from `courses`: drop every base
+        # and selector that covers one of them
+        courses = set(courses)
+        with self._lock:
+            self._generation += 1
+            for key in [key for key in self._bases if courses.intersection(key)]:
+                del self._bases[key]
+            for key in [key for key in self._selectors if courses.intersection(key[1])]:
+                del self._selectors[key]
@@ -1,12 +1,5 @@
-import sqlite3
-
-COURSES = [
-    "computer_applications",
-    "business_law",
-    "managerial_finance",
-    "database_management",
-    "business_analytics"
-]
+from migrations import migrate
+from quiz_db import COURSES, Database, QuestionRepository
 
 def add_question():
     print("Choose a course to add a question to:")
@@ -31,15 +24,12 @@ def add_question():
         print("Invalid answer. Must be A, B, C, or D.")
         return
 
-    conn = sqlite3.connect("quiz_bowl.db")
-    cursor = conn.cursor()
-    cursor.execute(f"""
-        INSERT INTO {course} (question, option_a, option_b, option_c, option_d, correct_answer)
-        VALUES (?, ?, ?, ?, ?, ?)
-    """, (question, option_a, option_b, option_c, option_d, correct_answer))
-
-    conn.commit()
-    conn.close()
+    db = Database()
+    try:
+        migrate(db.connection) # A new or old-layout database gets the current schema first
+        QuestionRepository(db).add_question(course, (question, option_a, option_b, option_c, option_d, correct_answer))
+    finally:
+        db.close()
     print("Question added successfully.")
 
 if __name__ == "__main__":
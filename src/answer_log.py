@@ -0,0 +1,114 @@
+import sys
+import threading
+import time
+import uuid
+
+# Write-behind log of quiz attempts and answers.
+#
+# Logging an answer only appends to an in-memory buffer, so a click on the
+# Tk thread never waits on SQLite. A background thread writes the buffer
+# out in one transaction when
+#   - FLUSH_INTERVAL seconds have passed since the last write,
+#   - MAX_BUFFERED events are waiting, or
+#   - a quiz ends or the log is closed.
+# Batching keeps each kiosk to about one short write transaction per second
+# instead of one per click, which is what keeps many kiosks sharing one
+# database file from queueing on its write lock (WAL lets readers carry on
+# meanwhile). Committed batches survive a crash; answers still in the buffer
+# (at most FLUSH_INTERVAL seconds' worth) do not. A failed write (e.g. the
+# database stayed locked past busy_timeout) keeps the batch and retries it.
+
+FLUSH_INTERVAL = 1.0 # Seconds
+MAX_BUFFERED = 200 # Events that trigger a write straight away
+RETRY_DELAY = 2.0 # Seconds to wait after a failed write
+CLOSE_ATTEMPTS = 3 # Tries to write what is left when closing
+
+
+class AnswerLog:
+
+    def __init__(self, db, flush_interval=FLUSH_INTERVAL, max_buffered=MAX_BUFFERED, timings=None):
+        self.db = db
+        self.timings = timings # Optional QuizTimings; each batch write counts as "answer_log"
+        self.flush_interval = flush_interval
+        self.max_buffered = max_buffered
+        self.last_error = None
+        self._events = [] # ("start" | "answer" | "finish", row) in the order they happened
+        self._flush_requested = False
+        self._closed = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="answer-log", daemon=True)
+        self._thread.start()
+
+    def start_attempt(self, user, courses, total):
+        # Returns the new attempt's id (made here, so there is no round trip)
+        attempt_id = uuid.uuid4().hex
+        self._add("start", (attempt_id, user, ",".join(courses), time.time(), total))
+        return attempt_id
+
+    def log_answer(self, attempt_id, user, qid, selected, is_correct, response_ms=None):
+        # response_ms: how long the student took to answer, if it was timed
+        self._add("answer", (attempt_id, user, qid, selected, is_correct, time.time(), response_ms))
+
+    def finish_attempt(self, attempt_id, score):
+        self._add("finish", (attempt_id, score, time.time()))
+        self.flush()
+
+    def flush(self):
+        # Ask for a write now without waiting for it
+        with self._cond:
+            self._flush_requested = True
+            self._cond.notify()
+
+    def close(self):
+        # Write everything still buffered, then stop the thread
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+
+    def _add(self, kind, row):
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("The answer log is closed.")
+            self._events.append((kind, row))
+            if len(self._events) >= self.max_buffered:
+                self._cond.notify()
+
+    def _run(self):
+        failures = 0
+        while True:
+            with self._cond:
+                if not (self._closed or self._flush_requested or len(self._events) >= self.max_buffered):
+                    self._cond.wait(self.flush_interval if failures == 0 else RETRY_DELAY)
+                events, self._events = self._events, []
+                self._flush_requested = False
+                closing = self._closed
+
+            if events:
+                try:
+                    self._write(events)
+                    failures = 0
+                except Exception as e:
+                    # Keep the batch, ahead of anything logged since
+                    failures += 1
+                    self.last_error = e
+                    with self._cond:
+                        self._events[:0] = events
+                    if closing and failures >= CLOSE_ATTEMPTS:
+                        print(f"Answer log: could not save {len(events)} events: {e}", file=sys.stderr)
+                        return
+                    if closing:
+                        time.sleep(RETRY_DELAY)
+                    continue
+            if closing:
+                return
+
+    def _write(self, events):
+        started = [row for kind, row in events if kind == "start"]
+        answers = [row for kind, row in events if kind == "answer"]
+        finished = [row for kind, row in events if kind == "finish"]
+        started_at = time.perf_counter()
+        with self.db.pooled() as conn:
+            self.db.repository(conn).write_answer_log(started, answers, finished)
+        if self.timings is not None:
+            self.timings.add("answer_log", time.perf_counter() - started_at)
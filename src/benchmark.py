@@ -0,0 +1,181 @@
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import tempfile
+import time
+
+from migrations import migrate
+from quiz_db import COURSES, Database, QuestionRepository, course_id
+from adaptive import AdaptiveSelector, SelectionBase
+from quiz_engine import QUIZ_LENGTH, QuizEngine, OPTION_LETTERS
+
+# Benchmarks the database paths the app uses, against synthetic question
+# banks of different sizes spread evenly over COURSES, and writes the timings
+# to JSON so runs can be compared across commits.
+#
+# Usage: python benchmark.py [--sizes 1000 100000 1000000] [--repeat 50]
+#                            [--output bench_results.json] [--keep-dbs DIR]
+
+DEFAULT_SIZES = [1_000, 100_000, 1_000_000]
+INSERT_BATCH = 10_000
+
+
+def generate_bank(path, size, seed=1234):
+    # Fill a fresh database with `size` questions spread over all courses
+    rng = random.Random(seed)
+    if os.path.exists(path):
+        os.remove(path)
+    conn = sqlite3.connect(path)
+    migrate(conn)
+
+    words = ["market", "asset", "query", "contract", "index", "ledger", "tort",
+             "regression", "cell", "equity", "table", "liability", "variance"]
+    next_ids = {course_id(course): 0 for course in COURSES}
+    with conn:
+        for start in range(0, size, INSERT_BATCH):
+            batch = []
+            for _ in range(min(INSERT_BATCH, size - start)):
+                c_id = rng.choice(list(next_ids))
+                next_ids[c_id] += 1
+                question = "What is the " + " ".join(rng.choices(words, k=8)) + "?"
+                options = [" ".join(rng.choices(words, k=3)) for _ in OPTION_LETTERS]
+                batch.append((c_id, next_ids[c_id], question, *options, rng.choice(OPTION_LETTERS)))
+            conn.executemany("""
+                INSERT INTO questions (course_id, id, question, option_a, option_b, option_c, option_d, correct_answer)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, batch)
+        conn.executemany(
+            "UPDATE courses SET last_id = ? WHERE id = ?",
+            [(last_id, c_id) for c_id, last_id in next_ids.items()]
+        )
+    conn.close()
+    return next_ids
+
+
+def time_call(fn, repeat):
+    # Run fn `repeat` times, return timing stats in milliseconds
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        "runs": repeat,
+        "mean_ms": round(statistics.fmean(samples), 4),
+        "median_ms": round(statistics.median(samples), 4),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 4),
+        "max_ms": round(samples[-1], 4),
+    }
+
+
+def simulate_session(repo, courses, rng):
+    # One full quiz with random answers, like a student clicking through
+    quiz = QuizEngine.from_repository(repo, courses, QUIZ_LENGTH)
+    while not quiz.finished:
+        quiz.answer(rng.choice(OPTION_LETTERS))
+        quiz.next_question()
+    return quiz.percentage
+
+
+def run_benchmarks(path, last_ids, repeat, seed=99):
+    rng = random.Random(seed)
+    db = Database(path, pool_size=0)
+    repo = QuestionRepository(db)
+    course = COURSES[0]
+    last_id = last_ids[course_id(course)]
+    results = {}
+
+    results["quiz_start_one_course"] = time_call(lambda: repo.sample_questions([course], QUIZ_LENGTH), repeat)
+    results["quiz_start_all_courses"] = time_call(lambda: repo.sample_questions(COURSES, QUIZ_LENGTH), repeat)
+    results["quiz_session_simulated"] = time_call(lambda: simulate_session(repo, COURSES, rng), repeat)
+
+    # Adaptive selection: the shared base is one pass over the courses, made
+    # once per set of courses; a student's selector on top of it only reads
+    # their own history, and every quiz is O(log n) picks plus one fetch
+    results["adaptive_base_all_courses"] = time_call(lambda: SelectionBase.from_repository(repo, COURSES), max(1, repeat // 10))
+    base = SelectionBase.from_repository(repo, COURSES)
+    results["adaptive_new_student"] = time_call(lambda: AdaptiveSelector(base, "bench", repo.user_history("bench")), repeat)
+    selector = AdaptiveSelector(base, "bench", repo.user_history("bench"))
+    results["adaptive_quiz_start"] = time_call(lambda: QuizEngine.from_selector(repo, selector, QUIZ_LENGTH), repeat)
+
+    # Admin lists: first page, a page deep in the bank, a jump to a given id
+    results["list_first_page"] = time_call(lambda: repo.page_questions(course), repeat)
+    results["list_deep_page"] = time_call(lambda: repo.page_questions(course, after_id=last_id * 9 // 10), repeat)
+    results["list_titles_page"] = time_call(lambda: repo.page_question_titles(course, from_id=last_id // 2), repeat)
+
+    # Admin search box (the synthetic bank has a tiny vocabulary, so this is
+    # close to a worst case: most rows match)
+    results["search"] = time_call(lambda: repo.search_questions("tort variance"), repeat)
+
+    # Single-row fetch, as in open_edit_form
+    results["get_question"] = time_call(lambda: repo.get_question(course, rng.randint(1, last_id)), repeat)
+
+    # Writes, as in save_question / save_edited_question / delete_question
+    values = ("Benchmark question?", "a", "b", "c", "d", "A")
+    added = []
+    results["insert"] = time_call(lambda: added.append(repo.add_question(course, values)), repeat)
+    updates = iter(added)
+    results["update"] = time_call(lambda: repo.update_question(course, next(updates), values), repeat)
+    deletes = iter(added)
+    results["delete"] = time_call(lambda: repo.delete_question(course, next(deletes)), repeat)
+
+    db.close()
+    return results
+
+
+def git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark quiz_bowl.db query paths at different bank sizes.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Total questions per synthetic bank")
+    parser.add_argument("--repeat", type=int, default=50, help="Runs per measurement")
+    parser.add_argument("--output", default="bench_results.json", help="Where to write the JSON results")
+    parser.add_argument("--keep-dbs", metavar="DIR", help="Keep the generated databases in DIR instead of a temp dir")
+    args = parser.parse_args()
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "repeat": args.repeat,
+        "sizes": {},
+    }
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_dir = args.keep_dbs or tmp_dir
+        os.makedirs(db_dir, exist_ok=True)
+        for size in args.sizes:
+            path = os.path.join(db_dir, f"bench_{size}.db")
+            print(f"Generating {size:,} questions...")
+            start = time.perf_counter()
+            last_ids = generate_bank(path, size)
+            generate_seconds = time.perf_counter() - start
+
+            print(f"Timing {size:,}...")
+            results = run_benchmarks(path, last_ids, args.repeat)
+            results["generate_seconds"] = round(generate_seconds, 2)
+            report["sizes"][str(size)] = results
+            for name, stats in results.items():
+                if isinstance(stats, dict):
+                    print(f"  {name:<24} median {stats['median_ms']:>9.3f} ms   p95 {stats['p95_ms']:>9.3f} ms")
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
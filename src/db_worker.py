@@ -0,0 +1,120 @@
+import queue
+import sys
+import threading
+
+# How often (ms) the Tk thread checks for finished queries while any are pending
+POLL_MS = 20
+
+
+class DBJob:
+    # Handle for one submitted query. cancel() drops its callbacks. An
+    # interruptible job is also skipped if it hasn't started, or interrupted
+    # if it is running; a non-interruptible one (a write) still runs to the end.
+
+    def __init__(self, fn, on_done, on_error, interruptible):
+        self.fn = fn
+        self.on_done = on_done
+        self.on_error = on_error
+        self.interruptible = interruptible
+        self.cancelled = False
+        self._conn = None # Set while a worker is running this job
+        self._lock = threading.Lock()
+
+    def cancel(self):
+        with self._lock:
+            self.cancelled = True
+            if self.interruptible and self._conn is not None:
+                # Connection.interrupt() is safe to call from another thread
+                self._conn.interrupt()
+
+
+class DBExecutor:
+    # Runs repository calls on worker threads so the Tk mainloop never waits
+    # on SQLite. Results are handed back on the Tk thread by polling a queue
+    # with master.after, so callbacks can touch widgets directly.
+    #
+    #   job = executor.submit(lambda repo: repo.get_question(course, q_id),
+    #                         on_done=show_form, on_error=show_error)
+
+    def __init__(self, master, db, workers=1):
+        self.master = master
+        self.db = db
+        self._jobs = queue.Queue()
+        self._results = queue.Queue()
+        self._pending = 0
+        self._polling = False
+        # One worker keeps jobs in submission order (a write is finished
+        # before the read that refreshes the screen after it)
+        self._threads = [
+            threading.Thread(target=self._worker, name=f"db-worker-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, fn, on_done=None, on_error=None, interruptible=True):
+        # fn(repo) runs on a worker with a repository bound to a pooled
+        # connection (a local Database or a RemoteDatabase, see remote.py). on_done(result) / on_error(exception) run on the Tk thread.
+        # Pass interruptible=False for writes that should finish even if the
+        # screen that asked for them goes away.
+        job = DBJob(fn, on_done, on_error, interruptible)
+        self._pending += 1
+        self._jobs.put(job)
+        if not self._polling:
+            self._polling = True
+            self.master.after(POLL_MS, self._poll)
+        return job
+
+    def shutdown(self, timeout=2.0):
+        for _ in self._threads:
+            self._jobs.put(None)
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def _worker(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            if job.cancelled and job.interruptible:
+                self._results.put((job, None, None))
+                continue
+
+            result, error = None, None
+            with self.db.pooled() as conn:
+                with job._lock:
+                    job._conn = conn
+                try:
+                    result = job.fn(self.db.repository(conn))
+                except Exception as e:
+                    error = e
+                finally:
+                    with job._lock:
+                        job._conn = None
+            self._results.put((job, result, error))
+
+    def _poll(self):
+        try:
+            while True:
+                try:
+                    job, result, error = self._results.get_nowait()
+                except queue.Empty:
+                    break
+                self._pending -= 1
+                if job.cancelled:
+                    if error is not None and not job.interruptible:
+                        # Nobody is left to show it, but a lost write shouldn't be silent
+                        print(f"Database write failed after its screen was closed: {error}", file=sys.stderr)
+                    continue
+                if error is not None:
+                    if job.on_error is None:
+                        raise error
+                    job.on_error(error)
+                elif job.on_done is not None:
+                    job.on_done(result)
+        finally:
+            # Keep polling even if a callback raised (Tk reports the error)
+            if self._pending > 0:
+                self.master.after(POLL_MS, self._poll)
+            else:
+                self._polling = False
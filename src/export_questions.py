@@ -0,0 +1,102 @@
+import argparse
+import csv
+import gzip
+import json
+import os
+import sqlite3
+import sys
+
+from migrations import migrate
+from quiz_db import COURSES, DB_FILE, Database, QuestionRepository
+from import_questions import resolve_course
+
+# Streaming export of the question bank to CSV or JSON Lines, optionally
+# gzip-compressed (.csv.gz / .jsonl.gz). Rows are read from SQLite and written
+# out a chunk at a time, so memory use stays flat however big the bank is.
+# The output uses the same columns import_questions.py reads, so an export
+# can be imported on another machine. It includes each question's per-course
+# id: `import_questions.py --keep-ids` restores the questions under the same
+# ids (updating ones already there), while a plain import renumbers them.
+#
+# Usage: python export_questions.py backup.jsonl.gz [--course "Business Law" ...]
+#                                   [--db quiz_bowl.db]
+
+CHUNK_SIZE = 2000 # Rows fetched from SQLite per round trip
+EXPORT_FIELDS = ["course", "id", "question", "option_a", "option_b", "option_c", "option_d", "correct_answer"]
+
+
+def export_format(path):
+    # ("csv" or "jsonl", compressed?) from the file name
+    name = path.lower()
+    compressed = name.endswith(".gz")
+    if compressed:
+        name = name[:-3]
+    ext = os.path.splitext(name)[1]
+    if ext == ".csv":
+        return "csv", compressed
+    if ext in (".jsonl", ".ndjson"):
+        return "jsonl", compressed
+    raise ValueError(f"Unsupported export type {ext!r}; use .csv, .jsonl, .csv.gz or .jsonl.gz")
+
+
+def export_questions(repo, path, courses=None, chunk_size=CHUNK_SIZE, progress=None):
+    # Write every question of `courses` (default: all) to `path`.
+    # progress(rows_written) is called after each chunk. Returns the row count.
+    fmt, compressed = export_format(path)
+    courses = courses or COURSES
+    opener = gzip.open if compressed else open
+    written = 0
+
+    # Write to a temp file first so a failed export never leaves half a backup
+    tmp_path = path + ".part"
+    try:
+        with opener(tmp_path, "wt", newline="", encoding="utf-8") as f:
+            writer = None
+            if fmt == "csv":
+                writer = csv.writer(f)
+                writer.writerow(EXPORT_FIELDS)
+            for chunk in repo.iter_questions(courses, chunk_size):
+                if fmt == "csv":
+                    writer.writerows(chunk)
+                else:
+                    f.writelines(json.dumps(dict(zip(EXPORT_FIELDS, row)), ensure_ascii=False) + "\n" for row in chunk)
+                written += len(chunk)
+                if progress:
+                    progress(written)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export questions to CSV or JSON Lines (optionally .gz).")
+    parser.add_argument("file", help="Output file (.csv, .jsonl, .csv.gz or .jsonl.gz)")
+    parser.add_argument("--course", action="append", help="Only export this course (can be repeated)")
+    parser.add_argument("--db", default=DB_FILE, help="Database file (default: %(default)s)")
+    args = parser.parse_args()
+
+    courses = None
+    if args.course:
+        courses = [resolve_course(name) for name in args.course]
+        if None in courses:
+            parser.error(f"Unknown course. Choose from: {', '.join(COURSES)}")
+
+    def progress(rows_written):
+        print(f"\r{rows_written:,} questions written", end="", flush=True)
+
+    db = Database(args.db, pool_size=0)
+    try:
+        migrate(db.connection) # A new or old-layout database gets the current schema first
+        count = export_questions(QuestionRepository(db), args.file, courses, progress=progress)
+    except (OSError, ValueError, sqlite3.Error) as e:
+        print(f"Export failed: {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+    print(f"\nExported {count} questions to {args.file}.")
+
+
+if __name__ == "__main__":
+    main()
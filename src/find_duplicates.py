@@ -0,0 +1,61 @@
+import argparse
+import csv
+import sqlite3
+import sys
+
+from migrations import migrate
+from quiz_db import COURSES, DB_FILE, Database, QuestionRepository
+from import_questions import resolve_course
+from similarity import DEFAULT_THRESHOLD
+
+# Report groups of near-duplicate questions in one course, using the
+# MinHash/LSH similarity index (see similarity.py). Questions that are not
+# indexed yet are indexed first, so the first run on a big bank is slower.
+#
+# Usage: python find_duplicates.py "Business Law" [--threshold 0.8]
+#                                  [--db quiz_bowl.db] [--output dupes.csv]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Find near-duplicate questions in a course.")
+    parser.add_argument("course", help="Course to check")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Estimated similarity (0-1) that counts as a duplicate (default: %(default)s)")
+    parser.add_argument("--db", default=DB_FILE, help="Database file (default: %(default)s)")
+    parser.add_argument("--output", help="Write the groups to this CSV file")
+    args = parser.parse_args()
+
+    course = resolve_course(args.course)
+    if course is None:
+        parser.error(f"Unknown course {args.course!r}. Choose from: {', '.join(COURSES)}")
+
+    def progress(text):
+        print(f"\r{text}", end="", flush=True)
+
+    db = Database(args.db, pool_size=0)
+    try:
+        migrate(db.connection) # A new or old-layout database gets the current schema first
+        groups = QuestionRepository(db).find_duplicate_groups(course, args.threshold, progress)
+    except sqlite3.Error as e:
+        print(f"Duplicate check failed: {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+    print()
+
+    if args.output:
+        with open(args.output, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["group", "id", "question"])
+            for number, group in enumerate(groups, start=1):
+                writer.writerows((number, q_id, question) for q_id, question in group)
+    else:
+        for number, group in enumerate(groups, start=1):
+            print(f"Group {number}:")
+            for q_id, question in group:
+                print(f"  {q_id}: {question}")
+    print(f"{len(groups)} groups of near-duplicate questions in {course}.")
+
+
+if __name__ == "__main__":
+    main()
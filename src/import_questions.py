@@ -0,0 +1,248 @@
+import argparse
+import csv
+import gzip
+import json
+import os
+import sqlite3
+import sys
+from collections import namedtuple
+
+from migrations import migrate
+from quiz_db import COURSES, DB_FILE, Database, QuestionRepository, course_table
+
+# Bulk import of questions from CSV, JSON (an array of objects) or JSON Lines,
+# plain or gzip-compressed (e.g. an export from export_questions.py).
+# Every format is streamed, including a .json array (read a chunk at a time,
+# one question object decoded at a time). Rows are validated one by one and
+# inserted with executemany in large transactions; bad rows are reported and
+# skipped, the rest still go in.
+#
+# Expected columns / keys:
+#   course, question, option_a, option_b, option_c, option_d, correct_answer
+# `course` can be left out if a default course is given.
+#
+# By default imported questions are numbered after the course's existing
+# ones and an `id` column is ignored, so importing the same file twice adds
+# its questions twice. With --keep-ids every row needs an `id` (as written by
+# export_questions.py) and is stored under it: a question already there
+# with that course and id is updated in place, keeping its qid and the
+# stats, analytics and quiz packs tied to it. Use this to restore a backup
+# or to sync one lab's bank into another's.
+#
+# Usage: python import_questions.py questions.csv [--course "Business Law"]
+#                                   [--keep-ids] [--db quiz_bowl.db] [--errors errors.csv]
+
+FIELDS = ["question", "option_a", "option_b", "option_c", "option_d", "correct_answer"]
+BATCH_SIZE = 5000 # Rows per transaction
+JSON_CHUNK = 64 * 1024 # Characters read at a time from a .json file
+NUMBER_START = "-0123456789"
+NUMBER_CHARS = "0123456789+-.eE"
+
+ImportReport = namedtuple("ImportReport", ["inserted", "errors"]) # errors: [(row number, message)]
+
+
+def resolve_course(name):
+    # Accept "Business Law", "business law" or "business_law"
+    name = (name or "").strip().lower()
+    for course in COURSES:
+        if name in (course.lower(), course_table(course)):
+            return course
+    return None
+
+
+def validate_id(record):
+    # The row's per-course id for --keep-ids, or raises ValueError
+    value = record.get("id")
+    try:
+        q_id = int(str(value).strip())
+    except ValueError:
+        raise ValueError(f"Missing or invalid id: {value!r} (needed with --keep-ids)") from None
+    if q_id < 1:
+        raise ValueError(f"Invalid id: {value!r} (ids start at 1)")
+    return q_id
+
+
+def validate_row(record, default_course=None):
+    # Returns (course, values) or raises ValueError with a readable message
+    course = resolve_course(record.get("course")) if record.get("course") else default_course
+    if course is None:
+        raise ValueError(f"Unknown or missing course: {record.get('course')!r}")
+
+    values = []
+    for field in FIELDS:
+        value = record.get(field)
+        value = str(value).strip() if value is not None else ""
+        if not value:
+            raise ValueError(f"Missing {field}")
+        values.append(value)
+
+    values[5] = values[5].upper()
+    if values[5] not in ["A", "B", "C", "D"]:
+        raise ValueError(f"Correct answer must be A, B, C, or D (got {values[5]!r})")
+    return course, tuple(values)
+
+
+def iter_json_array(f, chunk_size=JSON_CHUNK):
+    # Yields the elements of the JSON array in `f` one at a time, reading a
+    # chunk at a time rather than the whole file
+    decoder = json.JSONDecoder()
+    buffer, pos, eof = "", 0, False
+
+    def read_more():
+        nonlocal buffer, pos, eof
+        chunk = f.read(chunk_size)
+        eof = not chunk
+        buffer, pos = buffer[pos:] + chunk, 0
+        return not eof
+
+    expect = "start" # then "first", "value" or "separator"
+    while True:
+        while pos < len(buffer) and buffer[pos].isspace():
+            pos += 1
+        if pos == len(buffer):
+            if read_more():
+                continue
+            if expect == "start":
+                raise ValueError("A .json import file must contain a list of questions.")
+            raise ValueError("Invalid JSON: the file ends inside the list of questions")
+        char = buffer[pos]
+        if expect == "start":
+            if char != "[":
+                raise ValueError("A .json import file must contain a list of questions.")
+            pos += 1
+            expect = "first"
+        elif expect == "separator" or (expect == "first" and char == "]"):
+            if char == "]":
+                return
+            if char != ",":
+                raise ValueError(f"Invalid JSON: expected ',' or ']' at {char!r}")
+            pos += 1
+            expect = "value"
+        else:
+            try:
+                value, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError as e:
+                if read_more(): # Probably cut off at the end of the chunk
+                    continue
+                raise ValueError(f"Invalid JSON: {e.msg}") from e
+            if not eof and buffer[pos] in NUMBER_START and not buffer[end:].lstrip(NUMBER_CHARS):
+                read_more() # The number may go on in the next chunk: decode it again
+                continue
+            pos = end
+            expect = "separator"
+            yield value
+
+
+def read_records(path):
+    # Yields (row number, record dict). Every format is streamed.
+    name = path.lower()
+    opener = open
+    if name.endswith(".gz"):
+        name, opener = name[:-3], gzip.open
+    ext = os.path.splitext(name)[1]
+    with opener(path, "rt", newline="", encoding="utf-8-sig") as f:
+        if ext == ".csv":
+            # Row 1 is the header
+            for row_number, record in enumerate(csv.DictReader(f), start=2):
+                yield row_number, record
+        elif ext in (".jsonl", ".ndjson"):
+            for row_number, line in enumerate(f, start=1):
+                if line.strip():
+                    try:
+                        yield row_number, json.loads(line)
+                    except json.JSONDecodeError as e:
+                        yield row_number, ValueError(f"Invalid JSON: {e}")
+        elif ext == ".json":
+            for row_number, record in enumerate(iter_json_array(f), start=1):
+                yield row_number, record
+        else:
+            raise ValueError(f"Unsupported file type {ext!r}; use .csv, .json or .jsonl")
+
+
+def import_file(repo, path, default_course=None, batch_size=BATCH_SIZE, progress=None, keep_ids=False):
+    # Stream `path` into the question bank. progress(rows_read, inserted,
+    # error_count) is called after every batch. keep_ids stores each row
+    # under its `id` (see above). Returns an ImportReport.
+    inserted = 0
+    errors = []
+    batch = []
+    rows_read = 0
+
+    def flush():
+        nonlocal inserted
+        if batch:
+            inserted += repo.upsert_questions(batch) if keep_ids else repo.add_questions(batch)
+            batch.clear()
+        if progress:
+            progress(rows_read, inserted, len(errors))
+
+    for row_number, record in read_records(path):
+        rows_read += 1
+        try:
+            if isinstance(record, Exception):
+                raise record
+            if not isinstance(record, dict):
+                raise ValueError("Expected an object with question fields")
+            course, values = validate_row(record, default_course)
+            batch.append((course, validate_id(record), values) if keep_ids else (course, values))
+        except ValueError as e:
+            errors.append((row_number, str(e)))
+        if len(batch) >= batch_size:
+            flush()
+    flush()
+    return ImportReport(inserted, errors)
+
+
+def write_error_report(errors, path):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["row", "error"])
+        writer.writerows(errors)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import questions from CSV, JSON or JSON Lines.")
+    parser.add_argument("file", help="File to import (.csv, .json or .jsonl, optionally .gz)")
+    parser.add_argument("--course", help="Course for rows that don't name one")
+    parser.add_argument("--keep-ids", action="store_true",
+                        help="Store each row under its exported id, updating questions that already have it")
+    parser.add_argument("--db", default=DB_FILE, help="Database file (default: %(default)s)")
+    parser.add_argument("--errors", help="Write rejected rows to this CSV file")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Rows per transaction")
+    args = parser.parse_args()
+
+    default_course = None
+    if args.course:
+        default_course = resolve_course(args.course)
+        if default_course is None:
+            parser.error(f"Unknown course {args.course!r}. Choose from: {', '.join(COURSES)}")
+
+    def progress(rows_read, inserted, error_count):
+        print(f"\r{rows_read:,} rows read, {inserted:,} imported, {error_count:,} rejected", end="", flush=True)
+
+    db = Database(args.db, pool_size=0)
+    try:
+        migrate(db.connection) # A new or old-layout database gets the current schema first
+        report = import_file(QuestionRepository(db), args.file, default_course, args.batch_size, progress,
+                             keep_ids=args.keep_ids)
+    except (OSError, ValueError, sqlite3.Error) as e:
+        print(f"Import failed: {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+    print()
+
+    if report.errors:
+        if args.errors:
+            write_error_report(report.errors, args.errors)
+            print(f"{len(report.errors)} rows rejected, see {args.errors}")
+        else:
+            for row_number, message in report.errors[:20]:
+                print(f"  row {row_number}: {message}")
+            if len(report.errors) > 20:
+                print(f"  ... and {len(report.errors) - 20} more (use --errors to save them all)")
+    print(f"Imported {report.inserted} questions.")
+
+
+if __name__ == "__main__":
+    main()
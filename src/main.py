@@ -1,17 +1,27 @@
+import time
+STARTED = time.perf_counter() # For --profile-startup
+
+import argparse
+import math
+import queue
 import tkinter as tk
 from tkinter import messagebox, ttk # ttk is already imported, good!
-import sqlite3
-import random
-
-# Constants for Database and Design
-DB_FILE = "quiz_bowl.db"
-COURSES = [
-    "Computer Applications",
-    "Business Law",
-    "Managerial Finance",
-    "Database Management",
-    "Business Analytics"
-]
+
+# Only what the main menu needs is imported up front. Admin tools (import,
+# export, file dialogs, virtual lists), buzzer matches and client mode are
+# imported by the screens that use them, to keep cold start short.
+from adaptive import SelectorCache
+from answer_log import AnswerLog
+from db_worker import DBExecutor
+from question_cache import QuestionCache
+from quiz_engine import OPTION_LETTERS, QUIZ_LENGTH, QuizEngine
+from quiz_db import DB_FILE, COURSES, RESPONSE_TIME_BUCKETS_MS, Database
+from migrations import migrate
+from scheduler import QuizScheduler
+from startup_profile import StartupProfiler
+from quiz_timings import QuizTimings
+
+# Constants for Design
 COLORS = {
     "bg": "#e8f0fe",
     "accent": "#008080", # Teal
@@ -33,10 +43,43 @@ FONTS = {
 }
 
 ADMIN_PASSWORD = "jimmyjenkins"
+# Fixed row heights (pixels) for the virtualized admin lists
+EDIT_ROW_HEIGHT = 80
+VIEW_ROW_HEIGHT = 200
+# Buzzer key for each player slot in a match
+BUZZER_KEYS = ["q", "p", "z", "m"]
+# How often (ms) the match screen picks up network buzzes
+BUZZ_POLL_MS = 10
+# Quiz pacing choices on the course selector: label -> seconds / milliseconds
+TIME_LIMITS = {"No limit": None, "10 s": 10, "20 s": 20, "30 s": 30, "60 s": 60}
+FEEDBACK_DELAYS = {"1 s": 1000, "2 s": 2000, "3 s": 3000, "5 s": 5000}
+COUNTDOWN_WARNING = 5 # Seconds left when the countdown turns red
+# Pauses (ms) on the match screen after an answer, and before a rebound
+MATCH_FEEDBACK_MS = 2000
+REBOUND_DELAY_MS = 1000
+ANALYTICS_BAR_WIDTH = 300 # Pixels for a full (100%) bar on the analytics screen
 
 class QuizApp:
-    def __init__(self, master):
+    def __init__(self, master, db=None, check_schema=True, profiler=None, quiz_pack=None, timings=None):
         self.master = master
+        # QuizPack every quiz comes from (exam days), instead of the question bank
+        self.quiz_pack = quiz_pack
+        self.pack_locked = quiz_pack is not None # Opened with --pack: students can't switch back
+        # Startup timings; a disabled profiler does nothing
+        self.profiler = profiler if profiler is not None else StartupProfiler(enabled=False)
+        # Quiz hot path timings, always recorded; dumped only if given a file
+        self.timings = timings if timings is not None else QuizTimings()
+        self.startup_pending = {"first frame", "background"} # Reported once both are done
+        db = db if db is not None else Database(DB_FILE, cache=QuestionCache())
+        self.db = db
+        # All queries run on a background worker so the window never freezes
+        self.db_executor = DBExecutor(self.master, db)
+        # Every screen timer goes through the scheduler, so leaving a screen
+        # cancels them all in one go
+        self.scheduler = QuizScheduler(self.master)
+        # Attempts and answers are buffered and written in batches
+        self.answer_log = AnswerLog(db, timings=self.timings)
+        self.profiler.mark("workers started")
         self.master.title("Quiz Bowl")
         self.master.geometry("600x600") # Set initial size
         # Don't configure master bg directly, use a main frame
@@ -59,7 +102,6 @@ class QuizApp:
         self.style.configure("TFrame", background=COLORS["bg"])
         self.style.configure("Header.TLabel", font=FONTS["header"], foreground=COLORS["text"], background=COLORS["bg"], padding=(0, 10, 0, 10)) # top, right, bottom, left
         self.style.configure("Body.TLabel", font=FONTS["body"], foreground=COLORS["text"], background=COLORS["bg"], padding=(5, 5))
-        self.style.configure("Feedback.TLabel", font=FONTS["feedback"], background=COLORS["bg"], padding=(10, 10))
 
         # Button Styles (Background might be tricky with themes, foreground/font more reliable)
         self.style.configure("TButton", font=FONTS["button"], padding=(10, 5), relief="flat", borderwidth=0)
@@ -73,22 +115,10 @@ class QuizApp:
                        foreground=[('!active', 'white'), ('active', 'white')],
                        background=[('!active', COLORS["button_accent"]), ('active', COLORS["button_accent_hover"])])
 
-        # Checkbutton Style
-        self.style.configure("TCheckbutton", font=FONTS["body"], foreground=COLORS["text"], background=COLORS["bg"], padding=(5, 5))
-        self.style.map("TCheckbutton",
-                       indicatorcolor=[('selected', COLORS["accent"]), ('!selected', COLORS["text"])])
-
-
-        # Entry Style
-        self.style.configure("TEntry", font=FONTS["body"], padding=(5, 5), fieldbackground=COLORS["entry_bg"])
-
-        # Combobox Style (ensure dropdown list uses theme colors too)
-        self.style.configure("TCombobox", font=FONTS["body"], padding=(5,5), fieldbackground=COLORS["entry_bg"])
-        # This makes the dropdown list background consistent
-        self.master.option_add('*TCombobox*Listbox.background', COLORS["entry_bg"])
-        self.master.option_add('*TCombobox*Listbox.foreground', COLORS["text"])
-        self.master.option_add('*TCombobox*Listbox.selectBackground', COLORS["accent"])
-        self.master.option_add('*TCombobox*Listbox.selectForeground', 'white')
+        # Other styles (checkbuttons, entries, comboboxes, feedback) are
+        # configured by use_styles when a screen first needs them
+        self.configured_styles = set()
+        self.profiler.mark("base styles")
 
 
         # --- Main Frame ---
@@ -97,9 +127,25 @@ class QuizApp:
 
         # --- App State ---
         self.course = None
-        self.questions = []
-        self.current_question = 0
-        self.score = 0
+        self.quiz = None # QuizEngine for the quiz in progress (selection, scoring, progression)
+        self.student_name = tk.StringVar() # Optional, so answers count towards the student's own history
+        self.quiz_user = None # Student name the current quiz's answers are logged under
+        self.attempt_id = None # AnswerLog id of the quiz in progress
+        self.time_limit_var = tk.StringVar(value="No limit") # Per-question countdown (TIME_LIMITS key)
+        self.feedback_delay_var = tk.StringVar(value="2 s") # Pause after each answer (FEEDBACK_DELAYS key)
+        self.question_timer = None # Scheduler countdown for the question on screen
+        self.question_shown_at = None # time.monotonic() when the question appeared (moved on by pauses)
+        self.paused_at = None
+        self.next_requested_at = None # When Next was pressed, until the next question is drawn
+        self.countdown_label = None
+        self.countdown_shown = None # Whole seconds the countdown label shows now
+        self.pause_button = None
+        self.match = None # BuzzerMatch in progress
+        self.match_timer = None # Pending move to the next question or rebound, cancelled by Skip
+        self.match_widgets = {}
+        self.buzzer_keys = {} # key -> player
+        self.buzzer_listener = None # BuzzerListener when network buzzers are on
+        self.network_buzzes = queue.Queue() # Won buzzes from the listener thread
         self.answer_buttons = []
         self.selected_courses = []
         self.course_vars = {}
@@ -110,19 +156,97 @@ class QuizApp:
         self.view_course_var = tk.StringVar() # Renamed from self.course_var
         self.password_entry = None
         self.feedback_label = None
+        self.question_header_label = None # Quiz screen widgets, built once per quiz
+        self.question_label = None
         self.scrollable_content_frame = None # To hold widgets in scrollable areas
+        self.search_results_frame = None # Admin search screen results area
+        self.edit_page_from = None # First ID on the current admin list pages, to come back to them
+        self.search_text = "" # Last admin search, kept when coming back to the search screen
+        self.view_page_from = None
+        self.pending_query = None # Query the current screen is waiting on
+        self.loading_label = None
 
         self.show_main_menu()
+        self.profiler.mark("main menu built")
+        self.master.bind("<Map>", self.on_first_map)
+
+        # With the menu up, the DB worker checks the schema; a quiz started
+        # meanwhile waits for it. The question cache is not warmed here: each
+        # course is loaded the first time a quiz or match uses it, so startup
+        # doesn't read every bank or hold up the first quiz's query.
+        if check_schema:
+            self.db_executor.submit(self.check_schema, on_done=lambda _: self.startup_step_done("background"),
+                                    on_error=self.on_schema_error, interruptible=False)
+        else:
+            self.startup_pending.discard("background")
+
+    def check_schema(self, repo):
+        # Runs on the DB worker: applies any schema migrations this database
+        # hasn't had yet (a single PRAGMA read when it is current)
+        started = time.perf_counter()
+        migrate(repo.conn)
+        self.profiler.background("schema check", started)
+
+    def on_schema_error(self, e):
+        self.startup_step_done("background")
+        messagebox.showerror("Database Error", f"Could not prepare the database: {e}", parent=self.master)
+
+    def on_first_map(self, event):
+        # The main window has been drawn for the first time
+        if event.widget is self.master:
+            self.master.unbind("<Map>")
+            self.profiler.mark("first frame drawn")
+            self.startup_step_done("first frame")
+
+    def startup_step_done(self, step):
+        self.startup_pending.discard(step)
+        if not self.startup_pending:
+            self.profiler.report()
+
+    def use_styles(self, *names):
+        # Configure ttk styles the first time a screen uses them, so startup
+        # only pays for the main menu's
+        for name in names:
+            if name in self.configured_styles:
+                continue
+            self.configured_styles.add(name)
+            if name == "Feedback.TLabel":
+                self.style.configure("Feedback.TLabel", font=FONTS["feedback"], background=COLORS["bg"], padding=(10, 10))
+            elif name == "TCheckbutton":
+                self.style.configure("TCheckbutton", font=FONTS["body"], foreground=COLORS["text"], background=COLORS["bg"], padding=(5, 5))
+                self.style.map("TCheckbutton",
+                               indicatorcolor=[('selected', COLORS["accent"]), ('!selected', COLORS["text"])])
+            elif name == "TEntry":
+                self.style.configure("TEntry", font=FONTS["body"], padding=(5, 5), fieldbackground=COLORS["entry_bg"])
+            elif name == "TCombobox":
+                # Combobox Style (ensure dropdown list uses theme colors too)
+                self.style.configure("TCombobox", font=FONTS["body"], padding=(5,5), fieldbackground=COLORS["entry_bg"])
+                # This makes the dropdown list background consistent
+                self.master.option_add('*TCombobox*Listbox.background', COLORS["entry_bg"])
+                self.master.option_add('*TCombobox*Listbox.foreground', COLORS["text"])
+                self.master.option_add('*TCombobox*Listbox.selectBackground', COLORS["accent"])
+                self.master.option_add('*TCombobox*Listbox.selectForeground', 'white')
 
 
     def clear_window(self):
+        # Leaving a screen cancels whatever query and timers it was still waiting on
+        self.cancel_pending_query()
+        self.scheduler.cancel_all()
+        self.question_timer = None
+        self.stop_match_input()
         # Destroy widgets inside the main_frame, not the main_frame itself
         for widget in self.main_frame.winfo_children():
             widget.destroy()
         # Reset references that might be stale
         self.answer_buttons = []
         self.feedback_label = None
+        self.question_header_label = None
+        self.question_label = None
+        self.countdown_label = None
+        self.pause_button = None
         self.scrollable_content_frame = None
+        self.loading_label = None
+        self.search_results_frame = None
 
 
     def show_main_menu(self):
@@ -134,89 +258,155 @@ class QuizApp:
 
         ttk.Button(self.main_frame, text="Take a Quiz!", command=self.show_quiz_selector, style="TButton").pack(pady=10)
 
+        ttk.Button(self.main_frame, text="Buzzer Match", command=self.show_match_setup, style="TButton").pack(pady=10)
+
     def show_quiz_selector(self):
         self.clear_window()
-
-        ttk.Label(self.main_frame, text="Choose Course Categories", style="Header.TLabel").pack(pady=20)
+        self.use_styles("TCheckbutton", "TEntry", "TCombobox")
 
         self.selected_courses = [] # Reset just in case
         self.course_vars = {}
 
-        # Frame to hold checkbuttons for better alignment
-        check_frame = ttk.Frame(self.main_frame, style="TFrame")
-        check_frame.pack(pady=10)
-
-        for course in COURSES:
-            var = tk.IntVar()
-            # Use anchor='w' and pack within the check_frame
-            chk = ttk.Checkbutton(check_frame, text=course, variable=var, style="TCheckbutton")
-            chk.pack(anchor='w', padx=40, pady=2) # Add a little vertical padding
-            self.course_vars[course] = var
+        if self.quiz_pack is not None:
+            # The questions are fixed by the pack
+            ttk.Label(self.main_frame, text=f"Quiz Pack: {self.quiz_pack.name}", style="Header.TLabel", wraplength=550).pack(pady=20)
+            ttk.Label(self.main_frame, text=f"{len(self.quiz_pack)} questions", style="Body.TLabel").pack(pady=10)
+        else:
+            ttk.Label(self.main_frame, text="Choose Course Categories", style="Header.TLabel").pack(pady=20)
+
+            # Frame to hold checkbuttons for better alignment
+            check_frame = ttk.Frame(self.main_frame, style="TFrame")
+            check_frame.pack(pady=10)
+
+            for course in COURSES:
+                var = tk.IntVar()
+                # Use anchor='w' and pack within the check_frame
+                chk = ttk.Checkbutton(check_frame, text=course, variable=var, style="TCheckbutton")
+                chk.pack(anchor='w', padx=40, pady=2) # Add a little vertical padding
+                self.course_vars[course] = var
+
+        # Questions are picked by how this student has done before
+        name_frame = ttk.Frame(self.main_frame, style="TFrame")
+        name_frame.pack(pady=5)
+        ttk.Label(name_frame, text="Your name (optional):", style="Body.TLabel").pack(side=tk.LEFT, padx=5)
+        ttk.Entry(name_frame, textvariable=self.student_name, style="TEntry", width=20).pack(side=tk.LEFT, padx=5)
+
+        # Pacing: optional time limit per question and the pause after each answer
+        pace_frame = ttk.Frame(self.main_frame, style="TFrame")
+        pace_frame.pack(pady=5)
+        ttk.Label(pace_frame, text="Time per question:", style="Body.TLabel").grid(row=0, column=0, sticky="w")
+        ttk.Combobox(pace_frame, textvariable=self.time_limit_var, values=list(TIME_LIMITS),
+                     state="readonly", width=10, style="TCombobox").grid(row=0, column=1, padx=5, pady=2)
+        ttk.Label(pace_frame, text="Pause after answer:", style="Body.TLabel").grid(row=1, column=0, sticky="w")
+        ttk.Combobox(pace_frame, textvariable=self.feedback_delay_var, values=list(FEEDBACK_DELAYS),
+                     state="readonly", width=10, style="TCombobox").grid(row=1, column=1, padx=5, pady=2)
 
         ttk.Button(self.main_frame, text="Start Quiz", command=self.start_quiz, style="TButton").pack(pady=20)
 
+        if self.quiz_pack is None:
+            ttk.Button(self.main_frame, text="Open Quiz Pack...", command=self.open_quiz_pack, style="TButton").pack(pady=5)
+        elif not self.pack_locked:
+            ttk.Button(self.main_frame, text="Use the Question Bank", command=self.close_quiz_pack, style="TButton").pack(pady=5)
+
         ttk.Button(self.main_frame, text="Back to Main Menu", command=self.show_main_menu, style="Accent.TButton").pack(pady=10)
 
+    def open_quiz_pack(self):
+        from tkinter import filedialog
+        from quiz_pack import QuizPack, QuizPackError, pack_key
+        path = filedialog.askopenfilename(
+            parent=self.master, title="Open Quiz Pack",
+            filetypes=[("Quiz packs", "*.qpack"), ("All files", "*.*")]
+        )
+        if not path:
+            return
+        try:
+            # Checks the pack's checksum; questions are read from it as needed
+            self.quiz_pack = QuizPack(path, key=pack_key())
+        except (OSError, QuizPackError) as e:
+            messagebox.showerror("Quiz Pack", str(e), parent=self.master)
+            return
+        self.show_quiz_selector()
+
+    def close_quiz_pack(self):
+        self.quiz_pack.close()
+        self.quiz_pack = None
+        self.show_quiz_selector()
+
+    def start_pack_quiz(self):
+        # No queries at all: the engine reads questions straight from the
+        # memory-mapped pack. Answers are still logged under the pack's qids.
+        pack = self.quiz_pack
+        self.selected_courses = list(pack.courses)
+        self.begin_quiz(QuizEngine(pack, qids=pack.qids), self.student_name.get().strip() or None)
+
     def start_quiz(self):
+        if self.quiz_pack is not None:
+            self.start_pack_quiz()
+            return
         self.selected_courses = [c for c, v in self.course_vars.items() if v.get() == 1]
-        self.questions = []
+        self.quiz = None
 
         if not self.selected_courses:
             messagebox.showwarning("No Selection", "Please select at least one course.", parent=self.master) # Add parent
             return
 
-        try:
-            conn = sqlite3.connect(DB_FILE)
-            cursor = conn.cursor()
-            for course in self.selected_courses:
-                table = course.replace(" ", "_").lower()
-                cursor.execute(f"SELECT question, option_a, option_b, option_c, option_d, correct_answer FROM {table}")
-                self.questions.extend(cursor.fetchall())
-            conn.close()
-        except sqlite3.Error as e:
+        def on_error(e):
              messagebox.showerror("Database Error", f"Failed to load questions: {e}", parent=self.master)
              self.show_main_menu() # Go back if DB fails
-             return
 
+        # Named students get an adaptive selector, kept by the database's
+        # SelectorCache between quizzes: it shares one tree per set of courses
+        # and adds only the student's own history, so starting a quiz costs
+        # O(k log n) for their k answered questions. The picked rows come
+        # from the question cache. Anonymous students get a plain random quiz.
+        courses = list(self.selected_courses)
+        user = self.student_name.get().strip() or None
+
+        def load(repo):
+            return QuizEngine.from_selector(repo, repo.adaptive_selector(user, courses), QUIZ_LENGTH)
+
+        def on_done(quiz):
+            self.begin_quiz(quiz, user)
 
-        random.shuffle(self.questions)
-        self.questions = self.questions[:10] # Limit to 10 questions
+        self.show_loading("Loading questions...")
+        self.run_query(load, on_done, on_error)
 
-        if not self.questions:
+    def begin_quiz(self, quiz, user):
+        self.quiz = quiz
+        self.quiz_user = user
+        if not self.quiz.questions:
             messagebox.showinfo("No Questions", "No questions available in the selected courses.", parent=self.master)
             self.show_quiz_selector() # Go back to selection
             return
 
-        self.current_question = 0
-        self.score = 0
+        self.attempt_id = self.answer_log.start_attempt(user, self.selected_courses, self.quiz.total)
+        with self.timings.timed("quiz_screen"):
+            self.build_quiz_screen() # Fresh quiz screen for each quiz
         self.show_question()
 
-    def show_question(self):
+    def build_quiz_screen(self):
+        # Create the quiz screen once per quiz; show_question only updates it
         self.clear_window()
-        self.answer_buttons = []  # Reset buttons list each question
-
-        if not self.questions or self.current_question >= len(self.questions):
-             messagebox.showerror("Error", "Could not load question.", parent=self.master)
-             self.show_main_menu()
-             return
-
-        question_data = self.questions[self.current_question]
-        question, a, b, c, d, correct = question_data # correct is 'A', 'B', 'C', or 'D'
+        self.use_styles("Feedback.TLabel")
+        self.answer_buttons = []
 
-        ttk.Label(self.main_frame, text=f"Question {self.current_question + 1}/{len(self.questions)}", style="Header.TLabel").pack(pady=10)
+        self.question_header_label = ttk.Label(self.main_frame, style="Header.TLabel")
+        self.question_header_label.pack(pady=10)
+        # Only shown in timed mode
+        self.countdown_label = ttk.Label(self.main_frame, text="", style="Feedback.TLabel")
+        self.countdown_label.pack()
         # Use wraplength for long questions
-        ttk.Label(self.main_frame, text=question, wraplength=550, style="Body.TLabel", justify=tk.CENTER).pack(pady=10, padx=10)
+        self.question_label = ttk.Label(self.main_frame, wraplength=550, style="Body.TLabel", justify=tk.CENTER)
+        self.question_label.pack(pady=10, padx=10)
 
         # Frame for answer buttons
         button_frame = ttk.Frame(self.main_frame, style="TFrame")
         button_frame.pack(pady=10)
 
-        options = { 'A': a, 'B': b, 'C': c, 'D': d }
-        for value, text in options.items():
+        for value in ['A', 'B', 'C', 'D']:
             # Create button, assign command with lambda to capture current 'value'
             btn = ttk.Button(
                 button_frame,
-                text=f"{value}. {text}",
                 command=lambda v=value: self.check_answer(v),
                 style="TButton",
                 width=40 # Make buttons roughly same width
@@ -228,34 +418,124 @@ class QuizApp:
         self.feedback_label = ttk.Label(self.main_frame, text="", style="Feedback.TLabel")
         self.feedback_label.pack(pady=10)
 
-        ttk.Button(self.main_frame, text="Back to Main Menu", command=self.show_main_menu, style="Accent.TButton").pack(pady=15)
+        control_frame = ttk.Frame(self.main_frame, style="TFrame")
+        control_frame.pack(pady=15)
+        self.pause_button = ttk.Button(control_frame, text="Pause", command=self.toggle_pause, style="TButton")
+        self.pause_button.pack(side=tk.LEFT, padx=5)
+        ttk.Button(control_frame, text="Back to Main Menu", command=self.show_main_menu, style="Accent.TButton").pack(side=tk.LEFT, padx=5)
 
+    def show_question(self):
+        if not self.quiz or self.quiz.finished:
+             messagebox.showerror("Error", "Could not load question.", parent=self.master)
+             self.show_main_menu()
+             return
 
-    def check_answer(self, selected_answer):
-        # Disable all answer buttons immediately
+        started = self.timings.now()
+        if self.question_label is None:
+            self.build_quiz_screen()
+
+        # Reuse the existing widgets, only their text and state change
+        self.question_header_label.config(text=f"Question {self.quiz.question_number}/{self.quiz.total}")
+        self.question_label.config(text=self.quiz.question[0])
+        for btn, (value, text) in zip(self.answer_buttons, self.quiz.options()):
+            btn.config(text=f"{value}. {text}", state="normal")
+        self.feedback_label.config(text="")
+        qid = self.quiz.question_id
+        self.timings.record("widgets", started, qid)
+        # Idle callbacks run after Tk's pending redraws, so this is when the
+        # question is actually on screen
+        self.master.after_idle(lambda: self.question_rendered(started, qid))
+        self.question_shown_at = time.monotonic()
+
+        time_limit = TIME_LIMITS.get(self.time_limit_var.get())
+        if time_limit:
+            self.countdown_shown = None
+            self.question_timer = self.scheduler.countdown(time_limit, self.update_countdown, self.time_up)
+        else:
+            self.countdown_label.config(text="")
+
+    def question_rendered(self, started, qid):
+        self.timings.record("render", started, qid)
+        if self.next_requested_at is not None:
+            self.timings.record("next_question", self.next_requested_at, qid)
+            self.next_requested_at = None
+
+    def update_countdown(self, remaining):
+        # Called every scheduler frame; the label only changes once a second
+        seconds = math.ceil(remaining)
+        if seconds != self.countdown_shown and self.countdown_label is not None:
+            self.countdown_shown = seconds
+            color = COLORS["incorrect"] if seconds <= COUNTDOWN_WARNING else COLORS["text"]
+            self.countdown_label.config(text=f"⏱ {seconds} s", foreground=color)
+
+    def time_up(self):
+        # Out of time counts as a wrong answer (logged with no option picked)
+        self.question_timer = None
+        self.update_countdown(0)
         for btn in self.answer_buttons:
             btn.config(state="disabled")
+        self.timings.mark("time_up", self.quiz.question_id)
+        result = self.quiz.answer(None)
+        self.record_answer(self.quiz.question_id, "", result.is_correct)
+        self.give_feedback(result, timed_out=True)
+
+    def toggle_pause(self):
+        # Freezes the countdown and the pause after an answer; the answer
+        # buttons are off while paused
+        if self.scheduler.paused:
+            self.scheduler.resume()
+            # Time spent paused doesn't count towards the response time
+            self.question_shown_at += time.monotonic() - self.paused_at
+            self.pause_button.config(text="Pause")
+            if not self.quiz.answered:
+                for btn in self.answer_buttons:
+                    btn.config(state="normal")
+        else:
+            self.scheduler.pause()
+            self.paused_at = time.monotonic()
+            self.pause_button.config(text="Resume")
+            for btn in self.answer_buttons:
+                btn.config(state="disabled")
 
-        correct_answer = self.questions[self.current_question][5] # This is 'A', 'B', 'C', or 'D'
-        is_correct = (selected_answer == correct_answer)
 
-        if is_correct:
-            self.score += 1
+    def check_answer(self, selected_answer):
+        if self.quiz is None or self.quiz.answered or self.scheduler.paused:
+            return
+        clicked = self.timings.mark("answer_clicked", self.quiz.question_id)
+        self.scheduler.cancel(self.question_timer)
+        self.question_timer = None
+        # Disable all answer buttons immediately
+        for btn in self.answer_buttons:
+            btn.config(state="disabled")
 
-        self.give_feedback(is_correct, correct_answer)
+        # Scoring lives in the engine
+        result = self.quiz.answer(selected_answer)
+        response_ms = round((time.monotonic() - self.question_shown_at) * 1000)
+        self.record_answer(self.quiz.question_id, selected_answer, result.is_correct, response_ms)
+        self.give_feedback(result)
+        qid = self.quiz.question_id
+        self.master.after_idle(lambda: self.timings.record("feedback", clicked, qid))
+
+    def record_answer(self, qid, selected_answer, is_correct, response_ms=None):
+        # The answer, the stats tables and the student's selector are updated
+        # later in a batch by the answer log (at the latest when the quiz
+        # ends). Timeouts have no response time (they are counted on their own).
+        if qid is None:
+            return
+        self.answer_log.log_answer(self.attempt_id, self.quiz_user, qid, selected_answer, is_correct, response_ms)
 
 
-    def give_feedback(self, is_correct, correct_answer):
+    def give_feedback(self, result, timed_out=False):
         if self.feedback_label: # Ensure label exists
-            if is_correct:
+            if result.is_correct:
                 feedback_text = "✅ Correct!"
                 feedback_color = COLORS["correct"]
+            elif timed_out:
+                feedback_text = f"⏰ Time's up! The correct answer was {result.correct_answer}. {result.correct_text}"
+                feedback_color = COLORS["incorrect"]
             else:
-                # Find the full text of the correct option
-                question_data = self.questions[self.current_question]
-                options = {'A': question_data[1], 'B': question_data[2], 'C': question_data[3], 'D': question_data[4]}
-                correct_option_text = options.get(correct_answer, "N/A")
-                feedback_text = f"❌ Incorrect. The correct answer was {correct_answer}. {correct_option_text}"
+                # Show the full text of the correct option
+                feedback_text = f"❌ Incorrect. The correct answer was {result.correct_answer}. {result.correct_text}"
                 feedback_color = COLORS["incorrect"]
 
             self.feedback_label.config(text=feedback_text, foreground=feedback_color, wraplength=550) # Use wraplength here too
@@ -265,31 +545,268 @@ class QuizApp:
             # self.style.configure("Incorrect.Feedback.TLabel", foreground=COLORS["incorrect"])
             # self.feedback_label.config(style="Correct.Feedback.TLabel" if is_correct else "Incorrect.Feedback.TLabel")
 
-        # Pause for 1.5 seconds before going to the next question
-        self.master.after(2000, self.next_question) # Increased delay slightly
+        # Pause before the next question; the scheduler drops this if the
+        # quiz screen is left first
+        self.scheduler.after(FEEDBACK_DELAYS.get(self.feedback_delay_var.get(), 2000), self.next_question)
 
     def next_question(self):
-        self.current_question += 1
-        if self.current_question >= len(self.questions):
+        self.next_requested_at = self.timings.now()
+        if not self.quiz.next_question():
             self.show_score()
         else:
             self.show_question()
 
     def show_score(self):
+        self.next_requested_at = None
+        self.answer_log.finish_attempt(self.attempt_id, self.quiz.score)
+        self.timings.dump()
         self.clear_window()
         ttk.Label(self.main_frame, text="Quiz Complete!", style="Header.TLabel").pack(pady=20)
-        ttk.Label(self.main_frame, text=f"Your Final Score: {self.score}/{len(self.questions)}", style="Body.TLabel").pack(pady=10)
+        ttk.Label(self.main_frame, text=f"Your Final Score: {self.quiz.score}/{self.quiz.total}", style="Body.TLabel").pack(pady=10)
+        ttk.Label(self.main_frame, text=f"{self.quiz.percentage:.1f}%", style="Body.TLabel").pack(pady=5)
+
+        ttk.Button(self.main_frame, text="Return to Main Menu", command=self.show_main_menu, style="TButton").pack(pady=20)
+
+
+    # --- Buzzer Match ---
 
-        percentage = (self.score / len(self.questions)) * 100 if self.questions else 0
-        ttk.Label(self.main_frame, text=f"{percentage:.1f}%", style="Body.TLabel").pack(pady=5)
+    def show_match_setup(self):
+        from match import BUZZER_PORT
+        self.clear_window()
+        self.use_styles("TCheckbutton", "TEntry")
+        ttk.Label(self.main_frame, text="Buzzer Match", style="Header.TLabel").pack(pady=10)
+
+        check_frame = ttk.Frame(self.main_frame, style="TFrame")
+        check_frame.pack(pady=5)
+        self.course_vars = {}
+        for course in COURSES:
+            var = tk.IntVar()
+            ttk.Checkbutton(check_frame, text=course, variable=var, style="TCheckbutton").pack(anchor='w', padx=40)
+            self.course_vars[course] = var
 
+        # One row per player slot: name and buzzer key
+        player_frame = ttk.Frame(self.main_frame, style="TFrame")
+        player_frame.pack(pady=5)
+        player_entries = []
+        for i, key in enumerate(BUZZER_KEYS):
+            ttk.Label(player_frame, text=f"Player {i + 1} (key {key.upper()}):", style="Body.TLabel").grid(row=i, column=0, sticky="w")
+            entry = ttk.Entry(player_frame, style="TEntry", width=20)
+            entry.grid(row=i, column=1, padx=5, pady=2)
+            player_entries.append(entry)
+
+        network_var = tk.IntVar()
+        ttk.Checkbutton(self.main_frame, text=f"Also accept network buzzers (UDP port {BUZZER_PORT})",
+                        variable=network_var, style="TCheckbutton").pack(pady=5)
+
+        ttk.Button(self.main_frame, text="Start Match", style="TButton",
+                   command=lambda: self.start_match([entry.get().strip() for entry in player_entries], network_var.get() == 1)).pack(pady=10)
+        ttk.Button(self.main_frame, text="Back to Main Menu", command=self.show_main_menu, style="Accent.TButton").pack(pady=5)
+
+    def start_match(self, names, use_network):
+        from match import MATCH_LENGTH
+        courses = [c for c, v in self.course_vars.items() if v.get() == 1]
+        # Blank slots are empty seats; their keys stay unbound
+        keys = {key: name for key, name in zip(BUZZER_KEYS, names) if name}
+        if not courses:
+            messagebox.showwarning("No Selection", "Please select at least one course.", parent=self.master)
+            return
+        if len(keys) < 2:
+            messagebox.showwarning("Not Enough Players", "Enter at least two player names.", parent=self.master)
+            return
+        if len(set(keys.values())) < len(keys):
+            messagebox.showwarning("Duplicate Names", "Each player needs a different name.", parent=self.master)
+            return
+
+        def on_error(e):
+            messagebox.showerror("Database Error", f"Failed to load questions: {e}", parent=self.master)
+            self.show_main_menu()
+
+        self.show_loading("Loading questions...")
+        self.run_query(lambda repo: repo.sample_questions(courses, MATCH_LENGTH),
+                       lambda rows: self.begin_match(keys, rows, use_network), on_error)
+
+    def begin_match(self, keys, rows, use_network):
+        from match import BUZZER_PORT, BuzzerListener, BuzzerMatch
+        if not rows:
+            messagebox.showinfo("No Questions", "No questions available in the selected courses.", parent=self.master)
+            self.show_match_setup()
+            return
+        self.build_match_screen()
+        self.match = BuzzerMatch(list(keys.values()), rows)
+
+        if use_network:
+            try:
+                self.buzzer_listener = BuzzerListener(self.match, on_buzz=self.network_buzzes.put)
+            except OSError as e:
+                messagebox.showerror("Network Buzzers", f"Could not listen on port {BUZZER_PORT}: {e}", parent=self.master)
+        # Buzzer keys are bound on the whole window; KeyPress fires before
+        # any redraw work queued behind it
+        self.buzzer_keys = keys
+        self.master.bind("<KeyPress>", self.on_buzzer_key)
+        if self.buzzer_listener is not None:
+            self.scheduler.every(BUZZ_POLL_MS, self.poll_network_buzzes)
+        self.show_match_question()
+
+    def build_match_screen(self):
+        self.clear_window()
+        self.use_styles("Feedback.TLabel")
+        widgets = {}
+        widgets["header"] = ttk.Label(self.main_frame, style="Header.TLabel")
+        widgets["header"].pack(pady=5)
+        widgets["question"] = ttk.Label(self.main_frame, wraplength=550, style="Body.TLabel", justify=tk.CENTER)
+        widgets["question"].pack(pady=5, padx=10)
+        widgets["options"] = ttk.Label(self.main_frame, wraplength=550, style="Body.TLabel", justify=tk.LEFT)
+        widgets["options"].pack(pady=5)
+        widgets["status"] = ttk.Label(self.main_frame, style="Feedback.TLabel", wraplength=550)
+        widgets["status"].pack(pady=5)
+
+        button_frame = ttk.Frame(self.main_frame, style="TFrame")
+        button_frame.pack(pady=5)
+        widgets["answers"] = []
+        for value in ['A', 'B', 'C', 'D']:
+            btn = ttk.Button(button_frame, text=value, width=4, style="TButton", command=lambda v=value: self.match_answer(v))
+            btn.pack(side=tk.LEFT, padx=5)
+            widgets["answers"].append(btn)
+
+        widgets["scores"] = ttk.Label(self.main_frame, style="Body.TLabel")
+        widgets["scores"].pack(pady=5)
+
+        control_frame = ttk.Frame(self.main_frame, style="TFrame")
+        control_frame.pack(pady=10)
+        ttk.Button(control_frame, text="Skip Question", command=self.skip_match_question, style="TButton").pack(side=tk.LEFT, padx=5)
+        ttk.Button(control_frame, text="End Match", command=self.show_match_results, style="Accent.TButton").pack(side=tk.LEFT, padx=5)
+        self.match_widgets = widgets
+
+    def show_match_question(self):
+        match = self.match
+        widgets = self.match_widgets
+        widgets["header"].config(text=f"Question {match.question_number}/{match.total}")
+        widgets["question"].config(text=match.question[0])
+        widgets["options"].config(text="\n".join(f"{value}. {text}" for value, text in match.options()))
+        self.update_match_scores()
+        self.open_match_buzzers()
+
+    def open_match_buzzers(self):
+        self.match_timer = None
+        if self.match is None:
+            return # Left the match screen in the meantime
+        for btn in self.match_widgets["answers"]:
+            btn.config(state="disabled")
+        keys = ", ".join(f"{player} = {key.upper()}" for key, player in self.buzzer_keys.items()
+                         if player not in self.match.locked_out)
+        self.match_widgets["status"].config(text=f"Buzzers open! ({keys})", foreground=COLORS["text"])
+        self.match.open_buzzers()
+
+    def update_match_scores(self):
+        self.match_widgets["scores"].config(
+            text="   ".join(f"{player}: {score}" for player, score, _ in self.match.standings())
+        )
+
+    def on_buzzer_key(self, event):
+        # Timestamp first, before anything else can delay it
+        timestamp_ns = time.perf_counter_ns()
+        player = self.buzzer_keys.get(event.keysym.lower())
+        if player is None or self.match is None:
+            return
+        result = self.match.buzz(player, timestamp_ns)
+        if result.won:
+            self.show_buzz_winner(result)
+
+    def poll_network_buzzes(self):
+        # Network buzzes are already arbitrated on the listener thread; this
+        # only brings the winner onto the screen
+        if self.match is None or self.buzzer_listener is None:
+            return
+        try:
+            while True:
+                self.show_buzz_winner(self.network_buzzes.get_nowait())
+        except queue.Empty:
+            pass
+
+    def drain_network_buzzes(self):
+        # Drop buzzes won on a question that is no longer on screen
+        try:
+            while True:
+                self.network_buzzes.get_nowait()
+        except queue.Empty:
+            pass
+
+    def show_buzz_winner(self, result):
+        # A buzz queued just before the question changed must not open the
+        # answer buttons on the next one
+        if self.match is None or not self.match.arbiter.holds(result):
+            return
+        self.match_widgets["status"].config(text=f"🔔 {result.player} buzzed in! Answer A, B, C or D.", foreground=COLORS["accent"])
+        for btn in self.match_widgets["answers"]:
+            btn.config(state="normal")
+
+    def match_answer(self, selected_answer):
+        for btn in self.match_widgets["answers"]:
+            btn.config(state="disabled")
+        if self.match is None or self.match.arbiter.winner is None:
+            return # Nobody holds the buzz (e.g. a second click)
+        result = self.match.answer(selected_answer)
+        self.update_match_scores()
+        status = self.match_widgets["status"]
+        if result.is_correct:
+            status.config(text=f"✅ {result.player} is right! +{result.points}", foreground=COLORS["correct"])
+            self.match_timer = self.scheduler.after(MATCH_FEEDBACK_MS, self.next_match_question)
+        elif result.rebound:
+            status.config(text=f"❌ {result.player} is wrong ({result.points}). Rebound for everyone else!", foreground=COLORS["incorrect"])
+            self.match_timer = self.scheduler.after(REBOUND_DELAY_MS, self.open_match_buzzers)
+        else:
+            status.config(text=f"❌ {result.player} is wrong ({result.points}). The answer was {result.correct_answer}. {result.correct_text}",
+                          foreground=COLORS["incorrect"])
+            self.match_timer = self.scheduler.after(MATCH_FEEDBACK_MS, self.next_match_question)
+
+    def skip_match_question(self):
+        if self.match is not None:
+            self.next_match_question()
+
+    def next_match_question(self):
+        # Skip during the pause after an answer must not advance twice
+        self.scheduler.cancel(self.match_timer)
+        self.match_timer = None
+        if self.match is None:
+            return
+        self.drain_network_buzzes()
+        if self.match.next_question():
+            self.show_match_question()
+        else:
+            self.show_match_results()
+
+    def show_match_results(self):
+        match = self.match
+        self.clear_window() # Also stops the buzzers and ends the match
+        ttk.Label(self.main_frame, text="Match Over!", style="Header.TLabel").pack(pady=20)
+        for place, (player, score, correct) in enumerate(match.standings(), start=1):
+            ttk.Label(self.main_frame, text=f"{place}. {player}: {score} points ({correct} correct)", style="Body.TLabel").pack(pady=2)
+
+        latencies = match.arbiter.latencies_ns
+        if latencies:
+            # From the buzz's timestamp (key handler or datagram arrival) to the others being locked out
+            ttk.Label(self.main_frame, text=f"Slowest buzz arbitration: {max(latencies) / 1e6:.2f} ms", style="Body.TLabel").pack(pady=10)
         ttk.Button(self.main_frame, text="Return to Main Menu", command=self.show_main_menu, style="TButton").pack(pady=20)
 
+    def stop_match_input(self):
+        # Unbind the buzzer keys and stop listening for network buzzers
+        if self.buzzer_keys:
+            self.master.unbind("<KeyPress>")
+            self.buzzer_keys = {}
+        if self.buzzer_listener is not None:
+            self.buzzer_listener.close()
+            self.buzzer_listener = None
+        self.drain_network_buzzes()
+        if self.match is not None:
+            self.match.arbiter.close()
+            self.match = None
+
 
     # --- Admin Section ---
 
     def admin_login(self):
         self.clear_window()
+        self.use_styles("TEntry")
         ttk.Label(self.main_frame, text="Admin Login", style="Header.TLabel").pack(pady=20)
         ttk.Label(self.main_frame, text="Enter Password:", style="Body.TLabel").pack(pady=5)
 
@@ -311,6 +828,8 @@ class QuizApp:
     def check_admin_password(self):
         # Check if password_entry exists and has content
         if self.password_entry and self.password_entry.get() == ADMIN_PASSWORD:
+            # Only now does a quiz server get the password (kiosks never send it)
+            self.db.login(self.password_entry.get())
             self.show_admin_interface()
         else:
             messagebox.showerror("Access Denied", "Incorrect password.", parent=self.master)
@@ -324,11 +843,17 @@ class QuizApp:
         ttk.Button(self.main_frame, text="Add Question", command=self.add_question, style="TButton").pack(pady=10)
         ttk.Button(self.main_frame, text="View/Delete Questions", command=self.view_questions_select_course, style="TButton").pack(pady=10) # Combined view/delete
         ttk.Button(self.main_frame, text="Edit Question", command=self.edit_question_select_course, style="TButton").pack(pady=10) # Changed command name
+        ttk.Button(self.main_frame, text="Search Questions", command=self.show_search_screen, style="TButton").pack(pady=10)
+        ttk.Button(self.main_frame, text="Find Duplicates", command=self.duplicates_select_course, style="TButton").pack(pady=10)
+        ttk.Button(self.main_frame, text="Answer Analytics", command=self.show_analytics, style="TButton").pack(pady=10)
+        ttk.Button(self.main_frame, text="Import Questions", command=self.import_questions, style="TButton").pack(pady=10)
+        ttk.Button(self.main_frame, text="Export Questions", command=self.export_questions, style="TButton").pack(pady=10)
 
         ttk.Button(self.main_frame, text="Back to Main Menu", command=self.show_main_menu, style="Accent.TButton").pack(pady=20)
 
     def add_question(self):
         self.clear_window()
+        self.use_styles("TEntry", "TCombobox")
 
         ttk.Label(self.main_frame, text="Add New Question", style="Header.TLabel").pack(pady=10) # Reduced padding
 
@@ -382,32 +907,91 @@ class QuizApp:
         # Ensure correct answer is uppercase
         values[correct_answer_key] = values[correct_answer_key].upper()
 
-        table = course.replace(" ", "_").lower()
-        try:
-            conn = sqlite3.connect(DB_FILE)
-            cursor = conn.cursor()
-            cursor.execute(f"""
-                INSERT INTO {table} (question, option_a, option_b, option_c, option_d, correct_answer)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (
-                values["Question"],
-                values["Option A"],
-                values["Option B"],
-                values["Option C"],
-                values["Option D"],
-                values[correct_answer_key]
-            ))
-            conn.commit()
-            conn.close()
+        new_values = (
+            values["Question"],
+            values["Option A"],
+            values["Option B"],
+            values["Option C"],
+            values["Option D"],
+            values[correct_answer_key]
+        )
+
+        def on_done(result):
             messagebox.showinfo("Success", "Question added successfully!", parent=self.master)
             self.show_admin_interface() # Go back after success
-        except sqlite3.Error as e:
+
+        def on_error(e):
             messagebox.showerror("Database Error", f"Failed to save question: {e}", parent=self.master)
 
+        def save():
+            self.show_loading("Saving...")
+            # Writes are not interrupted if the admin navigates away
+            self.run_query(lambda repo: repo.add_question(course, new_values), on_done, on_error, interruptible=False)
+
+        self.check_duplicates_then(course, new_values, None, save)
+
+
+    def import_questions(self):
+        # Bulk import from a CSV / JSON / JSON Lines file; each row names its course
+        from tkinter import filedialog
+        from import_questions import import_file, write_error_report
+        path = filedialog.askopenfilename(
+            parent=self.master,
+            title="Import Questions",
+            filetypes=[("Question files", "*.csv *.json *.jsonl *.gz"), ("All files", "*.*")]
+        )
+        if not path:
+            return
+
+        def work(repo, report):
+            return import_file(repo, path, progress=lambda rows_read, inserted, error_count: report(
+                f"{rows_read:,} rows read, {inserted:,} imported, {error_count:,} rejected"
+            ))
+
+        def on_done(import_report):
+            message = f"Imported {import_report.inserted} questions."
+            if import_report.errors:
+                message += f"\n{len(import_report.errors)} rows were rejected.\n\nSave a report of the rejected rows?"
+                if messagebox.askyesno("Import Complete", message, parent=self.master):
+                    report_path = filedialog.asksaveasfilename(
+                        parent=self.master, title="Save Error Report",
+                        defaultextension=".csv", filetypes=[("CSV files", "*.csv")]
+                    )
+                    if report_path:
+                        write_error_report(import_report.errors, report_path)
+            else:
+                messagebox.showinfo("Import Complete", message, parent=self.master)
+            self.show_admin_interface()
+
+        self.run_with_progress("Importing Questions", work, on_done, "Import Failed")
+
+    def export_questions(self):
+        # Stream every course to CSV / JSON Lines, gzip-compressed if the name ends in .gz
+        from tkinter import filedialog
+        from export_questions import export_questions
+        path = filedialog.asksaveasfilename(
+            parent=self.master,
+            title="Export Questions",
+            defaultextension=".csv",
+            filetypes=[("CSV", "*.csv"), ("JSON Lines", "*.jsonl"), ("Compressed CSV", "*.csv.gz"), ("Compressed JSON Lines", "*.jsonl.gz")]
+        )
+        if not path:
+            return
+
+        def work(repo, report):
+            return export_questions(repo, path, progress=lambda written: report(f"{written:,} questions written"))
+
+        def on_done(count):
+            messagebox.showinfo("Export Complete", f"Exported {count} questions to {path}.", parent=self.master)
+            self.show_admin_interface()
+
+        self.run_with_progress("Exporting Questions", work, on_done, "Export Failed")
+
 
     # Renamed from edit_question
     def edit_question_select_course(self):
         self.clear_window()
+        self.use_styles("TEntry", "TCombobox")
         ttk.Label(self.main_frame, text="Edit Question: Select Course", style="Header.TLabel").pack(pady=20)
 
         # Dropdown for course
@@ -419,10 +1003,29 @@ class QuizApp:
         # Button to load questions for editing
         ttk.Button(self.main_frame, text="Load Questions", command=self.load_questions_for_edit, style="TButton").pack(pady=10)
 
+        # Or go straight to one question without loading the list
+        id_frame = ttk.Frame(self.main_frame, style="TFrame")
+        id_frame.pack(pady=10)
+        ttk.Label(id_frame, text="Question ID:", style="Body.TLabel").pack(side=tk.LEFT, padx=5)
+        id_entry = ttk.Entry(id_frame, style="TEntry", width=8)
+        id_entry.pack(side=tk.LEFT, padx=5)
+        ttk.Button(id_frame, text="Open", command=lambda: self.open_edit_form_by_id(id_entry.get()), style="TButton").pack(side=tk.LEFT, padx=5)
+
         # Return button to Admin Menu
         ttk.Button(self.main_frame, text="Back to Admin Menu", command=self.show_admin_interface, style="Accent.TButton").pack(pady=10)
 
-    def load_questions_for_edit(self):
+    def open_edit_form_by_id(self, id_text):
+        course = self.edit_course_var.get()
+        if not course or course == "Select Course":
+            messagebox.showwarning("Invalid Selection", "Please select a valid course.", parent=self.master)
+            return
+        if not id_text.strip().isdigit():
+            messagebox.showerror("Error", "Please enter a numeric question ID.", parent=self.master)
+            return
+        self.edit_page_from = int(id_text)
+        self.open_edit_form(int(id_text), course)
+
+    def load_questions_for_edit(self, after_id=None, before_id=None, from_id=None):
         course = self.edit_course_var.get()
         if not course or course == "Select Course":
             messagebox.showwarning("Invalid Selection", "Please select a valid course.", parent=self.master)
@@ -432,70 +1035,67 @@ class QuizApp:
         self.clear_window()
         ttk.Label(self.main_frame, text=f"Edit Questions: {course}", style="Header.TLabel").pack(pady=10)
 
-        # Create scrollable area for questions
-        self.scrollable_content_frame = self.create_scrollable_frame(self.main_frame) # Pass parent
+        # Add Back button at the bottom, outside scrollable area (available while loading too)
+        ttk.Button(self.main_frame, text="Back to Course Selection", command=self.edit_question_select_course, style="Accent.TButton").pack(pady=10, side=tk.BOTTOM)
 
-        rows = []
-        try:
-            conn = sqlite3.connect(DB_FILE)
-            cursor = conn.cursor()
-            table_name = course.replace(' ', '_').lower()
-            cursor.execute(f"SELECT id, question FROM {table_name} ORDER BY id") # Select only id and question for list
-            rows = cursor.fetchall()
-            conn.close()
-        except sqlite3.Error as e:
+        def on_error(e):
             messagebox.showerror("Database Error", f"Could not load questions: {e}", parent=self.master)
             self.show_admin_interface() # Go back on error
-            return
+
+        # One page of id and question for the list
+        self.show_loading("Loading questions...")
+        self.run_query(
+            lambda repo: repo.page_question_titles(course, after_id, before_id, from_id),
+            lambda page: self.show_edit_list(course, *page),
+            on_error
+        )
+
+    def show_edit_list(self, course, rows, has_prev, has_next):
+        self.edit_page_from = rows[0][0] if rows else None
+        self.create_page_nav(self.main_frame, rows, has_prev, has_next, self.load_questions_for_edit)
 
         if not rows:
-             ttk.Label(self.scrollable_content_frame, text="No questions found for this course.", style="Body.TLabel").pack(pady=10)
+             ttk.Label(self.main_frame, text="No questions found for this course.", style="Body.TLabel").pack(pady=10)
         else:
-            # Display questions with Edit buttons
-            for q_id, question_text in rows:
-                q_frame = ttk.Frame(self.scrollable_content_frame, padding=5, style="TFrame")
-                q_frame.pack(fill=tk.X, pady=5, padx=10)
+            # Display questions with Edit buttons. Only the rows in view get widgets.
+            def create_row(parent):
+                q_frame = ttk.Frame(parent, padding=5, style="TFrame")
+                q_frame.label = ttk.Label(q_frame, style="Body.TLabel", anchor='w', wraplength=400)
+                q_frame.label.pack(side=tk.LEFT, expand=True, fill=tk.X, padx=5)
+                # Edit button
+                q_frame.button = ttk.Button(q_frame, text="Edit", style="Accent.TButton") # Use accent color for edit/delete actions
+                q_frame.button.pack(side=tk.RIGHT, padx=5)
+                return q_frame
 
+            def fill_row(q_frame, index):
+                q_id, question_text = rows[index]
                 # Shortened question text for display
                 display_text = (question_text[:70] + '...') if len(question_text) > 70 else question_text
-                ttk.Label(q_frame, text=f"ID {q_id}: {display_text}", style="Body.TLabel", anchor='w', wraplength=400).pack(side=tk.LEFT, expand=True, fill=tk.X, padx=5)
-
-                # Edit button
-                ttk.Button(
-                    q_frame,
-                    text="Edit",
-                    command=lambda q_id=q_id, course=course: self.open_edit_form(q_id, course), # Pass course name too
-                    style="Accent.TButton" # Use accent color for edit/delete actions
-                ).pack(side=tk.RIGHT, padx=5)
+                q_frame.label.config(text=f"ID {q_id}: {display_text}")
+                q_frame.button.config(command=lambda q_id=q_id, course=course: self.open_edit_form(q_id, course)) # Pass course name too
 
-
-        # Add Back button at the bottom, outside scrollable area
-        ttk.Button(self.main_frame, text="Back to Course Selection", command=self.edit_question_select_course, style="Accent.TButton").pack(pady=10, side=tk.BOTTOM)
+            self.create_virtual_list(self.main_frame, len(rows), EDIT_ROW_HEIGHT, create_row, fill_row)
 
 
     def open_edit_form(self, q_id, course): # Added course parameter
         self.clear_window()
         ttk.Label(self.main_frame, text=f"Edit Question ID: {q_id} ({course})", style="Header.TLabel").pack(pady=10)
 
-        # Fetch the existing question data
-        row = None
-        try:
-            conn = sqlite3.connect(DB_FILE)
-            cursor = conn.cursor()
-            table_name = course.replace(' ', '_').lower()
-            cursor.execute(f"SELECT question, option_a, option_b, option_c, option_d, correct_answer FROM {table_name} WHERE id = ?", (q_id,))
-            row = cursor.fetchone()
-            conn.close()
-        except sqlite3.Error as e:
+        def on_error(e):
              messagebox.showerror("Database Error", f"Failed to fetch question {q_id}: {e}", parent=self.master)
              self.show_admin_interface() # Or back to edit selection?
-             return
 
+        # Fetch the existing question data
+        self.show_loading("Loading question...")
+        self.run_query(lambda repo: repo.get_question(course, q_id), lambda row: self.show_edit_form(q_id, course, row), on_error)
+
+    def show_edit_form(self, q_id, course, row):
         if not row:
             messagebox.showerror("Error", f"Question ID {q_id} not found in {course}.", parent=self.master)
-            self.load_questions_for_edit() # Refresh the list
+            self.load_questions_for_edit(from_id=self.edit_page_from) # Refresh the list
             return
 
+        self.use_styles("TEntry")
         # Pre-populate the fields with current question data
         question, a, b, c, d, correct = row
 
@@ -523,7 +1123,7 @@ class QuizApp:
 
         # Button to save edited question (pass q_id and course)
         ttk.Button(button_frame, text="Save Changes", command=lambda: self.save_edited_question(q_id, course), style="TButton").pack(side=tk.LEFT, padx=10)
-        ttk.Button(button_frame, text="Cancel", command=self.load_questions_for_edit, style="Accent.TButton").pack(side=tk.LEFT, padx=10) # Go back to the list
+        ttk.Button(button_frame, text="Cancel", command=lambda: self.load_questions_for_edit(from_id=self.edit_page_from), style="Accent.TButton").pack(side=tk.LEFT, padx=10) # Go back to the list
 
 
     def save_edited_question(self, q_id, course):
@@ -540,35 +1140,258 @@ class QuizApp:
         # Ensure correct answer is uppercase
         values[correct_answer_key] = values[correct_answer_key].upper()
 
-        table_name = course.replace(' ', '_').lower()
-        try:
-            conn = sqlite3.connect(DB_FILE)
-            cursor = conn.cursor()
-            cursor.execute(f"""
-                UPDATE {table_name}
-                SET question = ?, option_a = ?, option_b = ?, option_c = ?, option_d = ?, correct_answer = ?
-                WHERE id = ?
-            """, (
-                values["Question"],
-                values["Option A"],
-                values["Option B"],
-                values["Option C"],
-                values["Option D"],
-                values[correct_answer_key],
-                q_id
-            ))
-            conn.commit()
-            conn.close()
+        new_values = (
+            values["Question"],
+            values["Option A"],
+            values["Option B"],
+            values["Option C"],
+            values["Option D"],
+            values[correct_answer_key]
+        )
+
+        def on_done(result):
             messagebox.showinfo("Success", f"Question ID {q_id} updated successfully!", parent=self.master)
-            # Go back to the list for that course after saving
-            self.load_questions_for_edit()
-        except sqlite3.Error as e:
+            # Go back to the list page for that course after saving
+            self.load_questions_for_edit(from_id=self.edit_page_from)
+
+        def on_error(e):
              messagebox.showerror("Database Error", f"Failed to update question: {e}", parent=self.master)
 
+        def save():
+            self.show_loading("Saving...")
+            self.run_query(lambda repo: repo.update_question(course, q_id, new_values), on_done, on_error, interruptible=False)
+
+        self.check_duplicates_then(course, new_values, q_id, save)
+
+    def check_duplicates_then(self, course, values, exclude_id, save):
+        # Look for near-duplicates of `values` in the course (ignoring the
+        # question being edited) and let the admin back out before save()
+        def on_done(matches):
+            if matches:
+                lines = "\n".join(
+                    f"ID {q_id} ({similarity:.0%} similar): {question[:70]}"
+                    for q_id, question, similarity in matches
+                )
+                if not messagebox.askyesno(
+                    "Possible Duplicate",
+                    f"This looks like existing questions in {course}:\n\n{lines}\n\nSave anyway?",
+                    parent=self.master
+                ):
+                    return
+            save()
+
+        def on_error(e):
+            messagebox.showerror("Database Error", f"Could not check for duplicates: {e}", parent=self.master)
+
+        self.show_loading("Checking for duplicates...")
+        self.run_query(lambda repo: repo.find_similar(course, values, exclude_id), on_done, on_error)
+
+
+    def show_search_screen(self):
+        self.clear_window()
+        self.use_styles("TEntry")
+        ttk.Label(self.main_frame, text="Search Questions", style="Header.TLabel").pack(pady=10)
+
+        search_frame = ttk.Frame(self.main_frame, style="TFrame")
+        search_frame.pack(pady=5)
+        search_entry = ttk.Entry(search_frame, style="TEntry", width=40)
+        search_entry.insert(0, self.search_text)
+        search_entry.pack(side=tk.LEFT, padx=5)
+        search_entry.bind("<Return>", lambda event: self.search_questions(search_entry.get()))
+        ttk.Button(search_frame, text="Search", command=lambda: self.search_questions(search_entry.get()), style="TButton").pack(side=tk.LEFT, padx=5)
+        search_entry.focus_set()
+
+        ttk.Button(self.main_frame, text="Back to Admin Menu", command=self.show_admin_interface, style="Accent.TButton").pack(pady=10, side=tk.BOTTOM)
+
+        # Results go in their own frame so a new search only replaces them
+        self.search_results_frame = ttk.Frame(self.main_frame, style="TFrame")
+        self.search_results_frame.pack(fill=tk.BOTH, expand=True)
+
+        if self.search_text:
+            self.search_questions(self.search_text)
+
+    def search_questions(self, text):
+        self.search_text = text.strip()
+        if not self.search_text:
+            return
+
+        def on_error(e):
+            messagebox.showerror("Database Error", f"Search failed: {e}", parent=self.master)
+
+        self.show_loading("Searching...")
+        self.run_query(lambda repo: repo.search_questions(self.search_text), self.show_search_results, on_error)
+
+    def show_search_results(self, rows):
+        for widget in self.search_results_frame.winfo_children():
+            widget.destroy()
+
+        if not rows:
+            ttk.Label(self.search_results_frame, text="No matching questions.", style="Body.TLabel").pack(pady=10)
+            return
+
+        # Best match first, across all courses
+        def create_row(parent):
+            q_frame = ttk.Frame(parent, padding=5, style="TFrame")
+            q_frame.label = ttk.Label(q_frame, style="Body.TLabel", anchor='w', wraplength=400)
+            q_frame.label.pack(side=tk.LEFT, expand=True, fill=tk.X, padx=5)
+            q_frame.button = ttk.Button(q_frame, text="Edit", style="Accent.TButton")
+            q_frame.button.pack(side=tk.RIGHT, padx=5)
+            return q_frame
+
+        def fill_row(q_frame, index):
+            course, q_id, question_text = rows[index]
+            display_text = (question_text[:70] + '...') if len(question_text) > 70 else question_text
+            q_frame.label.config(text=f"{course}, ID {q_id}: {display_text}")
+            q_frame.button.config(command=lambda q_id=q_id, course=course: self.open_search_result(q_id, course))
+
+        self.create_virtual_list(self.search_results_frame, len(rows), EDIT_ROW_HEIGHT, create_row, fill_row)
+
+    def open_search_result(self, q_id, course):
+        # Edit the question as if it had been picked from its course's list,
+        # so Save/Cancel land on the list page starting at it
+        self.edit_course_var.set(course)
+        self.edit_page_from = q_id
+        self.open_edit_form(q_id, course)
+
+
+    def show_analytics(self, course=None):
+        # Read entirely from the aggregate tables the answer log keeps up to
+        # date, so this opens just as fast with millions of recorded answers
+        self.clear_window()
+        self.use_styles("TCombobox")
+        ttk.Label(self.main_frame, text="Answer Analytics", style="Header.TLabel").pack(pady=10)
+
+        course_var = tk.StringVar(value=course or "All courses")
+        dropdown = ttk.Combobox(self.main_frame, textvariable=course_var, values=["All courses", *COURSES], style="TCombobox", state="readonly")
+        dropdown.pack(pady=5)
+        dropdown.bind("<<ComboboxSelected>>", lambda event: self.show_analytics(
+            None if course_var.get() == "All courses" else course_var.get()
+        ))
+        ttk.Button(self.main_frame, text="Back to Admin Menu", command=self.show_admin_interface, style="Accent.TButton").pack(pady=10, side=tk.BOTTOM)
+
+        def on_error(e):
+            messagebox.showerror("Database Error", f"Could not load the analytics: {e}", parent=self.master)
+
+        self.show_loading()
+        self.run_query(lambda repo: repo.answer_analytics(course), self.show_analytics_results, on_error)
+
+    def show_analytics_results(self, analytics):
+        frame = self.create_scrollable_frame(self.main_frame)
+
+        def section(title):
+            ttk.Label(frame, text=title, style="Body.TLabel", font=FONTS["button"]).pack(anchor="w", padx=10, pady=(15, 5))
+
+        def bar_row(label, fraction, text, color):
+            row = ttk.Frame(frame, style="TFrame")
+            row.pack(anchor="w", padx=20, pady=2)
+            ttk.Label(row, text=label, style="Body.TLabel", width=22, anchor="w").pack(side=tk.LEFT)
+            bar = tk.Canvas(row, width=ANALYTICS_BAR_WIDTH, height=16, bg=COLORS["entry_bg"], highlightthickness=0)
+            bar.create_rectangle(0, 0, round(fraction * ANALYTICS_BAR_WIDTH), 16, fill=color, width=0)
+            bar.pack(side=tk.LEFT, padx=5)
+            ttk.Label(row, text=text, style="Body.TLabel").pack(side=tk.LEFT)
+
+        section("Accuracy by course")
+        if not analytics["courses"]:
+            ttk.Label(frame, text="No answers recorded yet.", style="Body.TLabel").pack(anchor="w", padx=20)
+        for course, attempts, correct in analytics["courses"]:
+            bar_row(course, correct / attempts, f"{correct / attempts:.0%} of {attempts} answers", COLORS["correct"])
+
+        section("Response times")
+        response_times = analytics["response_times"]
+        most = max(response_times)
+        if not most:
+            ttk.Label(frame, text="No timed answers recorded yet.", style="Body.TLabel").pack(anchor="w", padx=20)
+        else:
+            bounds = [0, *RESPONSE_TIME_BUCKETS_MS]
+            for bucket, answers in enumerate(response_times):
+                if bucket < len(RESPONSE_TIME_BUCKETS_MS):
+                    label = f"{bounds[bucket] / 1000:g}-{bounds[bucket + 1] / 1000:g} s"
+                else:
+                    label = f"over {bounds[-1] / 1000:g} s"
+                bar_row(label, answers / most, str(answers), COLORS["button"])
+
+        section("Hardest questions")
+        if not analytics["hardest"]:
+            ttk.Label(frame, text="No question has enough answers yet.", style="Body.TLabel").pack(anchor="w", padx=20)
+        for course, q_id, question_text, correct_answer, attempts, correct, *picked, timed_out, average_ms in analytics["hardest"]:
+            display_text = (question_text[:70] + '...') if len(question_text) > 70 else question_text
+            # Share of answers that went to each option; wrong options picked
+            # often are the misleading distractors
+            options = "   ".join(
+                f"{letter}{'*' if letter == correct_answer else ''} {count / attempts:.0%}"
+                for letter, count in zip(OPTION_LETTERS, picked)
+            )
+            details = f"{correct / attempts:.0%} correct of {attempts}   |   {options}"
+            if timed_out:
+                details += f"   |   {timed_out} timed out"
+            if average_ms is not None:
+                details += f"   |   avg {average_ms / 1000:.1f} s"
+            q_frame = ttk.Frame(frame, padding=5, style="TFrame")
+            q_frame.pack(fill=tk.X, padx=10)
+            ttk.Label(q_frame, text=f"{course}, ID {q_id}: {display_text}", style="Body.TLabel", anchor="w", wraplength=550).pack(anchor="w")
+            ttk.Label(q_frame, text=details, style="Body.TLabel", anchor="w").pack(anchor="w", padx=10)
+
+    def duplicates_select_course(self):
+        self.clear_window()
+        self.use_styles("TCombobox")
+        ttk.Label(self.main_frame, text="Find Duplicates: Select Course", style="Header.TLabel").pack(pady=20)
+
+        course_var = tk.StringVar()
+        dropdown = ttk.Combobox(self.main_frame, textvariable=course_var, values=COURSES, style="TCombobox", state="readonly")
+        dropdown.set("Select Course")
+        dropdown.pack(pady=10)
+
+        ttk.Button(self.main_frame, text="Find Duplicates", command=lambda: self.find_duplicates(course_var.get()), style="TButton").pack(pady=10)
+        ttk.Button(self.main_frame, text="Back to Admin Menu", command=self.show_admin_interface, style="Accent.TButton").pack(pady=10)
+
+    def find_duplicates(self, course):
+        if not course or course == "Select Course":
+            messagebox.showwarning("Invalid Selection", "Please select a valid course.", parent=self.master)
+            return
+
+        def work(repo, report):
+            return repo.find_duplicate_groups(course, progress=report)
+
+        self.run_with_progress(f"Finding Duplicates: {course}", work, lambda groups: self.show_duplicate_groups(course, groups), "Duplicate Check Failed")
+
+    def show_duplicate_groups(self, course, groups):
+        self.clear_window()
+        ttk.Label(self.main_frame, text=f"Near-Duplicates: {course}", style="Header.TLabel").pack(pady=10)
+        ttk.Button(self.main_frame, text="Back to Course Selection", command=self.duplicates_select_course, style="Accent.TButton").pack(pady=10, side=tk.BOTTOM)
+
+        if not groups:
+            ttk.Label(self.main_frame, text="No near-duplicate questions found.", style="Body.TLabel").pack(pady=10)
+            return
+        ttk.Label(self.main_frame, text=f"{len(groups)} groups of similar questions", style="Body.TLabel").pack(pady=5)
+
+        def create_row(parent):
+            g_frame = ttk.Frame(parent, padding=5, style="TFrame")
+            g_frame.label = ttk.Label(g_frame, style="Body.TLabel", anchor='w', wraplength=400)
+            g_frame.label.pack(side=tk.LEFT, expand=True, fill=tk.X, padx=5)
+            g_frame.button = ttk.Button(g_frame, text="View", style="Accent.TButton")
+            g_frame.button.pack(side=tk.RIGHT, padx=5)
+            return g_frame
+
+        def fill_row(g_frame, index):
+            group = groups[index]
+            ids = ", ".join(str(q_id) for q_id, _ in group)
+            question_text = group[0][1]
+            display_text = (question_text[:70] + '...') if len(question_text) > 70 else question_text
+            g_frame.label.config(text=f"IDs {ids}: {display_text}")
+            # Open the View/Delete list at the group's first question
+            g_frame.button.config(command=lambda q_id=group[0][0]: self.view_questions_from(course, q_id))
+
+        self.create_virtual_list(self.main_frame, len(groups), EDIT_ROW_HEIGHT, create_row, fill_row)
+
+    def view_questions_from(self, course, q_id):
+        self.view_course_var.set(course)
+        self.show_questions_for_course(from_id=q_id)
+
 
     # Renamed from view_questions
     def view_questions_select_course(self):
         self.clear_window()
+        self.use_styles("TEntry", "TCombobox")
         ttk.Label(self.main_frame, text="View/Delete Questions: Select Course", style="Header.TLabel").pack(pady=20)
 
         self.view_course_var = tk.StringVar() # Renamed from self.course_var
@@ -579,7 +1402,7 @@ class QuizApp:
         ttk.Button(self.main_frame, text="View", command=self.show_questions_for_course, style="TButton").pack(pady=10)
         ttk.Button(self.main_frame, text="Back to Admin Menu", command=self.show_admin_interface, style="Accent.TButton").pack(pady=10)
 
-    def show_questions_for_course(self):
+    def show_questions_for_course(self, after_id=None, before_id=None, from_id=None):
         course = self.view_course_var.get() # Use the renamed variable
         if not course or course == "Select Course":
              # Show message within the main frame instead of messagebox for non-critical warnings
@@ -594,32 +1417,32 @@ class QuizApp:
         self.clear_window()
         ttk.Label(self.main_frame, text=f"Questions: {course}", style="Header.TLabel").pack(pady=10)
 
-        # Create scrollable frame
-        self.scrollable_content_frame = self.create_scrollable_frame(self.main_frame) # Pass parent
+        # Back button at the bottom, outside scrollable area (available while loading too)
+        ttk.Button(self.main_frame, text="Back to Course Selection", command=self.view_questions_select_course, style="Accent.TButton").pack(pady=10, side=tk.BOTTOM)
 
-        rows = []
-        try:
-            conn = sqlite3.connect(DB_FILE)
-            cursor = conn.cursor()
-            table_name = course.replace(' ', '_').lower()
-            cursor.execute(f"SELECT * FROM {table_name} ORDER BY id") # Get all columns
-            rows = cursor.fetchall()
-            conn.close()
-        except sqlite3.Error as e:
+        def on_error(e):
             messagebox.showerror("Database Error", f"Could not load questions: {e}", parent=self.master)
             self.show_admin_interface()
-            return
+
+        # One page with all columns
+        self.show_loading("Loading questions...")
+        self.run_query(
+            lambda repo: repo.page_questions(course, after_id, before_id, from_id),
+            lambda page: self.show_view_list(course, *page),
+            on_error
+        )
+
+    def show_view_list(self, course, rows, has_prev, has_next):
+        self.view_page_from = rows[0][0] if rows else None
+        self.create_page_nav(self.main_frame, rows, has_prev, has_next, self.show_questions_for_course)
 
         if not rows:
-             ttk.Label(self.scrollable_content_frame, text="No questions found for this course.", style="Body.TLabel").pack(pady=10)
+             ttk.Label(self.main_frame, text="No questions found for this course.", style="Body.TLabel").pack(pady=10)
         else:
-            # Display questions with details and Delete button
-            for row in rows:
-                q_id, question, a, b, c, d, correct = row
-
+            # Display questions with details and Delete button. Only the rows in view get widgets.
+            def create_row(parent):
                 # Use a Frame for each question entry for better structure
-                q_entry_frame = ttk.Frame(self.scrollable_content_frame, style="TFrame", relief=tk.GROOVE, borderwidth=1)
-                q_entry_frame.pack(fill=tk.X, pady=5, padx=10)
+                q_entry_frame = ttk.Frame(parent, style="TFrame", relief=tk.GROOVE, borderwidth=1)
 
                 # Left frame for text, Right frame for button
                 text_frame = ttk.Frame(q_entry_frame, style="TFrame")
@@ -627,17 +1450,27 @@ class QuizApp:
                 button_frame = ttk.Frame(q_entry_frame, style="TFrame")
                 button_frame.pack(side=tk.RIGHT, padx=5, pady=5)
 
-                # Display details in the left frame
-                ttk.Label(text_frame, text=f"ID: {q_id} - Q: {question}", style="Body.TLabel", wraplength=450, anchor="w", justify=tk.LEFT).pack(fill=tk.X)
-                details_text = f" A: {a}\n B: {b}\n C: {c}\n D: {d}\n Correct: {correct}"
-                ttk.Label(text_frame, text=details_text, style="Body.TLabel", wraplength=450, anchor="w", justify=tk.LEFT).pack(fill=tk.X)
+                # Details go in the left frame
+                q_entry_frame.question_label = ttk.Label(text_frame, style="Body.TLabel", wraplength=450, anchor="w", justify=tk.LEFT)
+                q_entry_frame.question_label.pack(fill=tk.X)
+                q_entry_frame.details_label = ttk.Label(text_frame, style="Body.TLabel", wraplength=450, anchor="w", justify=tk.LEFT)
+                q_entry_frame.details_label.pack(fill=tk.X)
 
                 # Delete button in the right frame
-                ttk.Button(button_frame, text="Delete", command=lambda r=row, c=course: self.confirm_delete_question(r, c), style="Accent.TButton").pack()
+                q_entry_frame.button = ttk.Button(button_frame, text="Delete", style="Accent.TButton")
+                q_entry_frame.button.pack()
+                return q_entry_frame
 
+            def fill_row(q_entry_frame, index):
+                row = rows[index]
+                q_id, question, a, b, c, d, correct = row
+                # Rows have a fixed height, so very long questions are shortened
+                display_question = (question[:150] + '...') if len(question) > 150 else question
+                q_entry_frame.question_label.config(text=f"ID: {q_id} - Q: {display_question}")
+                q_entry_frame.details_label.config(text=f" A: {a}\n B: {b}\n C: {c}\n D: {d}\n Correct: {correct}")
+                q_entry_frame.button.config(command=lambda r=row, c=course: self.confirm_delete_question(r, c))
 
-        # Back button at the bottom, outside scrollable area
-        ttk.Button(self.main_frame, text="Back to Course Selection", command=self.view_questions_select_course, style="Accent.TButton").pack(pady=10, side=tk.BOTTOM)
+            self.create_virtual_list(self.main_frame, len(rows), VIEW_ROW_HEIGHT, create_row, fill_row)
 
 
     def confirm_delete_question(self, row, course):
@@ -654,22 +1487,131 @@ class QuizApp:
 
 
     def delete_question(self, q_id, course):
-        try:
-            conn = sqlite3.connect(DB_FILE)
-            cursor = conn.cursor()
-            table_name = course.replace(' ', '_').lower()
-            cursor.execute(f"DELETE FROM {table_name} WHERE id = ?", (q_id,))
-            conn.commit()
-            conn.close()
+        def on_done(result):
             messagebox.showinfo("Success", f"Question ID {q_id} deleted successfully!", parent=self.master)
-            # Refresh the view for the current course
-            self.show_questions_for_course()
-        except sqlite3.Error as e:
+            # Refresh the current page of the view for the course
+            self.show_questions_for_course(from_id=self.view_page_from)
+
+        def on_error(e):
             messagebox.showerror("Database Error", f"Failed to delete question ID {q_id}: {e}", parent=self.master)
 
+        self.run_query(lambda repo: repo.delete_question(course, q_id), on_done, on_error, interruptible=False)
+
 
     # --- Utility Methods ---
 
+    def run_query(self, fn, on_done, on_error, interruptible=True):
+        # Run fn(repo) on the DB worker and call on_done(result) or
+        # on_error(exception) back on the Tk thread. A screen waits on at most
+        # one query: starting another one, or leaving the screen, cancels it.
+        self.cancel_pending_query()
+
+        def timed(repo):
+            with self.timings.timed("db"):
+                return fn(repo)
+
+        def done(result):
+            self.pending_query = None
+            self.hide_loading()
+            on_done(result)
+
+        def failed(e):
+            self.pending_query = None
+            self.hide_loading()
+            on_error(e)
+
+        self.pending_query = self.db_executor.submit(timed, on_done=done, on_error=failed, interruptible=interruptible)
+
+    def run_with_progress(self, title, work, on_done, error_title):
+        # Long admin job (import/export) on the DB worker with a live progress
+        # label. work(repo, report) runs on the worker and calls report(text)
+        # as it goes; the Tk thread copies the latest text into the label.
+        self.clear_window()
+        ttk.Label(self.main_frame, text=title, style="Header.TLabel").pack(pady=20)
+        progress_label = ttk.Label(self.main_frame, text="Starting...", style="Body.TLabel")
+        progress_label.pack(pady=10)
+
+        progress = {"text": None}
+
+        def report(text):
+            progress["text"] = text
+
+        def update_progress():
+            if progress["text"]:
+                progress_label.config(text=progress["text"])
+
+        timer = self.scheduler.every(200, update_progress)
+
+        def done(result):
+            self.scheduler.cancel(timer)
+            on_done(result)
+
+        def failed(e):
+            self.scheduler.cancel(timer)
+            messagebox.showerror(error_title, str(e), parent=self.master)
+            self.show_admin_interface()
+
+        self.run_query(lambda repo: work(repo, report), done, failed, interruptible=False)
+
+    def cancel_pending_query(self):
+        if self.pending_query is not None:
+            self.pending_query.cancel()
+            self.pending_query = None
+
+    def show_loading(self, text="Loading..."):
+        self.hide_loading()
+        self.loading_label = ttk.Label(self.main_frame, text=text, style="Body.TLabel")
+        self.loading_label.pack(pady=10)
+
+    def hide_loading(self):
+        if self.loading_label is not None:
+            self.loading_label.destroy()
+            self.loading_label = None
+
+    def create_page_nav(self, parent, rows, has_prev, has_next, load_page):
+        # Prev/Next buttons and a "Go to ID" box for the paged admin lists.
+        # load_page is called with before_id=, after_id= or from_id=
+        self.use_styles("TEntry")
+        nav_frame = ttk.Frame(parent, style="TFrame")
+        nav_frame.pack(pady=5)
+
+        prev_button = ttk.Button(nav_frame, text="◀ Prev", style="TButton",
+                                 command=lambda: load_page(before_id=rows[0][0]))
+        prev_button.pack(side=tk.LEFT, padx=5)
+        if not has_prev:
+            prev_button.config(state="disabled")
+
+        if rows:
+            ttk.Label(nav_frame, text=f"IDs {rows[0][0]}-{rows[-1][0]}", style="Body.TLabel").pack(side=tk.LEFT, padx=5)
+
+        next_button = ttk.Button(nav_frame, text="Next ▶", style="TButton",
+                                 command=lambda: load_page(after_id=rows[-1][0]))
+        next_button.pack(side=tk.LEFT, padx=5)
+        if not has_next:
+            next_button.config(state="disabled")
+
+        def go_to_id(event=None):
+            id_text = id_entry.get().strip()
+            if not id_text.isdigit():
+                messagebox.showerror("Error", "Please enter a numeric question ID.", parent=self.master)
+                return
+            load_page(from_id=int(id_text))
+
+        ttk.Label(nav_frame, text="Go to ID:", style="Body.TLabel").pack(side=tk.LEFT, padx=(15, 5))
+        id_entry = ttk.Entry(nav_frame, style="TEntry", width=6)
+        id_entry.pack(side=tk.LEFT)
+        id_entry.bind("<Return>", go_to_id)
+        ttk.Button(nav_frame, text="Go", command=go_to_id, style="TButton").pack(side=tk.LEFT, padx=5)
+        return nav_frame
+
+    def create_virtual_list(self, parent, count, row_height, create_row, fill_row):
+        # Scrollable list like create_scrollable_frame, but only the rows in
+        # view have widgets, which are reused as the list scrolls
+        from virtual_list import VirtualList
+        virtual_list = VirtualList(parent, row_height, create_row, fill_row, bg=COLORS["bg"])
+        virtual_list.set_count(count)
+        return virtual_list
+
     def create_scrollable_frame(self, parent):
         # Use tk.Canvas and tk.Scrollbar as ttk versions aren't standard/needed here
         # Container frame to hold canvas and scrollbar
@@ -724,28 +1666,42 @@ class QuizApp:
 
 
 if __name__ == "__main__":
-    # Simple DB Initialization (Create tables if they don't exist)
-    def initialize_db():
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
-        for course in COURSES:
-            table_name = course.replace(" ", "_").lower()
-            cursor.execute(f"""
-                CREATE TABLE IF NOT EXISTS {table_name} (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    question TEXT NOT NULL,
-                    option_a TEXT NOT NULL,
-                    option_b TEXT NOT NULL,
-                    option_c TEXT NOT NULL,
-                    option_d TEXT NOT NULL,
-                    correct_answer TEXT NOT NULL CHECK(correct_answer IN ('A', 'B', 'C', 'D'))
-                )
-            """)
-        conn.commit()
-        conn.close()
-
-    initialize_db() # Ensure tables exist before starting app
+    parser = argparse.ArgumentParser(description="Quiz Bowl")
+    parser.add_argument("--server", metavar="HOST:PORT", help="Use a quiz server (quiz_server.py) instead of a local database")
+    parser.add_argument("--profile-startup", action="store_true", help="Print how long each startup phase takes")
+    parser.add_argument("--pack", metavar="FILE", help="Take every quiz from this quiz pack (quiz_pack.py)")
+    parser.add_argument("--timings", metavar="FILE", help="Write quiz timings here after each quiz and on exit (.json for JSON, else Prometheus text)")
+    args = parser.parse_args()
+    profiler = StartupProfiler(STARTED, enabled=args.profile_startup)
+    profiler.mark("imports and arguments")
+
+    if args.server:
+        # Client mode: the server owns the database (and its schema)
+        from remote import RemoteDatabase, parse_address
+        host, port = parse_address(args.server)
+        db = RemoteDatabase(host, port)
+    else:
+        # Nothing is opened yet; the schema is checked on the DB worker once
+        # the main menu is up (see QuizApp.check_schema)
+        db = Database(DB_FILE, cache=QuestionCache(), selectors=SelectorCache())
+
+    quiz_pack = None
+    if args.pack:
+        from quiz_pack import QuizPack, QuizPackError, pack_key
+        try:
+            quiz_pack = QuizPack(args.pack, key=pack_key())
+        except (OSError, QuizPackError) as e:
+            parser.error(str(e))
+        profiler.mark("quiz pack")
 
     root = tk.Tk()
-    app = QuizApp(root)
-    root.mainloop()
\ No newline at end of file
+    profiler.mark("tk root")
+    app = QuizApp(root, db, check_schema=not args.server, profiler=profiler, quiz_pack=quiz_pack,
+                  timings=QuizTimings(args.timings))
+    root.mainloop()
+    app.db_executor.shutdown()
+    app.answer_log.close()
+    app.timings.dump()
+    if app.quiz_pack is not None:
+        app.quiz_pack.close()
+    db.close()
@@ -0,0 +1,244 @@
+import argparse
+import socket
+import threading
+import time
+from collections import namedtuple
+
+from quiz_engine import OPTION_LETTERS
+from remote import DEFAULT_HOST
+
+# Buzzer-style quiz bowl match: several players, first to buzz answers.
+#
+# BuzzerArbiter decides who buzzed first. Every buzz carries a
+# time.perf_counter_ns() timestamp taken the moment it was seen (in the Tk
+# key handler, or in the network listener thread as the datagram arrives)
+# and the lockout is decided right there under a lock, without waiting for
+# the Tk event loop. So a network buzz locks the others out within
+# microseconds even while the window is busy redrawing; the screen catches
+# up on its next poll.
+#
+# BuzzerMatch is the game itself (questions, turns and scores) with no
+# tkinter dependency, like QuizEngine.
+#
+# Network buzzers use UDP on the local network. Each datagram is one command:
+#   JOIN <name>  -> "OK <name>" or "ERR <reason>"
+#   BUZZ <name>  -> "WON", "LATE" or "CLOSED"
+# A terminal buzzer: python match.py --server host:port --name Alice
+
+BUZZER_PORT = 8766
+CORRECT_POINTS = 10
+WRONG_POINTS = -5 # Quiz bowl "neg" for a wrong buzz
+MATCH_LENGTH = 20 # Questions per match
+
+# What happened to one buzz
+BuzzResult = namedtuple("BuzzResult", ["won", "player", "timestamp_ns", "latency_ns"])
+# Outcome of the buzzing player's answer
+MatchAnswer = namedtuple("MatchAnswer", ["player", "is_correct", "points", "correct_answer", "correct_text", "rebound"])
+
+
+class BuzzerArbiter:
+    # Thread-safe first-buzz arbitration for one question at a time
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._open = False
+        self._eligible = set()
+        self.winner = None
+        self.winner_timestamp_ns = None
+        self.latencies_ns = [] # Buzz timestamp -> lockout decided, for every winning buzz (arbitration time)
+
+    def open(self, players):
+        # Start accepting buzzes from `players`
+        with self._lock:
+            self._open = True
+            self._eligible = set(players)
+            self.winner = None
+            self.winner_timestamp_ns = None
+
+    def close(self):
+        with self._lock:
+            self._open = False
+
+    def buzz(self, player, timestamp_ns=None):
+        # Returns a BuzzResult; won is True only for the first eligible buzz
+        if timestamp_ns is None:
+            timestamp_ns = time.perf_counter_ns()
+        with self._lock:
+            if not self._open or self.winner is not None or player not in self._eligible:
+                return BuzzResult(False, player, timestamp_ns, None)
+            self.winner = player
+            self.winner_timestamp_ns = timestamp_ns
+            self._open = False # Everyone else is locked out from here on
+            latency = time.perf_counter_ns() - timestamp_ns
+            self.latencies_ns.append(latency)
+            return BuzzResult(True, player, timestamp_ns, latency)
+
+    def holds(self, result):
+        # Whether `result` is the winning buzz still waiting for its answer
+        # (False once it was answered, or the question changed)
+        with self._lock:
+            return self.winner == result.player and self.winner_timestamp_ns == result.timestamp_ns
+
+    @property
+    def is_open(self):
+        with self._lock:
+            return self._open
+
+
+class BuzzerMatch:
+    # One match: questions are (question, option_a, ..., correct_answer) tuples
+
+    def __init__(self, players, questions):
+        self.players = list(players)
+        self.questions = questions if hasattr(questions, "__getitem__") else list(questions)
+        self.scores = {player: 0 for player in self.players}
+        self.correct_counts = {player: 0 for player in self.players}
+        self.current = 0
+        self.locked_out = set() # Players who already answered this question wrong
+        self.arbiter = BuzzerArbiter()
+
+    @property
+    def total(self):
+        return len(self.questions)
+
+    @property
+    def finished(self):
+        return self.current >= len(self.questions)
+
+    @property
+    def question(self):
+        return self.questions[self.current]
+
+    @property
+    def question_number(self):
+        return self.current + 1
+
+    def options(self):
+        return list(zip(OPTION_LETTERS, self.question[1:5]))
+
+    def open_buzzers(self):
+        # Let everyone who hasn't answered this question wrong buzz
+        self.arbiter.open(player for player in self.players if player not in self.locked_out)
+
+    def buzz(self, player, timestamp_ns=None):
+        return self.arbiter.buzz(player, timestamp_ns)
+
+    def answer(self, selected_answer):
+        # The player who won the buzz answers. rebound is True if the others
+        # still get a chance at this question.
+        player = self.arbiter.winner
+        if player is None:
+            raise ValueError("Nobody has buzzed in.")
+        question = self.question
+        correct_answer = question[5]
+        is_correct = selected_answer == correct_answer
+        points = CORRECT_POINTS if is_correct else WRONG_POINTS
+        self.scores[player] += points
+        if is_correct:
+            self.correct_counts[player] += 1
+        else:
+            self.locked_out.add(player)
+        self.arbiter.winner = None
+        rebound = not is_correct and len(self.locked_out) < len(self.players)
+        correct_text = dict(zip(OPTION_LETTERS, question[1:5])).get(correct_answer, "N/A")
+        return MatchAnswer(player, is_correct, points, correct_answer, correct_text, rebound)
+
+    def next_question(self):
+        # Move on (also used to skip a question nobody buzzed on)
+        self.arbiter.close()
+        self.current += 1
+        self.locked_out = set()
+        return not self.finished
+
+    def standings(self):
+        # [(player, score, correct answers), ...], best first
+        return sorted(
+            ((player, self.scores[player], self.correct_counts[player]) for player in self.players),
+            key=lambda standing: standing[1], reverse=True
+        )
+
+
+class BuzzerListener:
+    # UDP listener for network buzzers. Runs on its own thread and buzzes
+    # straight into the match's arbiter; on_buzz(BuzzResult) and
+    # on_join(name) are called on that thread, so a Tk caller should hand
+    # them over through a queue.
+
+    def __init__(self, match, host="0.0.0.0", port=BUZZER_PORT, on_buzz=None, on_join=None):
+        self.match = match
+        self.on_buzz = on_buzz
+        self.on_join = on_join
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._sock.bind((host, port))
+        self.address = self._sock.getsockname()
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="buzzer-listener", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while self._running:
+            try:
+                data, sender = self._sock.recvfrom(512)
+            except OSError:
+                break
+            timestamp_ns = time.perf_counter_ns() # As close to arrival as we can get
+            command, _, name = data.decode("utf-8", "replace").strip().partition(" ")
+            command = command.upper()
+            if command == "BUZZ":
+                result = self.match.buzz(name, timestamp_ns)
+                reply = "WON" if result.won else ("LATE" if name in self.match.players else "CLOSED")
+                self._reply(reply, sender)
+                if result.won and self.on_buzz:
+                    self.on_buzz(result)
+            elif command == "JOIN":
+                if name in self.match.players:
+                    self._reply(f"OK {name}", sender)
+                    if self.on_join:
+                        self.on_join(name)
+                else:
+                    self._reply(f"ERR unknown player {name!r}", sender)
+            else:
+                self._reply("ERR unknown command", sender)
+
+    def _reply(self, text, sender):
+        try:
+            self._sock.sendto(text.encode("utf-8"), sender)
+        except OSError:
+            pass
+
+    def close(self):
+        self._running = False
+        self._sock.close()
+
+
+def main():
+    # Terminal buzzer for a match running on another machine
+    parser = argparse.ArgumentParser(description="Network buzzer for a Quiz Bowl match.")
+    parser.add_argument("--server", default=f"{DEFAULT_HOST}:{BUZZER_PORT}", help="Match host:port (default: %(default)s)")
+    parser.add_argument("--name", required=True, help="Your player name, as entered on the match screen")
+    args = parser.parse_args()
+
+    host, _, port = args.server.rpartition(":")
+    address = (host or DEFAULT_HOST, int(port or BUZZER_PORT))
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.settimeout(2.0)
+
+    def send(text):
+        sock.sendto(text.encode("utf-8"), address)
+        try:
+            return sock.recv(512).decode("utf-8")
+        except socket.timeout:
+            return "no reply"
+
+    print(send(f"JOIN {args.name}"))
+    print("Press Enter to buzz, Ctrl+C to quit.")
+    try:
+        while True:
+            input()
+            print(send(f"BUZZ {args.name}"))
+    except (KeyboardInterrupt, EOFError):
+        pass
+
+
+if __name__ == "__main__":
+    main()
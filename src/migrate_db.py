@@ -0,0 +1,38 @@
+import sqlite3
+import sys
+
+from migrations import LATEST_VERSION, migrate, schema_version
+from quiz_db import DB_FILE, course_table, legacy_tables
+
+# Bring a database up to the current schema by hand (the app and the quiz
+# server do this on their own at startup). Databases from the old
+# one-table-per-course layout are moved into the single `questions` table,
+# keeping question ids as they were in each course.
+# Usage: python migrate_db.py [path/to/quiz_bowl.db]
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else DB_FILE
+    conn = sqlite3.connect(path)
+    try:
+        version = schema_version(conn)
+        courses = legacy_tables(conn)
+        legacy_rows = sum(conn.execute(f"SELECT COUNT(*) FROM {course_table(course)}").fetchone()[0] for course in courses)
+        applied = migrate(conn)
+        moved = bool(courses) and not legacy_tables(conn)
+    except sqlite3.Error as e:
+        print(f"Migration failed, the database is still at schema version {schema_version(conn)}: {e}")
+        sys.exit(1)
+    finally:
+        conn.close()
+
+    if not applied:
+        print(f"Nothing to migrate: {path} is at the current schema version ({LATEST_VERSION}).")
+        return
+    for description in applied:
+        print(f"Applied: {description}")
+    if moved:
+        print(f"Migrated {legacy_rows} questions from {len(courses)} course tables into 'questions'.")
+    print(f"Schema version {version} -> {LATEST_VERSION}.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,327 @@
+import sqlite3
+
+from sampler import QUESTION_COLUMNS
+from quiz_db import COURSES, course_id, course_table, legacy_tables
+
+# Versioned schema migrations.
+#
+# The database records how many of MIGRATIONS it has had in PRAGMA
+# user_version. migrate() applies the missing ones in order, each in its own
+# transaction together with its version bump, so a migration runs exactly
+# once and a failure leaves the database at the last good version. When the
+# database is already current the whole check is one PRAGMA read.
+#
+# To change the schema (a new index, column or table), append a migration;
+# never edit or reorder one that has shipped. Migrations up to the first
+# versioned release use IF NOT EXISTS, because databases from before
+# versioning (user_version 0) already have some or all of their tables.
+#
+# migrate_db.py runs this by hand and prints what it applied.
+
+# One table for every course's questions.
+#   qid - global key, used by anything that needs one integer per question
+#   id  - per-course question id shown in the admin screens (kept from the
+#         old one-table-per-course layout, so it is only unique per course)
+QUESTIONS_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS courses (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL UNIQUE,
+        last_id INTEGER NOT NULL DEFAULT 0 -- highest per-course id handed out so far
+    );
+    CREATE TABLE IF NOT EXISTS questions (
+        qid INTEGER PRIMARY KEY AUTOINCREMENT,
+        course_id INTEGER NOT NULL REFERENCES courses(id),
+        id INTEGER NOT NULL,
+        question TEXT NOT NULL,
+        option_a TEXT NOT NULL,
+        option_b TEXT NOT NULL,
+        option_c TEXT NOT NULL,
+        option_d TEXT NOT NULL,
+        correct_answer TEXT NOT NULL CHECK(correct_answer IN ('A', 'B', 'C', 'D'))
+    );
+    -- Covers per-course lookups, id ranges and ordered listing (qid comes
+    -- along for free since it is the rowid)
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_questions_course_id ON questions (course_id, id);
+"""
+
+# Full-text index over question and option text for the admin search box.
+# An external-content FTS5 table (it stores only the index, the text stays in
+# `questions`), kept in sync by triggers so every write path updates it.
+SEARCH_SCHEMA = """
+    CREATE VIRTUAL TABLE IF NOT EXISTS questions_fts USING fts5(
+        question, option_a, option_b, option_c, option_d,
+        content = 'questions', content_rowid = 'qid',
+        tokenize = 'unicode61 remove_diacritics 2'
+    );
+    CREATE TRIGGER IF NOT EXISTS questions_fts_insert AFTER INSERT ON questions BEGIN
+        INSERT INTO questions_fts (rowid, question, option_a, option_b, option_c, option_d)
+        VALUES (new.qid, new.question, new.option_a, new.option_b, new.option_c, new.option_d);
+    END;
+    CREATE TRIGGER IF NOT EXISTS questions_fts_delete AFTER DELETE ON questions BEGIN
+        INSERT INTO questions_fts (questions_fts, rowid, question, option_a, option_b, option_c, option_d)
+        VALUES ('delete', old.qid, old.question, old.option_a, old.option_b, old.option_c, old.option_d);
+    END;
+    CREATE TRIGGER IF NOT EXISTS questions_fts_update AFTER UPDATE ON questions BEGIN
+        INSERT INTO questions_fts (questions_fts, rowid, question, option_a, option_b, option_c, option_d)
+        VALUES ('delete', old.qid, old.question, old.option_a, old.option_b, old.option_c, old.option_d);
+        INSERT INTO questions_fts (rowid, question, option_a, option_b, option_c, option_d)
+        VALUES (new.qid, new.question, new.option_a, new.option_b, new.option_c, new.option_d);
+    END;
+"""
+
+# Near-duplicate index (see similarity.py): each question's MinHash
+# signature and its LSH bucket in every band. Filled by the repository's
+# write paths; rows written some other way are indexed the next time a
+# duplicates report runs for their course.
+SIMILARITY_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS question_signatures (
+        qid INTEGER PRIMARY KEY,
+        signature BLOB NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS question_buckets (
+        course_id INTEGER NOT NULL,
+        band INTEGER NOT NULL,
+        bucket INTEGER NOT NULL,
+        qid INTEGER NOT NULL,
+        PRIMARY KEY (course_id, band, bucket, qid)
+    ) WITHOUT ROWID;
+    CREATE INDEX IF NOT EXISTS idx_question_buckets_qid ON question_buckets (qid);
+    -- A deleted or reworded question drops out of the index straight away
+    CREATE TRIGGER IF NOT EXISTS questions_similarity_delete AFTER DELETE ON questions BEGIN
+        DELETE FROM question_signatures WHERE qid = old.qid;
+        DELETE FROM question_buckets WHERE qid = old.qid;
+    END;
+    CREATE TRIGGER IF NOT EXISTS questions_similarity_update
+    AFTER UPDATE OF question, option_a, option_b, option_c, option_d ON questions BEGIN
+        DELETE FROM question_signatures WHERE qid = old.qid;
+        DELETE FROM question_buckets WHERE qid = old.qid;
+    END;
+"""
+
+# Answer statistics for adaptive selection (see adaptive.py): totals per
+# question over everyone, and per student and question
+STATS_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS question_stats (
+        qid INTEGER PRIMARY KEY,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        correct INTEGER NOT NULL DEFAULT 0
+    );
+    CREATE TABLE IF NOT EXISTS user_question_stats (
+        user TEXT NOT NULL,
+        qid INTEGER NOT NULL,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        correct INTEGER NOT NULL DEFAULT 0,
+        streak INTEGER NOT NULL DEFAULT 0, -- correct answers in a row, up to now
+        last_answered REAL,
+        PRIMARY KEY (user, qid)
+    ) WITHOUT ROWID;
+    CREATE INDEX IF NOT EXISTS idx_user_question_stats_qid ON user_question_stats (qid);
+    CREATE TRIGGER IF NOT EXISTS questions_stats_delete AFTER DELETE ON questions BEGIN
+        DELETE FROM question_stats WHERE qid = old.qid;
+        DELETE FROM user_question_stats WHERE qid = old.qid;
+    END;
+"""
+
+# Quiz attempts and every answer given in them (written by AnswerLog)
+ANSWER_LOG_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS quiz_attempts (
+        attempt_id TEXT PRIMARY KEY,
+        user TEXT,
+        courses TEXT NOT NULL, -- comma-separated course names
+        started_at REAL NOT NULL,
+        finished_at REAL,
+        score INTEGER,
+        total INTEGER NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS quiz_answers (
+        attempt_id TEXT NOT NULL,
+        qid INTEGER NOT NULL,
+        selected TEXT NOT NULL,
+        is_correct INTEGER NOT NULL,
+        answered_at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_quiz_answers_attempt ON quiz_answers (attempt_id);
+"""
+
+# Aggregates for the admin analytics screen, kept up to date as answers are
+# written (see QuestionRepository._update_answer_stats) so the screen reads
+# a few small tables however many answers have been logged:
+#   question_stats      - gains how often each option was picked, timeouts
+#                         and total response time
+#   course_stats        - answers and correct answers per course
+#   response_time_stats - answers per course and response-time bucket
+#                         (quiz_db.RESPONSE_TIME_BUCKETS_MS)
+# The partial index lists the hardest questions in order without sorting;
+# its 5 must match quiz_db.MIN_DIFFICULTY_ATTEMPTS.
+ANALYTICS_SCHEMA = """
+    ALTER TABLE quiz_answers ADD COLUMN response_ms INTEGER;
+    ALTER TABLE question_stats ADD COLUMN picked_a INTEGER NOT NULL DEFAULT 0;
+    ALTER TABLE question_stats ADD COLUMN picked_b INTEGER NOT NULL DEFAULT 0;
+    ALTER TABLE question_stats ADD COLUMN picked_c INTEGER NOT NULL DEFAULT 0;
+    ALTER TABLE question_stats ADD COLUMN picked_d INTEGER NOT NULL DEFAULT 0;
+    ALTER TABLE question_stats ADD COLUMN timed_out INTEGER NOT NULL DEFAULT 0;
+    ALTER TABLE question_stats ADD COLUMN timed_answers INTEGER NOT NULL DEFAULT 0; -- answers with a response time
+    ALTER TABLE question_stats ADD COLUMN response_ms_total INTEGER NOT NULL DEFAULT 0;
+    -- "attempts >= 5" is quiz_db.MIN_DIFFICULTY_ATTEMPTS
+    CREATE INDEX idx_question_stats_difficulty ON question_stats (CAST(correct AS REAL) / attempts) WHERE attempts >= 5;
+    CREATE TABLE course_stats (
+        course_id INTEGER PRIMARY KEY,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        correct INTEGER NOT NULL DEFAULT 0
+    );
+    CREATE TABLE response_time_stats (
+        course_id INTEGER NOT NULL,
+        bucket INTEGER NOT NULL,
+        answers INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (course_id, bucket)
+    ) WITHOUT ROWID;
+"""
+
+
+def run_script(conn, script):
+    # Like executescript(), but one statement at a time inside the caller's
+    # transaction (executescript() would commit it first)
+    statement = ""
+    for part in script.split(";"):
+        statement += part + ";"
+        if sqlite3.complete_statement(statement):
+            if statement.strip(" \n;"):
+                conn.execute(statement)
+            statement = ""
+
+
+def create_questions_tables(conn):
+    run_script(conn, QUESTIONS_SCHEMA)
+    conn.executemany(
+        "INSERT OR IGNORE INTO courses (id, name) VALUES (?, ?)",
+        [(course_id(course), course) for course in COURSES]
+    )
+
+
+def migrate_legacy_tables(conn):
+    # Move each old course table into `questions`, keeping its ids, then drop
+    # it. Call inside a transaction so a failure leaves the database
+    # untouched. Returns the number of questions moved.
+    courses = legacy_tables(conn)
+    if not courses:
+        return 0
+
+    has_sequence = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_sequence'"
+    ).fetchone() is not None
+
+    moved = 0
+    for course in courses:
+        table = course_table(course)
+        cursor = conn.execute(f"""
+            INSERT INTO questions (course_id, id, {QUESTION_COLUMNS})
+            SELECT ?, id, {QUESTION_COLUMNS} FROM {table} ORDER BY id
+        """, (course_id(course),))
+        moved += cursor.rowcount
+
+        # Keep AUTOINCREMENT behaviour: never hand out an id that was used before
+        last_id = conn.execute(f"SELECT COALESCE(MAX(id), 0) FROM {table}").fetchone()[0]
+        if has_sequence:
+            row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = ?", (table,)).fetchone()
+            if row:
+                last_id = max(last_id, row[0])
+        conn.execute(
+            "UPDATE courses SET last_id = MAX(last_id, ?) WHERE id = ?",
+            (last_id, course_id(course))
+        )
+        conn.execute(f"DROP TABLE {table}")
+    return moved
+
+
+def create_search_index(conn):
+    # Create the FTS5 index if it is missing and fill it from existing rows.
+    # Without FTS5 in this SQLite build the migration still counts as done
+    # and the admin search falls back to LIKE (QuestionRepository.has_search_index).
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'questions_fts'"
+    ).fetchone() is not None
+    if exists:
+        return
+    try:
+        run_script(conn, SEARCH_SCHEMA)
+    except sqlite3.OperationalError as e:
+        if "fts5" in str(e):
+            return
+        raise
+    conn.execute("INSERT INTO questions_fts (questions_fts) VALUES ('rebuild')")
+
+
+def add_answer_analytics(conn):
+    run_script(conn, ANALYTICS_SCHEMA)
+    # Fill the new aggregates from what has been recorded so far (once;
+    # response times weren't recorded before, so their histogram starts empty)
+    conn.execute("""
+        INSERT INTO course_stats (course_id, attempts, correct)
+        SELECT q.course_id, SUM(s.attempts), SUM(s.correct)
+        FROM question_stats AS s JOIN questions AS q ON q.qid = s.qid
+        GROUP BY q.course_id
+    """)
+    conn.execute("""
+        INSERT INTO question_stats (qid, picked_a, picked_b, picked_c, picked_d, timed_out)
+        SELECT qid, SUM(selected = 'A'), SUM(selected = 'B'), SUM(selected = 'C'), SUM(selected = 'D'), SUM(selected = '')
+        FROM quiz_answers WHERE qid IN (SELECT qid FROM question_stats)
+        GROUP BY qid
+        ON CONFLICT (qid) DO UPDATE SET
+            picked_a = excluded.picked_a, picked_b = excluded.picked_b,
+            picked_c = excluded.picked_c, picked_d = excluded.picked_d,
+            timed_out = excluded.timed_out
+    """)
+
+
+# (description, SQL script or function(conn)). The database's user_version
+# is the number of these it has had.
+MIGRATIONS = [
+    ("courses and questions tables", create_questions_tables),
+    ("move old per-course tables into questions", migrate_legacy_tables),
+    ("full-text search index", create_search_index),
+    ("near-duplicate index", SIMILARITY_SCHEMA),
+    ("answer statistics", STATS_SCHEMA),
+    ("quiz attempt log", ANSWER_LOG_SCHEMA),
+    ("answer analytics aggregates", add_answer_analytics),
+]
+LATEST_VERSION = len(MIGRATIONS)
+
+
+def schema_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn):
+    # Bring the database up to LATEST_VERSION. Returns the descriptions of
+    # the migrations applied (empty if it was already current).
+    version = schema_version(conn)
+    if version == LATEST_VERSION:
+        return []
+    if version > LATEST_VERSION:
+        raise sqlite3.DatabaseError(
+            f"Database schema version {version} is newer than this program supports ({LATEST_VERSION})."
+        )
+
+    applied = []
+    for number, (description, step) in enumerate(MIGRATIONS, start=1):
+        if number <= version:
+            continue
+        # IMMEDIATE takes the write lock up front, so two programs starting
+        # together can't both apply the same migration
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if schema_version(conn) >= number:
+                conn.rollback() # Someone else just did this one
+                continue
+            if callable(step):
+                step(conn)
+            else:
+                run_script(conn, step)
+            conn.execute(f"PRAGMA user_version = {number}")
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        applied.append(description)
+    return applied
+
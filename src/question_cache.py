@@ -0,0 +1,217 @@
+import bisect
+import random
+import sys
+import threading
+from array import array
+from collections import OrderedDict
+
+from question_store import CompactQuestionStore
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024 # 64 MB for all cached courses together
+
+
+class CourseBank:
+    # All questions of one course: qids in ascending order and a
+    # CompactQuestionStore in the same order. Rows are sampled by position and
+    # found by qid with a binary search, so the bank costs 8 bytes per
+    # question on top of the store (a qid -> position dict would be ~100).
+    # New questions get the highest qid, so adding one is an append; removing
+    # one shifts the arrays after it (a memmove).
+
+    __slots__ = ("ids", "rows")
+
+    def __init__(self):
+        self.ids = array("q") # qids, ascending
+        self.rows = CompactQuestionStore()
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def nbytes(self):
+        return self.rows.nbytes + sys.getsizeof(self.ids)
+
+    def _position(self, qid):
+        position = bisect.bisect_left(self.ids, qid)
+        if position < len(self.ids) and self.ids[position] == qid:
+            return position
+        return None
+
+    def get(self, qid):
+        position = self._position(qid)
+        return self.rows[position] if position is not None else None
+
+    def add(self, q_id, row):
+        position = bisect.bisect_left(self.ids, q_id)
+        if position == len(self.ids):
+            self.ids.append(q_id)
+            self.rows.append(row)
+        elif self.ids[position] == q_id:
+            self.rows.set(position, row)
+        else:
+            self.ids.insert(position, q_id)
+            self.rows.insert(position, row)
+
+    def update(self, q_id, row):
+        position = self._position(q_id)
+        if position is not None:
+            self.rows.set(position, row)
+
+    def remove(self, q_id):
+        position = self._position(q_id)
+        if position is None:
+            return
+        del self.ids[position]
+        self.rows.remove(position)
+
+
+class QuestionCache:
+    # Process-level cache of whole course banks, so back-to-back quizzes
+    # don't touch SQLite. Courses are evicted least-recently-used first once
+    # the total size goes over max_bytes; a course that would not fit on its
+    # own is remembered as too big and always sampled from SQLite instead.
+    #
+    # The repository keeps it current on its own writes. Changes made by
+    # other processes (e.g. the import script) are not seen until the course
+    # is invalidated or the app restarts.
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._banks = OrderedDict() # course -> CourseBank, least recently used first
+        self._too_big = set()
+        self._generations = {} # course -> count of writes seen, to spot loads that raced a write
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def nbytes(self):
+        with self._lock:
+            return sum(bank.nbytes for bank in self._banks.values())
+
+    def get(self, course):
+        with self._lock:
+            bank = self._banks.get(course)
+            if bank is not None:
+                self._banks.move_to_end(course)
+                self.hits += 1
+            else:
+                self.misses += 1
+            return bank
+
+    def is_too_big(self, course):
+        with self._lock:
+            return course in self._too_big
+
+    def load(self, course, chunks):
+        # Build a bank from chunks of (qid, question, ..., correct_answer) rows.
+        # Stops reading as soon as the course can't fit. Returns the bank or None.
+        with self._lock:
+            # setdefault so that invalidate() of everything also sees this course
+            generation = self._generations.setdefault(course, 0)
+        bank = CourseBank()
+        for chunk in chunks:
+            for row in chunk:
+                bank.add(row[0], row[1:])
+            if bank.nbytes > self.max_bytes:
+                with self._lock:
+                    self._too_big.add(course)
+                return None
+
+        with self._lock:
+            if self._generations.get(course, 0) != generation:
+                # A write landed while we were reading; try again next time
+                return None
+            self._banks[course] = bank
+            self._banks.move_to_end(course)
+            self._evict(keep=course)
+        return bank
+
+    def _evict(self, keep):
+        total = sum(bank.nbytes for bank in self._banks.values())
+        for course in list(self._banks):
+            if total <= self.max_bytes:
+                break
+            if course != keep:
+                total -= self._banks.pop(course).nbytes
+
+    def lookup(self, courses, qids):
+        # [(qid, row), ...] for qids from the given cached courses, in order.
+        # Returns None if a course isn't cached or a qid isn't in any of them.
+        with self._lock:
+            banks = [self._banks.get(course) for course in courses]
+            if any(bank is None for bank in banks):
+                return None
+            for course in courses:
+                self._banks.move_to_end(course)
+            rows = []
+            for qid in qids:
+                for bank in banks:
+                    row = bank.get(qid)
+                    if row is not None:
+                        rows.append((qid, row))
+                        break
+                else:
+                    return None
+            return rows
+
+    def sample(self, courses, n, rng=random):
+        # n random rows across the given cached courses, each row equally
+        # likely. Returns None if any of the courses isn't cached.
+        with self._lock:
+            banks = [self._banks.get(course) for course in courses]
+            if any(bank is None for bank in banks):
+                return None
+            for course in courses:
+                self._banks.move_to_end(course)
+
+            total = sum(len(bank) for bank in banks)
+            picks = rng.sample(range(total), min(n, total))
+            rows = []
+            for pick in picks:
+                for bank in banks:
+                    if pick < len(bank):
+                        rows.append(bank.rows[pick])
+                        break
+                    pick -= len(bank)
+            return rows
+
+    # --- Updates from the repository's write paths ---
+
+    def _touch(self, course):
+        self._generations[course] = self._generations.get(course, 0) + 1
+
+    def add(self, course, q_id, row):
+        with self._lock:
+            self._touch(course)
+            bank = self._banks.get(course)
+            if bank is not None:
+                bank.add(q_id, row)
+                self._evict(keep=course)
+
+    def update(self, course, q_id, row):
+        with self._lock:
+            self._touch(course)
+            bank = self._banks.get(course)
+            if bank is not None:
+                bank.update(q_id, row)
+
+    def remove(self, course, q_id):
+        with self._lock:
+            self._touch(course)
+            bank = self._banks.get(course)
+            if bank is not None:
+                bank.remove(q_id)
+
+    def invalidate(self, course=None):
+        # Drop one course (or everything); it is reloaded on next use
+        with self._lock:
+            if course is None:
+                for cached in set(self._banks) | set(self._generations):
+                    self._touch(cached)
+                self._banks.clear()
+                self._too_big.clear()
+            else:
+                self._touch(course)
+                self._banks.pop(course, None)
+                self._too_big.discard(course)
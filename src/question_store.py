@@ -0,0 +1,137 @@
+import sys
+from array import array
+
+OPTION_COUNT = 4
+TEXTS_PER_ROW = 1 + OPTION_COUNT # question + options A-D
+
+
+class CompactQuestionStore:
+    # Compact storage for large question pools.
+    #
+    # Instead of a tuple of six Python strings per question (several hundred
+    # bytes of object overhead each), every question's text lives in one
+    # shared UTF-8 buffer:
+    #   _text    - bytearray; each row's question and options A-D back to back
+    #   _starts  - array of one buffer offset per row
+    #   _lengths - array of five byte lengths per row
+    #   _answers - bytearray of one byte per row (b"A", b"B", b"C" or b"D")
+    # That is about 29 bytes of overhead per question on top of the text.
+    #
+    # Indexing returns the usual (question, option_a, option_b, option_c,
+    # option_d, correct_answer) tuple, decoded on demand, so a store can be
+    # used anywhere a list of question tuples is (e.g. QuizEngine).
+
+    __slots__ = ("_text", "_starts", "_lengths", "_answers", "_garbage")
+
+    def __init__(self, rows=()):
+        self._text = bytearray()
+        self._starts = array("q")
+        self._lengths = array("I")
+        self._answers = bytearray()
+        self._garbage = 0 # Bytes of text no row points at any more
+        self.extend(rows)
+
+    def __len__(self):
+        return len(self._starts)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        return (*self.texts(index), self.correct_answer(index))
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def texts(self, index):
+        # [question, option_a, option_b, option_c, option_d]
+        position = self._starts[index]
+        base = index * TEXTS_PER_ROW
+        texts = []
+        for length in self._lengths[base:base + TEXTS_PER_ROW]:
+            texts.append(self._text[position:position + length].decode("utf-8"))
+            position += length
+        return texts
+
+    def correct_answer(self, index):
+        return chr(self._answers[index])
+
+    def _encode(self, row):
+        encoded = [str(text).encode("utf-8") for text in row[:TEXTS_PER_ROW]]
+        answer = str(row[TEXTS_PER_ROW]).encode("ascii")
+        if len(answer) != 1:
+            raise ValueError(f"Correct answer must be a single letter, got {row[TEXTS_PER_ROW]!r}")
+        return encoded, answer[0]
+
+    def append(self, row):
+        encoded, answer = self._encode(row)
+        self._starts.append(len(self._text))
+        self._lengths.extend(len(text) for text in encoded)
+        for text in encoded:
+            self._text += text
+        self._answers.append(answer)
+
+    def extend(self, rows):
+        for row in rows:
+            self.append(row)
+
+    def set(self, index, row):
+        # Replace a row. The new text goes at the end of the buffer; the old
+        # text is left behind as garbage until the next compact().
+        encoded, answer = self._encode(row)
+        self._garbage += self._row_bytes(index)
+        self._starts[index] = len(self._text)
+        base = index * TEXTS_PER_ROW
+        self._lengths[base:base + TEXTS_PER_ROW] = array("I", (len(text) for text in encoded))
+        for text in encoded:
+            self._text += text
+        self._answers[index] = answer
+        self._maybe_compact()
+
+    def insert(self, index, row):
+        # Insert a row before `index`, keeping the order of the others. The
+        # per-row arrays shift in C (a memmove), the text is appended.
+        encoded, answer = self._encode(row)
+        self._starts.insert(index, len(self._text))
+        base = index * TEXTS_PER_ROW
+        self._lengths[base:base] = array("I", (len(text) for text in encoded))
+        for text in encoded:
+            self._text += text
+        self._answers.insert(index, answer)
+
+    def remove(self, index):
+        # Remove a row, keeping the order of the others (O(n) memmove)
+        self._garbage += self._row_bytes(index)
+        del self._starts[index]
+        base = index * TEXTS_PER_ROW
+        del self._lengths[base:base + TEXTS_PER_ROW]
+        del self._answers[index]
+        self._maybe_compact()
+
+    def _row_bytes(self, index):
+        base = index * TEXTS_PER_ROW
+        return sum(self._lengths[base:base + TEXTS_PER_ROW])
+
+    def _maybe_compact(self):
+        if self._garbage > 64 * 1024 and self._garbage > len(self._text) // 2:
+            self.compact()
+
+    def compact(self):
+        # Rewrite the text buffer without the garbage left by set() and remove()
+        text = bytearray()
+        for index in range(len(self)):
+            start = self._starts[index]
+            self._starts[index] = len(text)
+            text += self._text[start:start + self._row_bytes(index)]
+        self._text = text
+        self._garbage = 0
+
+    @property
+    def nbytes(self):
+        # Memory held by the store's buffers
+        return (
+            sys.getsizeof(self._text) + sys.getsizeof(self._starts)
+            + sys.getsizeof(self._lengths) + sys.getsizeof(self._answers)
+        )
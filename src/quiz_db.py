@@ -0,0 +1,804 @@
+import bisect
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from sampler import QUESTION_COLUMNS, fetch_questions_with_ids, sample_question_ids, sample_questions
+from adaptive import AdaptiveSelector, RandomSelector
+from similarity import DEFAULT_THRESHOLD, band_keys, estimate_similarity, pack_signature, signature, unpack_signature
+
+DB_FILE = "quiz_bowl.db"
+COURSES = [
+    "Computer Applications",
+    "Business Law",
+    "Managerial Finance",
+    "Database Management",
+    "Business Analytics"
+]
+
+# Pragmas applied to every connection we open
+PRAGMAS = [
+    "PRAGMA journal_mode = WAL",      # Readers don't block the writer (and vice versa)
+    "PRAGMA synchronous = NORMAL",    # Safe with WAL, avoids an fsync per commit
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -8000",      # ~8 MB page cache per connection
+    "PRAGMA busy_timeout = 5000",     # Wait for locks instead of failing straight away
+    "PRAGMA foreign_keys = ON",
+]
+# Size of each connection's prepared statement cache (sqlite3 keys it by SQL text)
+STATEMENT_CACHE_SIZE = 128
+# Rows per page in the admin browsing screens
+PAGE_SIZE = 50
+
+# The schema itself is created and upgraded by migrations.py
+
+# Most stored questions a near-duplicate check compares against
+MAX_SIMILAR_CANDIDATES = 1000
+# In the duplicates report each question in an LSH bucket is compared with at
+# most this many of the bucket's other questions. Only matters for huge
+# buckets (boilerplate shared by thousands of questions), which would
+# otherwise need millions of comparisons; real near-duplicates share several
+# buckets, so they are still very likely to be compared in one of them.
+BUCKET_COMPARE_WINDOW = 100
+SIGNATURE_CHUNK = 500 # qids per query when reading a bucket's signatures
+
+# bm25 column weights: a hit in the question counts more than one in an option
+SEARCH_WEIGHTS = (4.0, 1.0, 1.0, 1.0, 1.0)
+# Analytics: upper bounds (ms) of the response-time histogram buckets; the
+# last bucket holds everything slower
+RESPONSE_TIME_BUCKETS_MS = [1000, 2000, 3000, 5000, 10000, 20000, 30000, 60000]
+# Answers a question needs before it is ranked by difficulty (the partial
+# index in migrations.py uses the same number; changing it needs a migration)
+MIN_DIFFICULTY_ATTEMPTS = 5
+ANALYTICS_QUESTIONS = 20 # Hardest questions shown
+
+
+def course_id(course):
+    # Course ids follow the order of COURSES, starting at 1
+    return COURSES.index(course) + 1
+
+
+def course_table(course):
+    # Name of the old per-course table: "Business Law" -> "business_law"
+    return course.replace(" ", "_").lower()
+
+
+def search_expression(text):
+    # Turn what the admin typed into an FTS5 query: every word must match,
+    # as a prefix, so "depreci bond" finds "depreciation of bonds". Quoting
+    # each word keeps FTS5 operators and punctuation from being parsed.
+    words = text.split()
+    return " ".join('"' + word.replace('"', '""') + '"*' for word in words)
+
+
+def like_patterns(text):
+    # One LIKE pattern per word for the fallback search, with % and _ escaped
+    return ["%" + word.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%" for word in text.split()]
+
+
+def response_bucket(response_ms):
+    # Index into RESPONSE_TIME_BUCKETS_MS (len() for slower answers)
+    return bisect.bisect_right(RESPONSE_TIME_BUCKETS_MS, response_ms)
+
+
+def legacy_tables(conn):
+    # Old one-table-per-course tables that still exist in this database
+    existing = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    return [course for course in COURSES if course_table(course) in existing]
+
+
+class Database:
+    # Owns one long-lived connection for the Tk (UI) thread plus a small pool
+    # of connections that background workers can borrow.
+
+    def __init__(self, path=DB_FILE, pool_size=2, cache=None, selectors=None):
+        self.path = path
+        self.pool_size = pool_size
+        # Optional QuestionCache shared by every repository on this database
+        self.cache = cache
+        # Optional adaptive.SelectorCache, so students' selectors outlive a quiz
+        self.selectors = selectors
+        self._ui_conn = None
+        self._pool = []
+        self._pool_lock = threading.Lock()
+        self._pool_sem = threading.BoundedSemaphore(pool_size) if pool_size > 0 else None
+
+    def _open(self, check_same_thread=True):
+        conn = sqlite3.connect(
+            self.path,
+            cached_statements=STATEMENT_CACHE_SIZE,
+            check_same_thread=check_same_thread,
+        )
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    @property
+    def connection(self):
+        # The UI connection is opened lazily on first use and then kept open
+        if self._ui_conn is None:
+            self._ui_conn = self._open()
+        return self._ui_conn
+
+    @contextmanager
+    def pooled(self):
+        # Borrow a worker connection; blocks if all pool_size are in use
+        if self._pool_sem is None:
+            raise RuntimeError("This Database was created without a worker pool.")
+        self._pool_sem.acquire()
+        try:
+            with self._pool_lock:
+                conn = self._pool.pop() if self._pool else None
+            if conn is None:
+                conn = self._open(check_same_thread=False)
+            try:
+                yield conn
+            finally:
+                with self._pool_lock:
+                    self._pool.append(conn)
+        finally:
+            self._pool_sem.release()
+
+    def repository(self, conn=None):
+        # Repository bound to conn (e.g. a pooled one), or to the UI connection
+        return QuestionRepository(self, conn)
+
+    def login(self, password):
+        # Admin rights only matter on a quiz server (see remote.RemoteDatabase)
+        pass
+
+    def close(self):
+        if self._ui_conn is not None:
+            self._ui_conn.close()
+            self._ui_conn = None
+        with self._pool_lock:
+            for conn in self._pool:
+                conn.close()
+            self._pool = []
+
+
+class QuestionRepository:
+    # All question bank queries the screens need. Methods raise sqlite3.Error
+    # on failure so callers can keep their existing error dialogs.
+
+    def __init__(self, db, conn=None):
+        self.db = db
+        # A repository can also be bound to a specific (e.g. pooled) connection
+        self._conn = conn
+
+    @property
+    def conn(self):
+        return self._conn if self._conn is not None else self.db.connection
+
+    @property
+    def cache(self):
+        return self.db.cache if self.db is not None else None
+
+    @property
+    def selectors(self):
+        return self.db.selectors if self.db is not None else None
+
+    def sample_questions(self, courses, n):
+        cache = self.cache
+        if cache is not None and self.warm_cache(courses):
+            rows = cache.sample(courses, n)
+            if rows is not None:
+                return rows
+        # One indexed query over `questions` no matter how many courses are picked
+        return sample_questions(self.conn.cursor(), [course_id(course) for course in courses], n)
+
+    def warm_cache(self, courses):
+        # Load any of `courses` missing from the cache. Returns True if all of
+        # them are now cached (False if there is no cache or one is too big).
+        cache = self.cache
+        if cache is None:
+            return False
+        all_cached = True
+        for course in courses:
+            if cache.get(course) is not None:
+                continue
+            if cache.is_too_big(course):
+                all_cached = False
+                continue
+            if cache.load(course, self._iter_cache_rows(course)) is None:
+                all_cached = False
+        return all_cached
+
+    def _iter_cache_rows(self, course, chunk_size=5000):
+        # Chunks of (qid, question, ..., correct_answer) rows for QuestionCache.load,
+        # in qid order so the bank's qids are appended already sorted
+        cursor = self.conn.execute(
+            f"SELECT qid, {QUESTION_COLUMNS} FROM questions WHERE course_id = ? ORDER BY qid",
+            (course_id(course),)
+        )
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield rows
+
+    def fetch_questions_with_ids(self, qids, courses=None):
+        # [(qid, row), ...] in the order of qids. Given the courses the qids
+        # come from, rows are served from the question cache when it has them.
+        cache = self.cache
+        if cache is not None and courses and self.warm_cache(courses):
+            rows = cache.lookup(courses, qids)
+            if rows is not None:
+                return rows
+        return fetch_questions_with_ids(self.conn.cursor(), qids)
+
+    def question_ids(self, courses, n=None):
+        # qids of n random questions from `courses`, or of every one of them
+        # (in course then id order) when n is None
+        course_ids = [course_id(course) for course in courses]
+        if n is not None:
+            return sample_question_ids(self.conn.cursor(), course_ids, n)
+        placeholders = ", ".join("?" * len(course_ids))
+        cursor = self.conn.execute(
+            f"SELECT qid FROM questions WHERE course_id IN ({placeholders}) ORDER BY course_id, id",
+            course_ids
+        )
+        return [row[0] for row in cursor]
+
+    # --- Answer statistics ---
+
+    def adaptive_selector(self, user, courses):
+        # Selector to pick a quiz for `user` (None for an anonymous student)
+        if user is None:
+            return RandomSelector(self, courses)
+        if self.selectors is not None:
+            return self.selectors.get(self, user, courses)
+        return AdaptiveSelector.from_repository(self, user, courses)
+
+    def selection_base_stats(self, courses):
+        # (qid, attempts, correct) for every question in `courses`, in qid
+        # order, for building a SelectionBase
+        placeholders = ", ".join("?" * len(courses))
+        cursor = self.conn.execute(f"""
+            SELECT q.qid, COALESCE(s.attempts, 0), COALESCE(s.correct, 0)
+            FROM questions AS q
+            LEFT JOIN question_stats AS s ON s.qid = q.qid
+            WHERE q.course_id IN ({placeholders})
+            ORDER BY q.qid
+        """, [course_id(course) for course in courses])
+        while True:
+            rows = cursor.fetchmany(5000)
+            if not rows:
+                break
+            yield from rows
+
+    def user_history(self, user):
+        # (qid, attempts, streak) for every question `user` has answered
+        # (a range of the table's primary key)
+        if user is None:
+            return []
+        return self.conn.execute(
+            "SELECT qid, attempts, streak FROM user_question_stats WHERE user = ?", (user,)
+        ).fetchall()
+
+    def _update_answer_stats(self, answers):
+        # answers: [(user, qid, selected, is_correct, answered_at, response_ms), ...].
+        # Runs inside the caller's transaction. selected is "" for a
+        # timeout; response_ms is None when the answer wasn't timed.
+        # Per-student rows are skipped for anonymous students (user=None).
+        self.conn.executemany("""
+            INSERT INTO question_stats (qid, attempts, correct, picked_a, picked_b, picked_c, picked_d,
+                                        timed_out, timed_answers, response_ms_total)
+            VALUES (?, 1, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (qid) DO UPDATE SET
+                attempts = attempts + 1,
+                correct = correct + excluded.correct,
+                picked_a = picked_a + excluded.picked_a,
+                picked_b = picked_b + excluded.picked_b,
+                picked_c = picked_c + excluded.picked_c,
+                picked_d = picked_d + excluded.picked_d,
+                timed_out = timed_out + excluded.timed_out,
+                timed_answers = timed_answers + excluded.timed_answers,
+                response_ms_total = response_ms_total + excluded.response_ms_total
+        """, [
+            (qid, int(is_correct), int(selected == "A"), int(selected == "B"), int(selected == "C"),
+             int(selected == "D"), int(selected == ""), int(response_ms is not None), response_ms or 0)
+            for _, qid, selected, is_correct, _, response_ms in answers
+        ])
+        self.conn.executemany("""
+            INSERT INTO course_stats (course_id, attempts, correct)
+            SELECT course_id, 1, ? FROM questions WHERE qid = ?
+            ON CONFLICT (course_id) DO UPDATE SET
+                attempts = attempts + 1,
+                correct = correct + excluded.correct
+        """, [(int(is_correct), qid) for _, qid, _, is_correct, _, _ in answers])
+        self.conn.executemany("""
+            INSERT INTO response_time_stats (course_id, bucket, answers)
+            SELECT course_id, ?, 1 FROM questions WHERE qid = ?
+            ON CONFLICT (course_id, bucket) DO UPDATE SET answers = answers + 1
+        """, [
+            (response_bucket(response_ms), qid)
+            for _, qid, _, _, _, response_ms in answers if response_ms is not None
+        ])
+        self.conn.executemany("""
+            INSERT INTO user_question_stats (user, qid, attempts, correct, streak, last_answered)
+            VALUES (?, ?, 1, ?, ?, ?)
+            ON CONFLICT (user, qid) DO UPDATE SET
+                attempts = attempts + 1,
+                correct = correct + excluded.correct,
+                streak = CASE WHEN excluded.correct THEN streak + 1 ELSE 0 END,
+                last_answered = excluded.last_answered
+        """, [
+            (user, qid, int(is_correct), int(is_correct), answered_at)
+            for user, qid, _, is_correct, answered_at, _ in answers if user is not None
+        ])
+
+    def write_answer_log(self, started, answers, finished):
+        # One batch from AnswerLog, in a single transaction:
+        #   started  - [(attempt_id, user, courses, started_at, total), ...]
+        #   answers  - [(attempt_id, user, qid, selected, is_correct, answered_at, response_ms), ...]
+        #   finished - [(attempt_id, score, finished_at), ...]
+        with self.conn:
+            self.conn.executemany("""
+                INSERT OR IGNORE INTO quiz_attempts (attempt_id, user, courses, started_at, total)
+                VALUES (?, ?, ?, ?, ?)
+            """, started)
+            self.conn.executemany("""
+                INSERT INTO quiz_answers (attempt_id, qid, selected, is_correct, answered_at, response_ms)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, [(attempt_id, qid, selected, int(is_correct), answered_at, response_ms)
+                  for attempt_id, _, qid, selected, is_correct, answered_at, response_ms in answers])
+            self._update_answer_stats([answer[1:] for answer in answers])
+            self.conn.executemany(
+                "UPDATE quiz_attempts SET score = ?, finished_at = ? WHERE attempt_id = ?",
+                [(score, finished_at, attempt_id) for attempt_id, score, finished_at in finished]
+            )
+        if self.selectors is not None and answers:
+            self.selectors.record([(user, qid, bool(is_correct)) for _, user, qid, _, is_correct, _, _ in answers])
+
+    def answer_analytics(self, course=None, limit=ANALYTICS_QUESTIONS):
+        # Figures for the analytics screen, all read from the aggregate tables
+        # kept up to date by _update_answer_stats, so the cost doesn't grow
+        # with the number of recorded answers. course=None means every course.
+        #   courses        - [(course, attempts, correct), ...]
+        #   response_times - answers per RESPONSE_TIME_BUCKETS_MS bucket (plus one slower)
+        #   hardest        - [(course, id, question, correct_answer, attempts, correct,
+        #                      picked_a, picked_b, picked_c, picked_d, timed_out,
+        #                      average_ms or None), ...], lowest accuracy first
+        course_filter, params = "", ()
+        if course is not None:
+            course_filter, params = "AND q.course_id = ?", (course_id(course),)
+
+        courses = [
+            (COURSES[cid - 1], attempts, correct)
+            for cid, attempts, correct in self.conn.execute(
+                "SELECT course_id, attempts, correct FROM course_stats ORDER BY course_id"
+            )
+            if course is None or COURSES[cid - 1] == course
+        ]
+
+        response_times = [0] * (len(RESPONSE_TIME_BUCKETS_MS) + 1)
+        bucket_filter = "WHERE course_id = ?" if course is not None else ""
+        for bucket, answers in self.conn.execute(
+            f"SELECT bucket, SUM(answers) FROM response_time_stats {bucket_filter} GROUP BY bucket", params
+        ):
+            response_times[bucket] = answers
+
+        # Walks idx_question_stats_difficulty in order and stops after `limit` rows
+        hardest = [
+            (COURSES[row[0] - 1], *row[1:]) for row in self.conn.execute(f"""
+                SELECT q.course_id, q.id, q.question, q.correct_answer, s.attempts, s.correct,
+                       s.picked_a, s.picked_b, s.picked_c, s.picked_d, s.timed_out,
+                       s.response_ms_total / NULLIF(s.timed_answers, 0)
+                FROM question_stats AS s JOIN questions AS q ON q.qid = s.qid
+                WHERE s.attempts >= {MIN_DIFFICULTY_ATTEMPTS} {course_filter}
+                ORDER BY CAST(s.correct AS REAL) / s.attempts
+                LIMIT ?
+            """, (*params, limit))
+        ]
+        return {"courses": courses, "response_times": response_times, "hardest": hardest}
+
+    # --- Paged browsing ---
+    # Keyset pagination on the (course_id, id) index: every page is an index
+    # seek plus `limit` rows, however deep into the bank it is. Each call
+    # returns (rows, has_prev, has_next).
+    #   after_id  - page of ids greater than after_id (Next)
+    #   before_id - page of ids less than before_id (Prev)
+    #   from_id   - page starting at from_id (jump straight to an id)
+    # With none of them given the first page is returned.
+
+    def page_question_titles(self, course, after_id=None, before_id=None, from_id=None, limit=PAGE_SIZE):
+        return self._page("id, question", course, after_id, before_id, from_id, limit)
+
+    def page_questions(self, course, after_id=None, before_id=None, from_id=None, limit=PAGE_SIZE):
+        return self._page(f"id, {QUESTION_COLUMNS}", course, after_id, before_id, from_id, limit)
+
+    def _page(self, columns, course, after_id, before_id, from_id, limit):
+        c_id = course_id(course)
+        if before_id is not None:
+            cursor = self.conn.execute(
+                f"SELECT {columns} FROM questions WHERE course_id = ? AND id < ? ORDER BY id DESC LIMIT ?",
+                (c_id, before_id, limit)
+            )
+            rows = cursor.fetchall()
+            rows.reverse()
+        else:
+            if from_id is not None:
+                condition, start = "id >= ?", from_id
+            else:
+                condition, start = "id > ?", after_id if after_id is not None else 0
+            cursor = self.conn.execute(
+                f"SELECT {columns} FROM questions WHERE course_id = ? AND {condition} ORDER BY id LIMIT ?",
+                (c_id, start, limit)
+            )
+            rows = cursor.fetchall()
+            if not rows and from_id is not None:
+                # Jumped past the last id: show the last page instead
+                return self._page(columns, course, None, from_id, None, limit)
+
+        if not rows:
+            return rows, False, False
+        has_prev = self._exists("course_id = ? AND id < ?", (c_id, rows[0][0]))
+        has_next = self._exists("course_id = ? AND id > ?", (c_id, rows[-1][0]))
+        return rows, has_prev, has_next
+
+    def _exists(self, condition, params):
+        cursor = self.conn.execute(f"SELECT EXISTS(SELECT 1 FROM questions WHERE {condition})", params)
+        return bool(cursor.fetchone()[0])
+
+    def has_search_index(self):
+        # False when this SQLite build has no FTS5 (the migration then skips the index)
+        return self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'questions_fts'"
+        ).fetchone() is not None
+
+    def search_questions(self, text, limit=PAGE_SIZE, courses=None):
+        # Best matches for `text` across all courses (or just `courses`),
+        # ranked by bm25. Returns [(course, id, question), ...].
+        expression = search_expression(text)
+        if not expression:
+            return []
+        if not self.has_search_index():
+            return self._search_questions_like(text, limit, courses)
+        weights = ", ".join(str(weight) for weight in SEARCH_WEIGHTS)
+        sql = """
+            SELECT q.course_id, q.id, q.question
+            FROM questions_fts
+            JOIN questions AS q ON q.qid = questions_fts.rowid
+            WHERE questions_fts MATCH ?
+        """
+        params = [expression]
+        if courses:
+            sql += f" AND q.course_id IN ({', '.join('?' * len(courses))})"
+            params += [course_id(course) for course in courses]
+        sql += f" ORDER BY bm25(questions_fts, {weights}) LIMIT ?"
+        params.append(limit)
+        cursor = self.conn.execute(sql, params)
+        return [(COURSES[c_id - 1], q_id, question) for c_id, q_id, question in cursor]
+
+    def _search_questions_like(self, text, limit, courses):
+        # Without FTS5: every word must appear (as a substring, ASCII case
+        # folded) in the question or an option. A full scan, in course and
+        # id order rather than by relevance.
+        conditions = []
+        params = []
+        for pattern in like_patterns(text):
+            conditions.append("(" + " OR ".join(
+                f"{column} LIKE ? ESCAPE '\\'" for column in QUESTION_COLUMNS.split(", ")[:5]
+            ) + ")")
+            params += [pattern] * 5
+        if courses:
+            conditions.append(f"course_id IN ({', '.join('?' * len(courses))})")
+            params += [course_id(course) for course in courses]
+        cursor = self.conn.execute(f"""
+            SELECT course_id, id, question FROM questions
+            WHERE {" AND ".join(conditions)}
+            ORDER BY course_id, id LIMIT ?
+        """, (*params, limit))
+        return [(COURSES[c_id - 1], q_id, question) for c_id, q_id, question in cursor]
+
+    def iter_questions(self, courses, chunk_size=1000):
+        # Stream whole courses without holding them in memory: yields lists of
+        # up to chunk_size (course, id, question, ..., correct_answer) rows,
+        # in course then id order
+        for course in sorted(courses, key=course_id):
+            cursor = self.conn.execute(
+                f"SELECT id, {QUESTION_COLUMNS} FROM questions WHERE course_id = ? ORDER BY id",
+                (course_id(course),)
+            )
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield [(course, *row) for row in rows]
+
+    def get_question(self, course, q_id):
+        cursor = self.conn.execute(
+            f"SELECT {QUESTION_COLUMNS} FROM questions WHERE course_id = ? AND id = ?",
+            (course_id(course), q_id)
+        )
+        return cursor.fetchone()
+
+    def add_question(self, course, values):
+        # values: (question, option_a, option_b, option_c, option_d, correct_answer)
+        # Returns the new per-course id
+        c_id = course_id(course)
+        with self.conn:
+            self.conn.execute("UPDATE courses SET last_id = last_id + 1 WHERE id = ?", (c_id,))
+            new_id = self.conn.execute("SELECT last_id FROM courses WHERE id = ?", (c_id,)).fetchone()[0]
+            cursor = self.conn.execute(f"""
+                INSERT INTO questions (course_id, id, {QUESTION_COLUMNS})
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, (c_id, new_id, *values))
+            self._index_similarity([(cursor.lastrowid, c_id, values)])
+        if self.cache is not None:
+            self.cache.add(course, cursor.lastrowid, values)
+        if self.selectors is not None:
+            self.selectors.forget([course])
+        return new_id
+
+    def add_questions(self, rows):
+        # Bulk insert in a single transaction.
+        # rows: [(course, (question, option_a, ..., correct_answer)), ...]
+        # Returns the number of questions inserted.
+        if not rows:
+            return 0
+        counts = {}
+        for course, _ in rows:
+            c_id = course_id(course)
+            counts[c_id] = counts.get(c_id, 0) + 1
+
+        with self.conn:
+            # Reserve a block of per-course ids for each course up front
+            next_ids = {}
+            for c_id, count in counts.items():
+                self.conn.execute("UPDATE courses SET last_id = last_id + ? WHERE id = ?", (count, c_id))
+                last_id = self.conn.execute("SELECT last_id FROM courses WHERE id = ?", (c_id,)).fetchone()[0]
+                next_ids[c_id] = last_id - count + 1
+
+            params = []
+            for course, values in rows:
+                c_id = course_id(course)
+                params.append((c_id, next_ids[c_id], *values))
+                next_ids[c_id] += 1
+            self.conn.executemany(f"""
+                INSERT INTO questions (course_id, id, {QUESTION_COLUMNS})
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, params)
+
+            # qids of the new rows, by (course_id, id), for the similarity index
+            qids = {}
+            for c_id, count in counts.items():
+                cursor = self.conn.execute(
+                    "SELECT id, qid FROM questions WHERE course_id = ? AND id BETWEEN ? AND ?",
+                    (c_id, next_ids[c_id] - count, next_ids[c_id] - 1)
+                )
+                qids.update(((c_id, q_id), qid) for q_id, qid in cursor)
+            self._index_similarity([(qids[c_id, q_id], c_id, values) for c_id, q_id, *values in params])
+        if self.cache is not None:
+            # Big batches: cheaper to reload the course on next use
+            for course in {course for course, _ in rows}:
+                self.cache.invalidate(course)
+        if self.selectors is not None:
+            self.selectors.forget({course for course, _ in rows})
+        return len(params)
+
+    def upsert_questions(self, rows):
+        # Bulk write keeping the given per-course ids (e.g. restoring an
+        # export), in a single transaction.
+        # rows: [(course, id, (question, option_a, ..., correct_answer)), ...]
+        # A question already stored under that course and id is overwritten
+        # in place, so it keeps its qid and the stats tied to it, and
+        # importing the same file twice adds nothing. Returns the row count.
+        if not rows:
+            return 0
+        params = [(course_id(course), q_id, *values) for course, q_id, values in rows]
+        with self.conn:
+            self.conn.executemany(f"""
+                INSERT INTO questions (course_id, id, {QUESTION_COLUMNS})
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (course_id, id) DO UPDATE SET
+                    question = excluded.question, option_a = excluded.option_a,
+                    option_b = excluded.option_b, option_c = excluded.option_c,
+                    option_d = excluded.option_d, correct_answer = excluded.correct_answer
+            """, params)
+            # New questions must never be given an id that is now taken
+            last_ids = {}
+            for c_id, q_id, *_ in params:
+                last_ids[c_id] = max(last_ids.get(c_id, 0), q_id)
+            self.conn.executemany(
+                "UPDATE courses SET last_id = MAX(last_id, ?) WHERE id = ?",
+                [(last_id, c_id) for c_id, last_id in last_ids.items()]
+            )
+            self._index_similarity([
+                (self.conn.execute("SELECT qid FROM questions WHERE course_id = ? AND id = ?", (c_id, q_id)).fetchone()[0],
+                 c_id, values)
+                for c_id, q_id, *values in params
+            ])
+        courses = {course for course, _, _ in rows}
+        if self.cache is not None:
+            for course in courses:
+                self.cache.invalidate(course)
+        if self.selectors is not None:
+            self.selectors.forget(courses)
+        return len(params)
+
+    def update_question(self, course, q_id, values):
+        with self.conn:
+            self.conn.execute("""
+                UPDATE questions
+                SET question = ?, option_a = ?, option_b = ?, option_c = ?, option_d = ?, correct_answer = ?
+                WHERE course_id = ? AND id = ?
+            """, (*values, course_id(course), q_id))
+            qid = self.conn.execute(
+                "SELECT qid FROM questions WHERE course_id = ? AND id = ?", (course_id(course), q_id)
+            ).fetchone()
+            if qid is not None:
+                self._index_similarity([(qid[0], course_id(course), values)])
+        if self.cache is not None and qid is not None:
+            self.cache.update(course, qid[0], values)
+
+    def delete_question(self, course, q_id):
+        with self.conn:
+            deleted = self.conn.execute(
+                "SELECT qid FROM questions WHERE course_id = ? AND id = ?", (course_id(course), q_id)
+            ).fetchone()
+            self.conn.execute(
+                "DELETE FROM questions WHERE course_id = ? AND id = ?",
+                (course_id(course), q_id)
+            )
+        if self.cache is not None and deleted is not None:
+            self.cache.remove(course, deleted[0])
+        if self.selectors is not None and deleted is not None:
+            self.selectors.forget([course])
+
+    # --- Near-duplicate detection ---
+
+    def _index_similarity(self, rows):
+        # rows: [(qid, course_id, values), ...]. Runs inside the caller's transaction.
+        signatures = []
+        buckets = []
+        for qid, c_id, values in rows:
+            sig = signature(values)
+            signatures.append((qid, pack_signature(sig)))
+            buckets.extend((c_id, band, bucket, qid) for band, bucket in band_keys(sig))
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO question_signatures (qid, signature) VALUES (?, ?)", signatures
+        )
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO question_buckets (course_id, band, bucket, qid) VALUES (?, ?, ?, ?)", buckets
+        )
+
+    def find_similar(self, course, values, exclude_id=None, threshold=DEFAULT_THRESHOLD, limit=5):
+        # Stored questions of `course` that look like near-duplicates of
+        # `values`, most similar first: [(id, question, similarity), ...].
+        # Only questions sharing an LSH bucket are compared, so this costs a
+        # handful of index lookups however big the course is.
+        sig = signature(values)
+        keys = band_keys(sig)
+        cursor = self.conn.execute(f"""
+            WITH keys (band, bucket) AS (VALUES {", ".join("(?, ?)" for _ in keys)})
+            SELECT q.id, q.question, s.signature
+            FROM (
+                SELECT DISTINCT b.qid
+                FROM keys JOIN question_buckets AS b
+                    ON b.course_id = ? AND b.band = keys.band AND b.bucket = keys.bucket
+                LIMIT ?
+            ) AS candidates
+            JOIN question_signatures AS s ON s.qid = candidates.qid
+            JOIN questions AS q ON q.qid = candidates.qid
+        """, (*[value for key in keys for value in key], course_id(course), MAX_SIMILAR_CANDIDATES))
+
+        matches = []
+        for q_id, question, blob in cursor:
+            if q_id == exclude_id:
+                continue
+            similarity = estimate_similarity(sig, unpack_signature(blob))
+            if similarity >= threshold:
+                matches.append((q_id, question, similarity))
+        matches.sort(key=lambda match: match[2], reverse=True)
+        return matches[:limit]
+
+    def index_missing_signatures(self, course, chunk_size=2000, progress=None):
+        # Add similarity index entries for questions of `course` that don't
+        # have one yet (e.g. migrated or written by another tool).
+        # progress(indexed) is called after each chunk. Returns the count.
+        c_id = course_id(course)
+        indexed = 0
+        while True:
+            rows = self.conn.execute(f"""
+                SELECT q.qid, {QUESTION_COLUMNS}
+                FROM questions AS q LEFT JOIN question_signatures AS s ON s.qid = q.qid
+                WHERE q.course_id = ? AND s.qid IS NULL
+                LIMIT ?
+            """, (c_id, chunk_size)).fetchall()
+            if not rows:
+                return indexed
+            with self.conn:
+                self._index_similarity([(row[0], c_id, row[1:]) for row in rows])
+            indexed += len(rows)
+            if progress:
+                progress(indexed)
+
+    def find_duplicate_groups(self, course, threshold=DEFAULT_THRESHOLD, progress=None):
+        # Every group of near-duplicate questions in `course`, biggest first:
+        # [[(id, question), ...], ...]. Pairs are only compared when they
+        # share an LSH bucket, which avoids comparing every pair of questions.
+        # progress(text) gets status updates.
+        def report(text):
+            if progress:
+                progress(text)
+
+        self.index_missing_signatures(course, progress=lambda n: report(f"Indexed {n:,} questions..."))
+        c_id = course_id(course)
+
+        def signature_blobs(qids):
+            # {qid: packed signature}, a chunk of qids per query
+            blobs = {}
+            for start in range(0, len(qids), SIGNATURE_CHUNK):
+                chunk = qids[start:start + SIGNATURE_CHUNK]
+                blobs.update(self.conn.execute(
+                    f"SELECT qid, signature FROM question_signatures WHERE qid IN ({', '.join('?' * len(chunk))})",
+                    chunk
+                ))
+            return blobs
+
+        # Union-find over questions that turned out to be similar
+        parent = {}
+        def find(qid):
+            parent.setdefault(qid, qid)
+            while parent[qid] != qid:
+                parent[qid] = parent[parent[qid]]
+                qid = parent[qid]
+            return qid
+
+        def union(qid_a, qid_b):
+            root_a, root_b = find(qid_a), find(qid_b)
+            if root_a != root_b:
+                parent[root_b] = root_a
+
+        def compare_bucket(members):
+            # Signatures are read per bucket and not kept. Questions with the
+            # same signature (boilerplate) are joined without comparing them,
+            # and pairs already in one group are skipped.
+            first_with = {} # packed signature -> first qid that has it
+            for qid, blob in signature_blobs(members).items():
+                first = first_with.setdefault(blob, qid)
+                if first != qid:
+                    union(first, qid)
+            distinct = list(first_with.items())
+            sigs = [unpack_signature(blob) for blob, _ in distinct]
+            for i, (_, first) in enumerate(distinct):
+                for j in range(i + 1, min(i + 1 + BUCKET_COMPARE_WINDOW, len(distinct))):
+                    other = distinct[j][1]
+                    if find(first) != find(other) and estimate_similarity(sigs[i], sigs[j]) >= threshold:
+                        union(first, other)
+
+        # Walk the buckets in index order; only buckets with 2+ questions matter
+        cursor = self.conn.execute(
+            "SELECT band, bucket, qid FROM question_buckets WHERE course_id = ? ORDER BY band, bucket",
+            (c_id,)
+        )
+        current, members, seen = None, [], 0
+        for band, bucket, qid in cursor:
+            if (band, bucket) != current:
+                if len(members) > 1:
+                    compare_bucket(members)
+                current, members = (band, bucket), []
+            members.append(qid)
+            seen += 1
+            if seen % 100000 == 0:
+                report(f"Compared {seen:,} index entries...")
+        if len(members) > 1:
+            compare_bucket(members)
+
+        groups = {}
+        for qid in parent:
+            groups.setdefault(find(qid), []).append(qid)
+        groups = [qids for qids in groups.values() if len(qids) > 1]
+
+        # Per-course ids and text for the report
+        result = []
+        for qids in groups:
+            cursor = self.conn.execute(
+                f"SELECT id, question FROM questions WHERE qid IN ({', '.join('?' * len(qids))}) ORDER BY id",
+                qids
+            )
+            result.append(cursor.fetchall())
+        result.sort(key=lambda rows: (-len(rows), rows[0][0]))
+        return result
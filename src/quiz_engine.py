@@ -0,0 +1,91 @@
+from collections import namedtuple
+
+QUIZ_LENGTH = 10 # Number of questions per quiz
+OPTION_LETTERS = ['A', 'B', 'C', 'D']
+
+# Outcome of answering one question
+AnswerResult = namedtuple("AnswerResult", ["is_correct", "correct_answer", "correct_text"])
+
+
+class QuizEngine:
+    # One quiz session: the questions, the score and where we are in the quiz.
+    # Pure Python with no tkinter dependency, so it can be driven by QuizApp,
+    # by scripts, or by thousands of simulated sessions on a headless machine.
+    #
+    # Questions are (question, option_a, option_b, option_c, option_d,
+    # correct_answer) tuples, where correct_answer is 'A', 'B', 'C' or 'D'.
+    # Any indexable sequence of them works, including a CompactQuestionStore
+    # for big practice pools (rows are then decoded one at a time).
+
+    def __init__(self, questions, qids=None):
+        self.questions = questions if hasattr(questions, "__getitem__") else list(questions)
+        # Optional qid of each question, so answers can be recorded against it
+        self.qids = qids
+        self.current = 0
+        self.score = 0
+        self.answered = False # Whether the current question has been answered
+
+    @classmethod
+    def from_repository(cls, repo, courses, quiz_length=QUIZ_LENGTH):
+        # New session with quiz_length questions sampled from the given courses
+        return cls(repo.sample_questions(courses, quiz_length))
+
+    @classmethod
+    def from_selector(cls, repo, selector, quiz_length=QUIZ_LENGTH):
+        # New session with quiz_length questions picked by an AdaptiveSelector
+        # (rows come from the question cache when it holds the courses)
+        rows = repo.fetch_questions_with_ids(selector.pick(quiz_length), courses=selector.courses)
+        return cls([row for _, row in rows], [qid for qid, _ in rows])
+
+    @property
+    def total(self):
+        return len(self.questions)
+
+    @property
+    def finished(self):
+        return self.current >= len(self.questions)
+
+    @property
+    def question(self):
+        # The current question tuple
+        return self.questions[self.current]
+
+    @property
+    def question_id(self):
+        # qid of the current question, if known
+        return self.qids[self.current] if self.qids is not None else None
+
+    @property
+    def question_number(self):
+        # 1-based, for display
+        return self.current + 1
+
+    def options(self):
+        # [(letter, text), ...] for the current question
+        return list(zip(OPTION_LETTERS, self.question[1:5]))
+
+    def answer(self, selected_answer):
+        if self.finished:
+            raise ValueError("The quiz is already finished.")
+        if self.answered:
+            raise ValueError("This question has already been answered.")
+        self.answered = True
+
+        question = self.question
+        correct_answer = question[5]
+        is_correct = (selected_answer == correct_answer)
+        if is_correct:
+            self.score += 1
+
+        correct_text = dict(zip(OPTION_LETTERS, question[1:5])).get(correct_answer, "N/A")
+        return AnswerResult(is_correct, correct_answer, correct_text)
+
+    def next_question(self):
+        # Move on; returns False once there are no questions left
+        self.current += 1
+        self.answered = False
+        return not self.finished
+
+    @property
+    def percentage(self):
+        return (self.score / len(self.questions)) * 100 if self.questions else 0
@@ -1,17 +1,9 @@
 import tkinter as tk
 from tkinter import messagebox, ttk
-import sqlite3
-import random
-
-# Constants for Database and Design
-DB_FILE = "quiz_bowl.db"
-COURSES = [
-    "Computer Applications",
-    "Business Law",
-    "Managerial Finance",
-    "Database Management",
-    "Business Analytics"
-]
+from migrations import migrate
+from quiz_db import COURSES, DB_FILE, Database
+
+# Constants for Design
 COLORS = {
     "bg": "#e8f0fe",
     "accent": "#008080",
@@ -29,8 +21,9 @@ FONTS = {
 ADMIN_PASSWORD = "jimmyjenkins"
 
 class QuizApp:
-    def __init__(self, master):
+    def __init__(self, master, db):
         self.master = master
+        self.repo = db.repository()
         self.master.title("Quiz Bowl")
         self.master.configure(bg=COLORS["bg"])
         self.course = None
@@ -79,16 +72,7 @@ class QuizApp:
             messagebox.showwarning("No Selection", "Please select at least one course.")
             return
 
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
-        for course in self.selected_courses:
-            table = course.replace(" ", "_").lower()
-            cursor.execute(f"SELECT question, option_a, option_b, option_c, option_d, correct_answer FROM {table}")
-            self.questions.extend(cursor.fetchall())
-        conn.close()
-
-        random.shuffle(self.questions)
-        self.questions = self.questions[:10]
+        self.questions = self.repo.sample_questions(self.selected_courses, 10)
 
         if not self.questions:
             messagebox.showinfo("No Questions", "No questions available in selected courses.")
@@ -234,11 +218,7 @@ class QuizApp:
             messagebox.showwarning("Invalid Selection", "Please select a valid course.")
             return
 
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
-        cursor.execute(f"SELECT * FROM {course.replace(' ', '_').lower()}")
-        rows = cursor.fetchall()
-        conn.close()
+        rows = self.course_rows(course)
 
         # Create a scrollable frame for the list of questions
         scrollable_frame = self.create_scrollable_frame()
@@ -279,15 +259,8 @@ class QuizApp:
         tk.Label(self.master, text="Edit Question", font=FONTS["header"], bg=COLORS["bg"], fg=COLORS["text"]).pack(pady=20)
 
         # Fetch the existing question data
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
-        #cursor.execute(f"SELECT * FROM {COURSES[0].replace(' ', '_').lower()} WHERE id = ?", (q_id,))
-        cursor.execute(f"SELECT * FROM {course.replace(' ', '_').lower()} WHERE id = ?", (q_id,))
-        row = cursor.fetchone()
-        conn.close()
-
         # Pre-populate the fields with current question data
-        question, a, b, c, d, correct = row[1:]
+        question, a, b, c, d, correct = self.repo.get_question(course, q_id)
 
         self.edit_entries = {}
         fields = ["Question", "Option A", "Option B", "Option C", "Option D", "Correct Answer (A/B/C/D)"]
@@ -324,23 +297,14 @@ class QuizApp:
             messagebox.showerror("Error", "Correct answer must be A, B, C, or D.")
             return
 
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
-        cursor.execute(f"""
-            UPDATE {course.replace(' ', '_').lower()} 
-            SET question = ?, option_a = ?, option_b = ?, option_c = ?, option_d = ?, correct_answer = ?
-            WHERE id = ?
-        """, (
+        self.repo.update_question(course, q_id, (
             values["Question"],
             values["Option A"],
             values["Option B"],
             values["Option C"],
             values["Option D"],
-            values["Correct Answer (A/B/C/D)"],
-            q_id
+            values["Correct Answer (A/B/C/D)"]
         ))
-        conn.commit()
-        conn.close()
 
         messagebox.showinfo("Success", "Question updated successfully!")
         self.show_admin_interface()
@@ -362,13 +326,7 @@ class QuizApp:
             messagebox.showerror("Error", "Correct answer must be A, B, C, or D.")
             return
 
-        table = course.replace(" ", "_").lower()
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
-        cursor.execute(f"""
-            INSERT INTO {table} (question, option_a, option_b, option_c, option_d, correct_answer)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (
+        self.repo.add_question(course, (
             values["Question"],
             values["Option A"],
             values["Option B"],
@@ -376,8 +334,6 @@ class QuizApp:
             values["Option D"],
             values["Correct Answer (A/B/C/D)"]
         ))
-        conn.commit()
-        conn.close()
 
         messagebox.showinfo("Success", "Question added successfully!")
         self.show_admin_interface()
@@ -438,11 +394,7 @@ class QuizApp:
             return
 
 
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
-        cursor.execute(f"SELECT * FROM {course.replace(' ', '_').lower()}")
-        rows = cursor.fetchall()
-        conn.close()
+        rows = self.course_rows(course)
 
         frame = tk.Frame(self.master, bg=COLORS["bg"])
         canvas = tk.Canvas(frame, bg=COLORS["bg"])
@@ -476,15 +428,15 @@ class QuizApp:
 
     def delete_question(self, row):
         course = self.course_var.get()
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
-        cursor.execute(f"DELETE FROM {course.replace(' ', '_').lower()} WHERE id = ?", (row[0],))
-        conn.commit()
-        conn.close()
+        self.repo.delete_question(course, row[0])
 
         messagebox.showinfo("Success", "Question deleted successfully!")
         self.view_questions()
 
+    def course_rows(self, course):
+        # (id, question, option_a, ..., correct_answer) for every question in the course
+        return [row[1:] for chunk in self.repo.iter_questions([course]) for row in chunk]
+
     def clear_window(self):
         for widget in self.master.winfo_children():
             widget.destroy()
@@ -528,7 +480,10 @@ class QuizApp:
 
 
 if __name__ == "__main__":
+    db = Database(DB_FILE, pool_size=0)
+    migrate(db.connection)
     root = tk.Tk()
     root.geometry("600x600")
-    app = QuizApp(root)
+    app = QuizApp(root, db)
     root.mainloop()
+    db.close()
@@ -0,0 +1,298 @@
+import argparse
+import hashlib
+import hmac
+import json
+import mmap
+import os
+import random
+import sqlite3
+import struct
+import sys
+import time
+from array import array
+
+from migrations import migrate
+from quiz_db import COURSES, DB_FILE, Database
+from quiz_engine import OPTION_LETTERS
+from import_questions import resolve_course
+
+# Quiz packs: a fixed (optionally pre-shuffled) question set built offline
+# from the question bank, for exam days when many machines run the same
+# quiz. A pack is one file that QuizPack memory-maps; a question is decoded
+# from it only when it is shown, with no SQL and no parsing per session.
+#
+# Layout (little-endian; sections start on 8-byte boundaries):
+#   header   - HEADER below: magic, format version, flags, question count,
+#              metadata length and a 32-byte digest of everything after it
+#   metadata - UTF-8 JSON: name, courses, created_at, seed
+#   offsets  - count * 5 + 1 u64: where each question's text and options
+#              A-D start in the text section (the last entry is its length)
+#   qids     - count u64: each question's qid in the bank it was built from,
+#              so answers still count towards the answer log
+#   answers  - count bytes, b"A" to b"D"
+#   text     - every question and option, UTF-8, back to back
+#
+# The digest is SHA-256, or HMAC-SHA256 when the pack is built with a key
+# (QUIZ_PACK_KEY). A plain checksum catches corruption and hand edits; only
+# a keyed pack stops someone who edits an answer from also fixing the
+# checksum, so exam packs should be built with a key that the exam machines
+# also have.
+#
+# Usage: python quiz_pack.py build exam.qpack --course "Business Law" [--count 50]
+#                            [--shuffle] [--seed 7] [--name "Midterm"] [--db quiz_bowl.db]
+#        python quiz_pack.py verify exam.qpack
+
+MAGIC = b"QUIZPAK1"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<8sHHII32s12x") # 64 bytes
+FLAG_SHUFFLED = 1
+FLAG_KEYED = 2
+TEXTS_PER_QUESTION = 1 + len(OPTION_LETTERS)
+FETCH_CHUNK = 500 # qids per query while building
+KEY_ENV = "QUIZ_PACK_KEY"
+
+
+class QuizPackError(ValueError):
+    # Not a quiz pack, a damaged one, or one that was changed after it was built
+    pass
+
+
+def pack_key():
+    # The key from the environment, or None for unkeyed packs
+    key = os.environ.get(KEY_ENV)
+    return key.encode("utf-8") if key else None
+
+
+def _digest(key, *parts):
+    h = hmac.new(key, digestmod=hashlib.sha256) if key else hashlib.sha256()
+    for part in parts:
+        h.update(part)
+    return h.digest()
+
+
+def _padding(size):
+    return b"\0" * (-size % 8)
+
+
+def _little_endian(values):
+    # array("Q") as little-endian bytes whatever this machine's byte order
+    if sys.byteorder == "big":
+        values = array("Q", values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def build_pack(repo, path, courses, count=None, shuffle=False, seed=None, name=None, key=None, progress=None):
+    # Write a pack of `count` random questions from `courses` (every question
+    # when count is None, in course and id order unless shuffled).
+    # progress(questions_written) is called as rows are read. Returns the
+    # number of questions in the pack.
+    qids = repo.question_ids(courses, count)
+    if shuffle:
+        random.Random(seed).shuffle(qids)
+
+    offsets = array("Q", [0])
+    answers = bytearray()
+    text = bytearray()
+    packed_qids = array("Q")
+    for start in range(0, len(qids), FETCH_CHUNK):
+        for qid, row in repo.fetch_questions_with_ids(qids[start:start + FETCH_CHUNK]):
+            for value in row[:TEXTS_PER_QUESTION]:
+                text += value.encode("utf-8")
+                offsets.append(len(text))
+            answers += row[TEXTS_PER_QUESTION].encode("ascii")
+            packed_qids.append(qid)
+        if progress:
+            progress(len(packed_qids))
+
+    metadata = json.dumps({
+        "name": name or ", ".join(courses),
+        "courses": list(courses),
+        "created_at": time.time(),
+        "seed": seed,
+    }).encode("utf-8")
+    body = [
+        metadata, _padding(len(metadata)),
+        _little_endian(offsets), _little_endian(packed_qids),
+        bytes(answers), _padding(len(answers)),
+        bytes(text),
+    ]
+    flags = (FLAG_SHUFFLED if shuffle else 0) | (FLAG_KEYED if key else 0)
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, flags, len(packed_qids), len(metadata), _digest(key, *body))
+
+    # Write to a temp file first so a failed build never leaves half a pack
+    tmp_path = path + ".part"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(header)
+            f.writelines(body)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return len(packed_qids)
+
+
+class QuizPack:
+    # Read-only view of a pack file. Indexing returns the usual (question,
+    # option_a, ..., correct_answer) tuple, so a pack can be handed straight
+    # to QuizEngine (with qids=pack.qids).
+    #
+    # The digest is checked when the pack is opened (one pass over the
+    # mapped file). With a key, only packs built with that key open.
+
+    def __init__(self, path, key=None, verify=True):
+        self.path = path
+        with open(path, "rb") as f:
+            try:
+                self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as e: # Empty file
+                raise QuizPackError(f"{path} is not a quiz pack.") from e
+        self._views = []
+        try:
+            self._open(key, verify)
+        except Exception:
+            self.close()
+            raise
+
+    def _open(self, key, verify):
+        mm = self._mm
+        if len(mm) < HEADER.size:
+            raise QuizPackError(f"{self.path} is not a quiz pack.")
+        magic, version, flags, count, meta_len, digest = HEADER.unpack_from(mm, 0)
+        if magic != MAGIC:
+            raise QuizPackError(f"{self.path} is not a quiz pack.")
+        if version != FORMAT_VERSION:
+            raise QuizPackError(f"{self.path} uses pack format {version}; this program reads format {FORMAT_VERSION}.")
+
+        meta_start = HEADER.size
+        offsets_start = meta_start + meta_len + (-meta_len % 8)
+        qids_start = offsets_start + (count * TEXTS_PER_QUESTION + 1) * 8
+        answers_start = qids_start + count * 8
+        text_start = answers_start + count + (-count % 8)
+        if text_start > len(mm):
+            raise QuizPackError(f"{self.path} is truncated.")
+
+        if verify:
+            if flags & FLAG_KEYED and not key:
+                raise QuizPackError(f"{self.path} is a keyed pack; set {KEY_ENV} to the key it was built with.")
+            if key and not flags & FLAG_KEYED:
+                # Otherwise an edited pack could simply be saved unkeyed
+                raise QuizPackError(f"{self.path} is not keyed, but this machine expects keyed packs.")
+            body = memoryview(mm)[HEADER.size:]
+            try:
+                matches = hmac.compare_digest(_digest(key if flags & FLAG_KEYED else None, body), digest)
+            finally:
+                body.release()
+            if not matches:
+                raise QuizPackError(f"{self.path} failed its checksum: it is damaged or was changed after it was built.")
+
+        self.metadata = json.loads(mm[meta_start:meta_start + meta_len].decode("utf-8"))
+        self.shuffled = bool(flags & FLAG_SHUFFLED)
+        self._count = count
+        self._offsets = self._u64(offsets_start, count * TEXTS_PER_QUESTION + 1)
+        self.qids = self._u64(qids_start, count)
+        self._answers_start = answers_start
+        self._text_start = text_start
+        if text_start + self._offsets[-1] != len(mm):
+            raise QuizPackError(f"{self.path} is damaged (its text section has the wrong length).")
+
+    def _u64(self, start, n):
+        # Zero-copy view of n u64 values (copied only on big-endian machines)
+        if sys.byteorder == "big":
+            values = array("Q", self._mm[start:start + n * 8])
+            values.byteswap()
+            return values
+        view = memoryview(self._mm)[start:start + n * 8].cast("Q")
+        self._views.append(view)
+        return view
+
+    @property
+    def name(self):
+        return self.metadata.get("name", os.path.basename(self.path))
+
+    @property
+    def courses(self):
+        return self.metadata.get("courses", [])
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("quiz pack index out of range")
+        base = index * TEXTS_PER_QUESTION
+        bounds = self._offsets[base:base + TEXTS_PER_QUESTION + 1]
+        start = self._text_start
+        texts = [self._mm[start + bounds[i]:start + bounds[i + 1]].decode("utf-8") for i in range(TEXTS_PER_QUESTION)]
+        answer = chr(self._mm[self._answers_start + index])
+        return (*texts, answer)
+
+    def __iter__(self):
+        for index in range(self._count):
+            yield self[index]
+
+    def close(self):
+        for view in self._views:
+            view.release()
+        self._views = []
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or check quiz packs (fixed question sets for exam days).")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="Build a pack from the question bank")
+    build.add_argument("file", help="Pack file to write (e.g. exam.qpack)")
+    build.add_argument("--course", action="append", help="Course to take questions from (can be repeated; default: all)")
+    build.add_argument("--count", type=int, help="Number of random questions (default: every question)")
+    build.add_argument("--shuffle", action="store_true", help="Store the questions in a shuffled order")
+    build.add_argument("--seed", type=int, help="Seed for --shuffle, to rebuild the same pack")
+    build.add_argument("--name", help="Name shown on the quiz screen")
+    build.add_argument("--db", default=DB_FILE, help="Database file (default: %(default)s)")
+    verify = commands.add_parser("verify", help="Check a pack's checksum")
+    verify.add_argument("file")
+    args = parser.parse_args()
+    key = pack_key()
+
+    if args.command == "verify":
+        try:
+            with QuizPack(args.file, key=key) as pack:
+                print(f"{args.file}: OK, {len(pack)} questions ({pack.name})" + (", keyed" if key else ""))
+        except (OSError, QuizPackError) as e:
+            print(e)
+            sys.exit(1)
+        return
+
+    courses = COURSES
+    if args.course:
+        courses = [resolve_course(name) for name in args.course]
+        if None in courses:
+            parser.error(f"Unknown course; choose from: {', '.join(COURSES)}")
+    db = Database(args.db, pool_size=0)
+    try:
+        migrate(db.connection) # A new or old-layout database gets the current schema first
+        count = build_pack(db.repository(), args.file, courses, count=args.count, shuffle=args.shuffle,
+                           seed=args.seed, name=args.name, key=key)
+    except (sqlite3.Error, OSError) as e:
+        print(f"Could not build {args.file}: {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+    print(f"Wrote {count} questions to {args.file}" + (" (keyed)" if key else " (unkeyed: set " + KEY_ENV + " to stop answer edits)"))
+
+
+if __name__ == "__main__":
+    main()
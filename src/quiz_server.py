@@ -0,0 +1,193 @@
+import argparse
+import asyncio
+import json
+import os
+import sqlite3
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from adaptive import SelectorCache
+from question_cache import QuestionCache
+from migrations import migrate
+from quiz_db import DB_FILE, Database
+from remote import DEFAULT_HOST, DEFAULT_PORT, MAX_MESSAGE
+
+# Quiz server: one process owns quiz_bowl.db and serves many quiz clients
+# (main.py --server host:port) over the JSON-lines protocol in remote.py.
+#
+# Connections are handled by one asyncio event loop, so hundreds of idle or
+# mostly-waiting sessions cost almost nothing. SQLite calls are blocking, so
+# they run on a small thread pool, each borrowing a pooled connection; WAL
+# lets the reads run side by side while writes take turns.
+#
+# Admin requests (anything that changes questions) are refused until the
+# connection logs in with the admin password given by --admin-password or
+# the QUIZ_ADMIN_PASSWORD environment variable. Without one, the server is
+# read-only apart from quiz answers.
+#
+# Usage: python quiz_server.py [--host 0.0.0.0] [--port 8765] [--db quiz_bowl.db]
+#                              [--workers 8] [--admin-password ...]
+
+DEFAULT_WORKERS = 8
+MAX_SELECTORS = 1024 # Students' adaptive selectors kept in memory (see adaptive.SelectorCache)
+SELECTOR_BUILDS = 20 # New students' selectors one connection may have built...
+SELECTOR_WINDOW = 60.0 # ...per this many seconds; past that it gets plain random quizzes
+
+# Repository methods anyone may call, and those that need an admin login
+QUIZ_METHODS = {
+    "sample_questions", "warm_cache", "fetch_questions_with_ids",
+}
+ADMIN_METHODS = {
+    "page_question_titles", "page_questions", "search_questions", "get_question",
+    "add_question", "add_questions", "update_question", "delete_question",
+    "find_similar", "find_duplicate_groups", "answer_analytics",
+}
+
+
+class QuizServer:
+
+    def __init__(self, db, workers=DEFAULT_WORKERS, admin_password=None):
+        self.db = db
+        self.admin_password = admin_password
+        self.sessions = 0 # Open client connections
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="quiz-server")
+        self._server = None
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        self._server = await asyncio.start_server(self._handle_client, host, port, limit=MAX_MESSAGE)
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def serve_forever(self):
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        self._executor.shutdown(wait=True)
+
+    async def _handle_client(self, reader, writer):
+        self.sessions += 1
+        session = {"admin": False, "selector_builds": deque()} # monotonic() of recent builds
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+                    break
+                if not line:
+                    break
+                response = await self._handle_line(loop, session, line)
+                writer.write(json.dumps(response).encode("utf-8") + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.sessions -= 1
+            writer.close()
+
+    async def _handle_line(self, loop, session, line):
+        request_id = None
+        try:
+            request = json.loads(line)
+            request_id = request.get("id")
+            method = request["method"]
+            params = request.get("params") or {}
+            if method == "ping":
+                result = "pong"
+            elif method == "login":
+                if self.admin_password is None or params.get("password") != self.admin_password:
+                    raise PermissionError("Wrong admin password.")
+                session["admin"] = True
+                result = True
+            else:
+                if method in ADMIN_METHODS and not session["admin"]:
+                    raise PermissionError(f"{method} needs an admin login.")
+                result = await loop.run_in_executor(self._executor, self._call, session, method, params)
+            return {"id": request_id, "result": result}
+        except Exception as e:
+            return {"id": request_id, "error": {"type": type(e).__name__, "message": str(e)}}
+
+    def _call(self, session, method, params):
+        # Runs on a pool thread with its own SQLite connection
+        with self.db.pooled() as conn:
+            repo = self.db.repository(conn)
+            if method == "adaptive_pick":
+                return self._adaptive_pick(session, repo, params["user"], params["courses"], params["n"])
+            if method == "write_answer_log":
+                return self._write_answer_log(repo, params["started"], params["answers"], params["finished"])
+            if method not in QUIZ_METHODS and method not in ADMIN_METHODS:
+                raise ValueError(f"Unknown method {method!r}")
+            if method == "add_questions":
+                return repo.add_questions([(course, tuple(values)) for course, values in params["rows"]])
+            return getattr(repo, method)(**params)
+
+    def _adaptive_pick(self, session, repo, user, courses, n):
+        # The repository finds the student's selector in the database's
+        # SelectorCache (and drops selectors when questions are added or
+        # deleted); anonymous students (user=None) get the plain sampler.
+        # Building a selector for a student who isn't cached reads their
+        # history, and a new set of courses a pass over its questions, so a
+        # connection only gets SELECTOR_BUILDS of those per SELECTOR_WINDOW:
+        # a client sending a new user name with every request is served
+        # random quizzes rather than tying up the workers.
+        selectors = self.db.selectors
+        if user is not None and (selectors is None or not selectors.cached(user, courses)):
+            if not self._allow_build(session):
+                user = None
+        return repo.adaptive_selector(user, courses).pick(n)
+
+    def _allow_build(self, session):
+        now = time.monotonic()
+        builds = session["selector_builds"]
+        while builds and now - builds[0] > SELECTOR_WINDOW:
+            builds.popleft()
+        if len(builds) >= SELECTOR_BUILDS:
+            return False
+        builds.append(now)
+        return True
+
+    def _write_answer_log(self, repo, started, answers, finished):
+        # The repository also folds the answers into the cached selectors
+        repo.write_answer_log(started, answers, finished)
+        return len(answers)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve quizzes from one question bank to many clients.")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="Address to listen on (default: %(default)s; 0.0.0.0 for the whole network)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Port (default: %(default)s)")
+    parser.add_argument("--db", default=DB_FILE, help="Database file (default: %(default)s)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Threads running database calls")
+    parser.add_argument("--admin-password", default=os.environ.get("QUIZ_ADMIN_PASSWORD"),
+                        help="Password that unlocks admin requests (default: $QUIZ_ADMIN_PASSWORD)")
+    args = parser.parse_args()
+
+    db = Database(args.db, pool_size=args.workers, cache=QuestionCache(), selectors=SelectorCache(MAX_SELECTORS))
+    try:
+        migrate(db.connection)
+    except sqlite3.Error as e:
+        parser.error(f"Could not open {args.db}: {e}")
+    server = QuizServer(db, args.workers, args.admin_password)
+
+    async def run():
+        host, port = await server.start(args.host, args.port)
+        print(f"Quiz server on {host}:{port} using {args.db}" + ("" if args.admin_password else " (admin requests disabled)"))
+        try:
+            await server.serve_forever()
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+import os
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Timings for the quiz hot path, cheap enough to leave on in production
+# (a perf_counter() read and a deque append under a short lock per record).
+#
+# Each phase keeps a running count, total and maximum, plus its most recent
+# RING_SIZE durations for percentiles. A separate ring holds the last
+# RING_SIZE events in order (question rendered, answer clicked, ...) so a
+# dump shows what happened just before a slow spell. Timestamps are
+# time.perf_counter() (monotonic), reported relative to when recording
+# started.
+#
+# Phases recorded by the app:
+#   widgets         - show_question updating the quiz screen's widgets
+#   render          - show_question until Tk has drawn the question (idle)
+#   feedback        - an answer click until its feedback is on screen
+#   next_question   - the Next step until the next question is on screen
+#   quiz_screen     - building the quiz screen at the start of a quiz
+#   db              - queries run for a screen on the DB worker
+#   answer_log      - batched answer writes on the answer log thread
+#
+# dump() writes JSON when the file name ends in .json and Prometheus text
+# format otherwise (e.g. for node_exporter's textfile collector).
+
+RING_SIZE = 1024
+QUANTILES = (0.5, 0.9, 0.99)
+METRIC = "quiz_phase_seconds"
+
+
+class Phase:
+
+    def __init__(self, ring_size):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent = deque(maxlen=ring_size)
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        self.recent.append(seconds)
+
+    def quantiles(self):
+        # Over the recent durations only, so they follow the machine's current state
+        recent = sorted(self.recent)
+        if not recent:
+            return {}
+        return {q: recent[min(len(recent) - 1, int(q * len(recent)))] for q in QUANTILES}
+
+
+class QuizTimings:
+
+    def __init__(self, path=None, ring_size=RING_SIZE):
+        self.path = path # Where dump() writes; None records without ever writing
+        self.ring_size = ring_size
+        self.started = time.perf_counter()
+        self.started_wall = time.time()
+        self._phases = {} # phase -> Phase
+        self._events = deque(maxlen=ring_size) # (at, event, qid, seconds or None)
+        self._lock = threading.Lock()
+
+    def now(self):
+        return time.perf_counter()
+
+    def mark(self, event, qid=None):
+        # An instant event (e.g. an answer click); returns its timestamp
+        now = time.perf_counter()
+        with self._lock:
+            self._events.append((now, event, qid, None))
+        return now
+
+    def record(self, phase, started, qid=None):
+        # `phase` ran from `started` (a now() value) until now; any thread
+        now = time.perf_counter()
+        with self._lock:
+            self._add(phase, now - started)
+            self._events.append((now, phase, qid, now - started))
+        return now
+
+    def add(self, phase, seconds):
+        with self._lock:
+            self._add(phase, seconds)
+
+    def _add(self, phase, seconds):
+        # Caller holds _lock (snapshot() copies the phases and events under it)
+        entry = self._phases.get(phase)
+        if entry is None:
+            entry = self._phases[phase] = Phase(self.ring_size)
+        entry.add(seconds)
+
+    @contextmanager
+    def timed(self, phase):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(phase, time.perf_counter() - started)
+
+    def snapshot(self):
+        # {phase: (count, total, max, {quantile: seconds})} and the event ring
+        with self._lock:
+            phases = {
+                name: (entry.count, entry.total, entry.max, entry.quantiles())
+                for name, entry in self._phases.items()
+            }
+            events = list(self._events)
+        return phases, events
+
+    def to_json(self):
+        import json # Only needed when dumping; keeps main.py's startup imports lean
+        phases, events = self.snapshot()
+        return json.dumps({
+            "started_at": self.started_wall,
+            "uptime": time.perf_counter() - self.started,
+            "phases": {
+                name: {
+                    "count": count,
+                    "total": total,
+                    "max": most,
+                    "mean": total / count,
+                    **{f"p{round(q * 100)}": value for q, value in quantiles.items()},
+                }
+                for name, (count, total, most, quantiles) in sorted(phases.items())
+            },
+            "events": [
+                {"at": at - self.started, "event": event, "qid": qid, "seconds": seconds}
+                for at, event, qid, seconds in events
+            ],
+        }, indent=1)
+
+    def to_prometheus(self):
+        phases, _ = self.snapshot()
+        lines = [
+            f"# HELP {METRIC} Time spent in each phase of the quiz hot path.",
+            f"# TYPE {METRIC} summary",
+        ]
+        for name, (count, total, _, quantiles) in sorted(phases.items()):
+            for q, value in quantiles.items():
+                lines.append(f'{METRIC}{{phase="{name}",quantile="{q}"}} {value:.9g}')
+            lines.append(f'{METRIC}_sum{{phase="{name}"}} {total:.9g}')
+            lines.append(f'{METRIC}_count{{phase="{name}"}} {count}')
+        lines += [
+            f"# HELP {METRIC}_max Slowest single run of each phase since startup.",
+            f"# TYPE {METRIC}_max gauge",
+        ]
+        for name, (_, _, most, _) in sorted(phases.items()):
+            lines.append(f'{METRIC}_max{{phase="{name}"}} {most:.9g}')
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path=None):
+        # Write the timings to `path` (default self.path). The file is
+        # replaced in one step, so a collector never reads half of it.
+        path = path or self.path
+        if not path:
+            return False
+        text = self.to_json() if path.endswith(".json") else self.to_prometheus()
+        tmp_path = path + ".part"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Could not write timings to {path}: {e}", file=sys.stderr)
+            return False
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return True
@@ -0,0 +1,282 @@
+import json
+import socket
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from quiz_db import ANALYTICS_QUESTIONS, PAGE_SIZE
+
+# Client side of the quiz server protocol (see quiz_server.py).
+#
+# RemoteDatabase / RemoteRepository stand in for Database / QuestionRepository,
+# so QuizApp, DBExecutor and AnswerLog work unchanged against a server: every
+# repository call becomes one request over a TCP connection.
+#
+# Protocol: one JSON object per line each way.
+#   request:  {"id": 1, "method": "get_question", "params": {"course": ..., "q_id": 3}}
+#   response: {"id": 1, "result": ...} or {"id": 1, "error": {"type": ..., "message": ...}}
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+MAX_MESSAGE = 64 * 1024 * 1024 # Longest line either side accepts (bulk imports are big)
+CONNECT_TIMEOUT = 5.0 # Seconds
+
+
+class RemoteError(sqlite3.Error):
+    # A request failed on the server or the connection broke. Subclasses
+    # sqlite3.Error so callers handle it like a local database error.
+    pass
+
+
+def parse_address(address):
+    # "host:port", "host" or ":port"
+    host, _, port = address.rpartition(":") if ":" in address else (address, "", "")
+    return host or DEFAULT_HOST, int(port) if port else DEFAULT_PORT
+
+
+class RemoteConnection:
+    # One TCP connection to the server; requests on it are sent one at a time
+
+    def __init__(self, host, port, admin_password=None):
+        self.host = host
+        self.port = port
+        self.admin_password = admin_password
+        self._logged_in = False # Sent the admin login on the current socket
+        self._sock = None
+        self._file = None
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        self._sock = socket.create_connection((self.host, self.port), timeout=CONNECT_TIMEOUT)
+        self._sock.settimeout(None) # Some admin jobs take a while
+        self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._file = self._sock.makefile("rwb")
+        self._logged_in = False
+
+    def _login(self):
+        self._logged_in = True # Tried once per socket
+        try:
+            self._request("login", {"password": self.admin_password})
+        except RemoteError:
+            pass # Quiz requests still work; admin ones will say why they fail
+
+    def call(self, method, **params):
+        with self._lock:
+            try:
+                if self._sock is None:
+                    self._connect()
+                if self.admin_password is not None and not self._logged_in:
+                    self._login()
+                return self._request(method, params)
+            except (OSError, ValueError) as e:
+                # Drop the connection; the next call reconnects
+                self.close()
+                raise RemoteError(f"Lost connection to quiz server {self.host}:{self.port}: {e}") from e
+
+    def _request(self, method, params):
+        self._next_id += 1
+        message = {"id": self._next_id, "method": method, "params": params}
+        self._file.write(json.dumps(message).encode("utf-8") + b"\n")
+        self._file.flush()
+        line = self._file.readline(MAX_MESSAGE)
+        if not line:
+            raise ConnectionError("server closed the connection")
+        response = json.loads(line)
+        if "error" in response:
+            error = response["error"]
+            raise RemoteError(f"{error['type']}: {error['message']}")
+        return response["result"]
+
+    def interrupt(self):
+        # Matches sqlite3.Connection.interrupt() for DBJob.cancel(); a request
+        # already sent can't be taken back, so its result is simply dropped
+        pass
+
+    def close(self):
+        if self._sock is not None:
+            try:
+                self._file.close()
+                self._sock.close()
+            except OSError:
+                pass
+            self._sock = None
+            self._file = None
+
+
+class RemoteDatabase:
+    # Same interface as quiz_db.Database, backed by a quiz server.
+    # Connections start without admin rights; after login(password) each one
+    # sends the password before its next request to unlock admin requests.
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, pool_size=2, admin_password=None):
+        self.host = host
+        self.port = port
+        self.pool_size = pool_size
+        self.admin_password = admin_password
+        self.cache = None # The server keeps the question cache
+        self._ui_conn = None
+        self._pool = []
+        self._pool_lock = threading.Lock()
+        self._pool_sem = threading.BoundedSemaphore(pool_size) if pool_size > 0 else None
+        self._connections = [] # Every connection opened, in use or not
+
+    def _open(self):
+        conn = RemoteConnection(self.host, self.port, self.admin_password)
+        with self._pool_lock:
+            self._connections.append(conn)
+        return conn
+
+    def login(self, password):
+        # Called once the admin has typed the password; no request is made
+        # here, so the Tk thread never waits on the network
+        self.admin_password = password
+        with self._pool_lock:
+            for conn in self._connections:
+                conn.admin_password = password
+
+    @property
+    def connection(self):
+        if self._ui_conn is None:
+            self._ui_conn = self._open()
+        return self._ui_conn
+
+    @contextmanager
+    def pooled(self):
+        if self._pool_sem is None:
+            raise RuntimeError("This RemoteDatabase was created without a worker pool.")
+        self._pool_sem.acquire()
+        try:
+            with self._pool_lock:
+                conn = self._pool.pop() if self._pool else None
+            if conn is None:
+                conn = self._open()
+            try:
+                yield conn
+            finally:
+                with self._pool_lock:
+                    self._pool.append(conn)
+        finally:
+            self._pool_sem.release()
+
+    def repository(self, conn=None):
+        return RemoteRepository(self, conn)
+
+    def close(self):
+        if self._ui_conn is not None:
+            self._ui_conn.close()
+            self._ui_conn = None
+        with self._pool_lock:
+            for conn in self._pool:
+                conn.close()
+            self._pool = []
+            self._connections = []
+
+
+class RemoteRepository:
+    # QuestionRepository over the network. Results come back as JSON, so rows
+    # are lists rather than tuples; everything else matches.
+
+    cache = None # The server keeps the question cache
+
+    def __init__(self, db, conn=None):
+        self.db = db
+        self._conn = conn
+
+    @property
+    def conn(self):
+        return self._conn if self._conn is not None else self.db.connection
+
+    def _call(self, method, **params):
+        return self.conn.call(method, **params)
+
+    def ping(self):
+        return self._call("ping")
+
+    # --- Quiz ---
+
+    def sample_questions(self, courses, n):
+        return self._call("sample_questions", courses=courses, n=n)
+
+    def warm_cache(self, courses):
+        return self._call("warm_cache", courses=courses)
+
+    def fetch_questions_with_ids(self, qids, courses=None):
+        return self._call("fetch_questions_with_ids", qids=qids, courses=courses)
+
+    def adaptive_selector(self, user, courses):
+        return RemoteSelector(self, user, courses)
+
+    def write_answer_log(self, started, answers, finished):
+        return self._call("write_answer_log", started=started, answers=answers, finished=finished)
+
+    # --- Admin ---
+
+    def page_question_titles(self, course, after_id=None, before_id=None, from_id=None, limit=PAGE_SIZE):
+        return self._call("page_question_titles", course=course, after_id=after_id,
+                          before_id=before_id, from_id=from_id, limit=limit)
+
+    def page_questions(self, course, after_id=None, before_id=None, from_id=None, limit=PAGE_SIZE):
+        return self._call("page_questions", course=course, after_id=after_id,
+                          before_id=before_id, from_id=from_id, limit=limit)
+
+    def iter_questions(self, courses, chunk_size=1000):
+        # Paged on the client, so an export never needs one huge response
+        for course in courses:
+            after_id = 0
+            while True:
+                rows, _, has_next = self.page_questions(course, after_id=after_id, limit=chunk_size)
+                if rows:
+                    yield [(course, *row) for row in rows]
+                    after_id = rows[-1][0]
+                if not has_next:
+                    break
+
+    def search_questions(self, text, limit=PAGE_SIZE, courses=None):
+        return self._call("search_questions", text=text, limit=limit, courses=courses)
+
+    def get_question(self, course, q_id):
+        return self._call("get_question", course=course, q_id=q_id)
+
+    def add_question(self, course, values):
+        return self._call("add_question", course=course, values=values)
+
+    def add_questions(self, rows):
+        return self._call("add_questions", rows=rows)
+
+    def update_question(self, course, q_id, values):
+        return self._call("update_question", course=course, q_id=q_id, values=values)
+
+    def delete_question(self, course, q_id):
+        return self._call("delete_question", course=course, q_id=q_id)
+
+    def find_similar(self, course, values, exclude_id=None, threshold=None, limit=5):
+        params = {"course": course, "values": values, "exclude_id": exclude_id, "limit": limit}
+        if threshold is not None:
+            params["threshold"] = threshold
+        return self._call("find_similar", **params)
+
+    def find_duplicate_groups(self, course, threshold=None, progress=None):
+        # No progress updates over the network; the report arrives in one go
+        if progress:
+            progress("Waiting for the server...")
+        params = {"course": course}
+        if threshold is not None:
+            params["threshold"] = threshold
+        return self._call("find_duplicate_groups", **params)
+
+    def answer_analytics(self, course=None, limit=ANALYTICS_QUESTIONS):
+        return self._call("answer_analytics", course=course, limit=limit)
+
+
+class RemoteSelector:
+    # AdaptiveSelector kept on the server, which updates it from the answers
+    # in write_answer_log
+
+    def __init__(self, repo, user, courses):
+        self.repo = repo
+        self.user = user
+        self.courses = list(courses)
+
+    def pick(self, n):
+        return self.repo._call("adaptive_pick", user=self.user, courses=self.courses, n=n)
@@ -0,0 +1,107 @@
+import random
+
+# Columns a quiz needs, in the order show_question/check_answer expect them
+QUESTION_COLUMNS = "question, option_a, option_b, option_c, option_d, correct_answer"
+
+# Below this many candidate ids it is cheaper to just read the id column
+SMALL_BANK_IDS = 2000
+# How many rounds of random id probing to try before falling back to a scan
+MAX_PROBE_ROUNDS = 8
+
+
+def _placeholders(values):
+    return ", ".join("?" * len(values))
+
+
+def sample_question_ids(cursor, course_ids, n, rng=random):
+    # Pick n random question keys (qid) across the given courses without
+    # reading whole banks. Every stored question is equally likely.
+    if not course_ids or n <= 0:
+        return []
+
+    # Each course's id range. Separate MIN and MAX subqueries are single
+    # index seeks; a GROUP BY with both would scan every row of the course.
+    ranges = {}
+    for course_id in course_ids:
+        cursor.execute("""
+            SELECT (SELECT MIN(id) FROM questions WHERE course_id = ?),
+                   (SELECT MAX(id) FROM questions WHERE course_id = ?)
+        """, (course_id, course_id))
+        low, high = cursor.fetchone()
+        if low is not None:
+            ranges[course_id] = (low, high)
+    if not ranges:
+        return []
+
+    total_span = sum(high - low + 1 for low, high in ranges.values())
+    if total_span <= SMALL_BANK_IDS:
+        return _sample_from_id_scan(cursor, ranges, n, rng)
+
+    chosen = _sample_by_probing(cursor, ranges, n, total_span, rng)
+    if chosen is None:
+        # Banks are too sparse (lots of deleted ids) for probing to fill
+        # the quiz, so read just the key column instead
+        chosen = _sample_from_id_scan(cursor, ranges, n, rng)
+    return chosen
+
+
+def sample_questions(cursor, course_ids, n, rng=random):
+    # Sampled ids first, then a single query for just those rows
+    return fetch_questions(cursor, sample_question_ids(cursor, course_ids, n, rng))
+
+
+def fetch_questions(cursor, qids):
+    # Rows come back in the order of qids (the sampled, already random order)
+    return [row for _, row in fetch_questions_with_ids(cursor, qids)]
+
+
+def fetch_questions_with_ids(cursor, qids):
+    # [(qid, row), ...] in the order of qids; qids that no longer exist are left out
+    if not qids:
+        return []
+    cursor.execute(f"SELECT qid, {QUESTION_COLUMNS} FROM questions WHERE qid IN ({_placeholders(qids)})", list(qids))
+    rows = {row[0]: row[1:] for row in cursor.fetchall()}
+    return [(qid, rows[qid]) for qid in qids if qid in rows]
+
+
+def _sample_by_probing(cursor, ranges, n, total_span, rng):
+    # Each course is weighted by its id span, and candidate ids that don't
+    # exist are rejected, so the result is uniform over stored questions
+    course_ids = list(ranges)
+    weights = [ranges[c][1] - ranges[c][0] + 1 for c in course_ids]
+    chosen = []
+    seen = set()
+
+    for _ in range(MAX_PROBE_ROUNDS):
+        needed = n - len(chosen)
+        if needed <= 0:
+            break
+
+        candidates = {}
+        for course_id in rng.choices(course_ids, weights=weights, k=needed * 2):
+            low, high = ranges[course_id]
+            key = (course_id, rng.randint(low, high))
+            if key not in seen:
+                seen.add(key)
+                candidates.setdefault(course_id, []).append(key[1])
+
+        for course_id, ids in candidates.items():
+            # Answered from the (course_id, id) index alone
+            cursor.execute(
+                f"SELECT qid FROM questions WHERE course_id = ? AND id IN ({_placeholders(ids)})",
+                [course_id, *ids]
+            )
+            chosen.extend(row[0] for row in cursor.fetchall())
+
+    if len(chosen) < min(n, total_span):
+        return None
+
+    rng.shuffle(chosen)
+    return chosen[:n]
+
+
+def _sample_from_id_scan(cursor, ranges, n, rng):
+    course_ids = list(ranges)
+    cursor.execute(f"SELECT qid FROM questions WHERE course_id IN ({_placeholders(course_ids)})", course_ids)
+    all_ids = [row[0] for row in cursor.fetchall()]
+    return rng.sample(all_ids, min(n, len(all_ids)))
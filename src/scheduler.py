@@ -0,0 +1,135 @@
+import math
+import time
+
+# How often (ms) countdowns are redrawn while one is running
+FRAME_MS = 50
+
+
+class Timer:
+    # Handle for one scheduled callback; pass it to QuizScheduler.cancel()
+
+    __slots__ = ("deadline", "callback", "interval", "on_tick", "cancelled")
+
+    def __init__(self, deadline, callback, interval=None, on_tick=None):
+        self.deadline = deadline # time.monotonic() seconds
+        self.callback = callback
+        self.interval = interval # Seconds between runs for repeating timers
+        self.on_tick = on_tick # Called every frame with the seconds left (countdowns)
+        self.cancelled = False
+
+    def remaining(self, now=None):
+        return max(0.0, self.deadline - (time.monotonic() if now is None else now))
+
+
+class QuizScheduler:
+    # Owns every timer the screens use, so that leaving a screen (cancel_all),
+    # pausing or resuming is one call rather than a hunt for after() ids.
+    #
+    # However many timers are pending there is at most one Tk after()
+    # callback outstanding. It wakes at the next deadline, or every FRAME_MS
+    # while a countdown needs redrawing. Frames stay on a fixed grid, so a slow
+    # frame doesn't push the later ones back.
+
+    def __init__(self, master, frame_ms=FRAME_MS):
+        self.master = master
+        self.frame_ms = frame_ms
+        self._timers = []
+        self._after_id = None
+        self._paused_at = None
+        self._frame_origin = time.monotonic()
+
+    def after(self, delay_ms, callback):
+        # Run callback once, delay_ms from now
+        return self._add(Timer(time.monotonic() + delay_ms / 1000, callback))
+
+    def every(self, interval_ms, callback):
+        # Run callback every interval_ms until cancelled
+        interval = interval_ms / 1000
+        return self._add(Timer(time.monotonic() + interval, callback, interval=interval))
+
+    def countdown(self, seconds, on_tick, on_expire):
+        # on_tick(seconds_left) every frame, then on_expire() when time is up
+        on_tick(float(seconds))
+        return self._add(Timer(time.monotonic() + seconds, on_expire, on_tick=on_tick))
+
+    def cancel(self, timer):
+        if timer is not None:
+            timer.cancelled = True
+            if timer in self._timers:
+                self._timers.remove(timer)
+        if not self._timers:
+            self._stop()
+
+    def cancel_all(self):
+        # Drop every timer (and any pause), e.g. when leaving a screen
+        for timer in self._timers:
+            timer.cancelled = True
+        self._timers = []
+        self._paused_at = None
+        self._stop()
+
+    @property
+    def paused(self):
+        return self._paused_at is not None
+
+    def pause(self):
+        # Freeze every timer where it is
+        if self._paused_at is None:
+            self._paused_at = time.monotonic()
+            self._stop()
+
+    def resume(self):
+        # Carry on; deadlines move back by however long we were paused
+        if self._paused_at is None:
+            return
+        paused_for = time.monotonic() - self._paused_at
+        self._paused_at = None
+        for timer in self._timers:
+            timer.deadline += paused_for
+        self._wake()
+
+    def _add(self, timer):
+        self._timers.append(timer)
+        self._wake()
+        return timer
+
+    def _stop(self):
+        if self._after_id is not None:
+            self.master.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _wake(self):
+        # (Re)schedule the single after() for whatever is due first
+        if self._paused_at is not None or not self._timers:
+            return
+        self._stop()
+        now = time.monotonic()
+        delay = min(timer.deadline for timer in self._timers) - now
+        if any(timer.on_tick is not None for timer in self._timers):
+            frame = self.frame_ms / 1000
+            until_frame = frame - (now - self._frame_origin) % frame
+            delay = min(delay, until_frame)
+        # Round up: waking a fraction early would only mean an empty frame
+        self._after_id = self.master.after(max(0, math.ceil(delay * 1000)), self._frame)
+
+    def _frame(self):
+        self._after_id = None
+        try:
+            now = time.monotonic()
+            for timer in list(self._timers):
+                if timer.cancelled:
+                    continue
+                if now >= timer.deadline:
+                    if timer.interval is not None:
+                        # Skip missed runs rather than firing them back to back
+                        timer.deadline = max(timer.deadline + timer.interval, now)
+                    else:
+                        self._timers.remove(timer)
+                    timer.callback()
+                elif timer.on_tick is not None:
+                    timer.on_tick(timer.remaining(now))
+                if self._paused_at is not None:
+                    break # A callback paused us
+        finally:
+            # Keep going even if a callback raised (Tk reports the error)
+            self._wake()
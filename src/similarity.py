@@ -0,0 +1,89 @@
+import re
+import struct
+from hashlib import blake2b
+from operator import eq
+
+# MinHash signatures for spotting near-duplicate questions.
+#
+# A question (its text plus the four options) is turned into a set of
+# character shingles. Its signature is NUM_HASHES minimum hash values: every
+# shingle is hashed once, the low bits pick one of NUM_HASHES bins and each
+# bin keeps the smallest value it sees (one-permutation MinHash, a single
+# pass instead of NUM_HASHES). The fraction of bins where two signatures
+# agree estimates the Jaccard similarity of the two shingle sets.
+#
+# For lookups the signature is cut into BANDS bands of ROWS_PER_BAND values
+# and each band is hashed to a bucket key (locality-sensitive hashing). Two
+# questions are only compared if they share a bucket in at least one band,
+# so checking a new question costs a few index lookups, not a scan of the
+# whole course. With 16 bands of 4, pairs at 0.8 similarity share a bucket
+# over 99% of the time and pairs under 0.3 rarely do.
+
+NUM_HASHES = 64 # Must be a power of two (bins are picked with a bit mask)
+BANDS = 16
+ROWS_PER_BAND = NUM_HASHES // BANDS
+SHINGLE_SIZE = 4 # Characters per shingle
+# Estimated similarity at which two questions count as near-duplicates
+DEFAULT_THRESHOLD = 0.8
+
+_BIN_BITS = NUM_HASHES.bit_length() - 1
+_EMPTY = 1 << 32 # Above any 32-bit bin value
+_SIGNATURE_FORMAT = f"<{NUM_HASHES}I"
+
+
+def normalize(text):
+    # Lower case, punctuation dropped, whitespace collapsed
+    return " ".join(re.findall(r"\w+", text.lower()))
+
+
+def shingles(values):
+    # values: (question, option_a, option_b, option_c, option_d[, correct_answer])
+    text = normalize(" ".join(values[:5]))
+    if len(text) <= SHINGLE_SIZE:
+        return {text}
+    return {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+
+def signature(values):
+    # Tuple of NUM_HASHES 32-bit ints for one question
+    bins = [_EMPTY] * NUM_HASHES
+    for shingle in shingles(values):
+        h = int.from_bytes(blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "little")
+        index, value = h & (NUM_HASHES - 1), (h >> _BIN_BITS) & 0xFFFFFFFF
+        if value < bins[index]:
+            bins[index] = value
+
+    # Short questions leave some bins empty: fill each from the next
+    # non-empty bin so the positions still line up between signatures
+    filled = [value for value in bins if value != _EMPTY]
+    if len(filled) < NUM_HASHES:
+        original = list(bins)
+        for index in range(NUM_HASHES):
+            step = 1
+            while bins[index] == _EMPTY:
+                bins[index] = original[(index + step) % NUM_HASHES]
+                step += 1
+    return tuple(bins)
+
+
+def pack_signature(sig):
+    return struct.pack(_SIGNATURE_FORMAT, *sig)
+
+
+def unpack_signature(blob):
+    return struct.unpack(_SIGNATURE_FORMAT, blob)
+
+
+def band_keys(sig):
+    # [(band, bucket), ...]; bucket is a signed 64-bit int so SQLite stores it as-is
+    keys = []
+    for band in range(BANDS):
+        chunk = struct.pack(f"<{ROWS_PER_BAND}I", *sig[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND])
+        bucket = int.from_bytes(blake2b(chunk, digest_size=8).digest(), "little", signed=True)
+        keys.append((band, bucket))
+    return keys
+
+
+def estimate_similarity(sig_a, sig_b):
+    # Estimated Jaccard similarity, 0.0 - 1.0
+    return sum(map(eq, sig_a, sig_b)) / NUM_HASHES
@@ -0,0 +1,44 @@
+import sys
+import time
+
+# Per-phase startup timings for `main.py --profile-startup`.
+#
+# Foreground phases are marked in order as they finish, so each one is timed
+# from the end of the previous. Background steps (run on the DB worker while
+# the menu is already up) are timed from their own start.
+
+
+class StartupProfiler:
+
+    def __init__(self, started=None, enabled=True):
+        self.enabled = enabled
+        self.started = started if started is not None else time.perf_counter()
+        self._last = self.started
+        self.phases = [] # (phase, seconds, seconds since start)
+        self.background_steps = [] # (step, seconds, seconds since start when it finished)
+
+    def mark(self, phase):
+        # The foreground phase `phase` has just finished
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self.phases.append((phase, now - self._last, now - self.started))
+        self._last = now
+
+    def background(self, step, started):
+        # A background step that ran from `started` until now (any thread)
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self.background_steps.append((step, now - started, now - self.started))
+
+    def report(self, file=None):
+        if not self.enabled:
+            return
+        file = file if file is not None else sys.stderr
+        print("Startup profile (ms):", file=file)
+        for phase, seconds, at in self.phases:
+            print(f"  {phase:<36} {seconds * 1000:8.1f}   (at {at * 1000:7.1f})", file=file)
+        for step, seconds, at in self.background_steps:
+            print(f"  {step + ' [background]':<36} {seconds * 1000:8.1f}   (done at {at * 1000:7.1f})", file=file)
+        file.flush()
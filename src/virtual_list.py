@@ -0,0 +1,92 @@
+import math
+import tkinter as tk
+from tkinter import ttk
+
+
+class VirtualList:
+    # Scrollable list that only builds widgets for the rows in view.
+    #
+    # Every row has the same height. A small pool of row widgets (one screen
+    # full plus one) is created with create_row(parent) and, as the list is
+    # scrolled, moved to the visible positions and refilled with
+    # fill_row(widget, index). Opening a list of 50 or 50,000 rows costs the
+    # same number of widgets.
+
+    def __init__(self, parent, row_height, create_row, fill_row, bg=None):
+        self.row_height = row_height
+        self.create_row = create_row
+        self.fill_row = fill_row
+        self.count = 0
+        self._slots = [] # [canvas item id, row widget, index currently shown]
+
+        self.container = ttk.Frame(parent, style="TFrame")
+        self.container.pack(fill=tk.BOTH, expand=True)
+
+        self.canvas = tk.Canvas(self.container, highlightthickness=0)
+        if bg:
+            self.canvas.configure(bg=bg)
+        self.scrollbar = ttk.Scrollbar(self.container, orient="vertical", command=self.canvas.yview)
+        self.canvas.configure(yscrollcommand=self._on_view_changed)
+
+        self.canvas.pack(side="left", fill="both", expand=True)
+        self.scrollbar.pack(side="right", fill="y")
+
+        self.canvas.bind("<Configure>", self._on_resize)
+        self.canvas.bind_all("<MouseWheel>", self._on_mousewheel) # Windows, MacOS
+        self.canvas.bind_all("<Button-4>", self._on_mousewheel)   # Linux scroll up
+        self.canvas.bind_all("<Button-5>", self._on_mousewheel)   # Linux scroll down
+        self.canvas.configure(yscrollincrement=row_height // 4 or 1)
+
+    def set_count(self, count):
+        # Change the number of rows and redraw from the top
+        self.count = count
+        self.canvas.configure(scrollregion=(0, 0, 0, count * self.row_height))
+        self.canvas.yview_moveto(0)
+        self.refresh(force=True)
+
+    def refresh(self, force=False):
+        # Re-fill the pooled rows for the current scroll position. Pass
+        # force=True when the underlying data changed.
+        if not self.canvas.winfo_exists():
+            return
+        self._ensure_pool()
+        first = int(self.canvas.canvasy(0) // self.row_height)
+        for slot, (item, widget, shown) in enumerate(self._slots):
+            index = first + slot
+            if index >= self.count:
+                self.canvas.itemconfigure(item, state="hidden")
+                self._slots[slot][2] = None
+                continue
+            self.canvas.coords(item, 0, index * self.row_height)
+            self.canvas.itemconfigure(item, state="normal")
+            if force or shown != index:
+                self.fill_row(widget, index)
+                self._slots[slot][2] = index
+
+    def _ensure_pool(self):
+        # One more row than fits, so a partly scrolled view is always covered
+        height = max(self.canvas.winfo_height(), self.row_height)
+        wanted = math.ceil(height / self.row_height) + 1
+        width = self.canvas.winfo_width()
+        while len(self._slots) < wanted:
+            widget = self.create_row(self.canvas)
+            item = self.canvas.create_window(0, 0, window=widget, anchor="nw", height=self.row_height, width=width)
+            self._slots.append([item, widget, None])
+
+    def _on_resize(self, event):
+        for item, _, _ in self._slots:
+            self.canvas.itemconfigure(item, width=event.width)
+        self.refresh()
+
+    def _on_view_changed(self, first, last):
+        self.scrollbar.set(first, last)
+        self.refresh()
+
+    def _on_mousewheel(self, event):
+        if not self.canvas.winfo_exists():
+            return
+        # Determine scroll direction (Linux uses button 4/5, others use delta)
+        if event.num == 5 or event.delta < 0:
+            self.canvas.yview_scroll(4, "units")
+        elif event.num == 4 or event.delta > 0:
+            self.canvas.yview_scroll(-4, "units")
@@ -0,0 +1,54 @@
+import os
+import sqlite3
+import sys
+
+import pytest
+
+# The modules in src/ import each other by bare name (the scripts run from there)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+# Old one-table-per-course layout, as created before schema versioning
+LEGACY_TABLE = """
+    CREATE TABLE {table} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        question TEXT NOT NULL,
+        option_a TEXT NOT NULL,
+        option_b TEXT NOT NULL,
+        option_c TEXT NOT NULL,
+        option_d TEXT NOT NULL,
+        correct_answer TEXT NOT NULL
+    )
+"""
+
+LEGACY_QUESTIONS = {
+    "business_law": [
+        ("What makes a contract void?", "Illegality", "Consideration", "Acceptance", "Offer", "A"),
+        ("Who is the principal in agency?", "The agent", "The party represented", "A third party", "The court", "B"),
+        ("What does UCC stand for?", "Uniform Commercial Code", "United Contract Code", "Universal Claims Court", "None", "A"),
+    ],
+    "database_management": [
+        ("Which key uniquely identifies a row?", "Foreign key", "Primary key", "Index", "View", "B"),
+        ("What does SQL stand for?", "Simple Query List", "Sorted Query Language", "Structured Query Language", "System Query Logic", "C"),
+    ],
+}
+
+
+@pytest.fixture
+def legacy_db(tmp_path):
+    # Path of a database in the old layout; business_law had its last row
+    # deleted, so its AUTOINCREMENT counter (4) is past its highest id (3)
+    path = str(tmp_path / "legacy.db")
+    conn = sqlite3.connect(path)
+    with conn:
+        for table, rows in LEGACY_QUESTIONS.items():
+            conn.execute(LEGACY_TABLE.format(table=table))
+            conn.executemany(
+                f"INSERT INTO {table} (question, option_a, option_b, option_c, option_d, correct_answer) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+        conn.execute("INSERT INTO business_law (question, option_a, option_b, option_c, option_d, correct_answer) "
+                     "VALUES ('Deleted', 'a', 'b', 'c', 'd', 'A')")
+        conn.execute("DELETE FROM business_law WHERE id = 4")
+    conn.close()
+    return path
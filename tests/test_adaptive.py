@@ -0,0 +1,188 @@
+import random
+from collections import Counter
+
+import pytest
+
+from adaptive import AdaptiveSelector, SelectionBase, SelectorCache, SumTree, question_weight
+
+
+def test_sum_tree_totals_follow_updates():
+    tree = SumTree([1.0, 2.0, 3.0, 4.0, 5.0])
+    assert tree.total == 15.0
+    assert [tree.weight(i) for i in range(5)] == [1.0, 2.0, 3.0, 4.0, 5.0]
+
+    tree.update(2, 0.5)
+    tree.update(4, 0.0)
+    assert tree.total == pytest.approx(7.5)
+    assert tree.weight(2) == 0.5
+
+
+def test_sum_tree_find_maps_cumulative_ranges():
+    tree = SumTree([1.0, 0.0, 2.0, 3.0])
+    assert tree.find(0.0) == 0
+    assert tree.find(0.99) == 0
+    assert tree.find(1.0) == 2 # Zero-weight item 1 owns no range
+    assert tree.find(2.99) == 2
+    assert tree.find(3.0) == 3
+    assert tree.find(5.99) == 3
+
+
+def test_sum_tree_sampling_is_proportional_to_weights():
+    weights = [1.0, 0.0, 2.0, 4.0, 0.0, 8.0, 1.0]
+    tree = SumTree(weights)
+    rng = random.Random(1234)
+    draws = 60000
+    counts = Counter(tree.find(rng.random() * tree.total) for _ in range(draws))
+
+    assert counts[1] == 0 and counts[4] == 0
+    for index, weight in enumerate(weights):
+        expected = draws * weight / sum(weights)
+        assert counts[index] == pytest.approx(expected, rel=0.05, abs=1)
+
+
+def test_sum_tree_never_returns_padding():
+    # 5 items pad the tree out to 8 leaves; a value at the very top of the
+    # range must still land on a real item
+    tree = SumTree([1.0] * 5)
+    assert tree.find(tree.total) == 4
+    assert tree.find(tree.total * 2) < 5
+
+
+def test_empty_sum_tree():
+    tree = SumTree([])
+    assert tree.total == 0.0
+
+
+def make_selector(streaks, user="student"):
+    # One question per qid, everyone's record neutral; streak None = unseen
+    base = SelectionBase([(qid, 0, 0) for qid in sorted(streaks)])
+    history = [(qid, 1, streak) for qid, streak in streaks.items() if streak is not None]
+    return AdaptiveSelector(base, user, history)
+
+
+def test_selector_weights_match_the_student_history():
+    base = SelectionBase([(10, 4, 1), (20, 0, 0), (30, 9, 9), (40, 2, 2)])
+    selector = AdaptiveSelector(base, "sam", [(20, 3, 0), (40, 2, 2), (999, 1, 1)])
+    expected = [
+        question_weight(0, 0, 4, 1),
+        question_weight(3, 0, 0, 0),
+        question_weight(0, 0, 9, 9),
+        question_weight(2, 2, 2, 2),
+    ]
+    assert [selector.weight(i) for i in range(4)] == pytest.approx(expected)
+    assert selector.total == pytest.approx(sum(expected))
+    # The shared base is untouched: it still has everyone as unseen
+    assert base.tree.weight(1) == pytest.approx(question_weight(0, 0, 0, 0))
+
+
+def test_selector_memory_grows_with_history_not_bank():
+    base = SelectionBase([(qid, 0, 0) for qid in range(1, 4097)])
+    selector = AdaptiveSelector(base, "sam", [(5, 1, 1), (4000, 2, 0)])
+    assert len(selector.history) == 2
+    assert len(selector.deltas) <= 2 * 13 # One path of log2(4096) + 1 nodes each
+
+
+def test_base_position_uses_qid_order():
+    base = SelectionBase([(3, 0, 0), (8, 0, 0), (21, 0, 0)])
+    assert [base.position(qid) for qid in (3, 8, 21)] == [0, 1, 2]
+    assert base.position(4) is None
+    assert base.position(99) is None
+
+
+def test_pick_returns_distinct_qids_and_leaves_weights_alone():
+    selector = make_selector({10: None, 20: 0, 30: 1, 40: 3, 50: 5})
+    before = [selector.weight(i) for i in range(len(selector))]
+    deltas = dict(selector.deltas)
+
+    picked = selector.pick(5, rng=random.Random(7))
+    assert sorted(picked) == [10, 20, 30, 40, 50]
+    assert sorted(selector.pick(99, rng=random.Random(7))) == [10, 20, 30, 40, 50]
+    assert len(set(selector.pick(3, rng=random.Random(8)))) == 3
+    assert [selector.weight(i) for i in range(len(selector))] == before
+    assert selector.deltas == deltas
+
+
+def test_pick_favours_missed_and_unseen_questions():
+    selector = make_selector({1: 0, 2: None, 3: 5})
+    rng = random.Random(99)
+    firsts = Counter(selector.pick(1, rng=rng)[0] for _ in range(5000))
+    assert firsts[1] > firsts[2] > firsts[3]
+
+
+def test_record_updates_the_question_weight():
+    selector = make_selector({1: None, 2: None})
+    base = selector.base
+    for is_correct in (True, True):
+        base.record(0, is_correct)
+        selector.record(1, is_correct)
+    assert selector.weight(0) == pytest.approx(question_weight(2, 2, 2, 2))
+    base.record(0, False)
+    selector.record(1, False)
+    assert selector.weight(0) == pytest.approx(question_weight(3, 0, 3, 2))
+    assert selector.total == pytest.approx(selector.weight(0) + selector.weight(1))
+
+    selector.record(999, True) # Not in this selector's courses: ignored
+    assert len(selector.history) == 1
+
+
+class FakeRepository:
+    def __init__(self, stats, histories):
+        self.stats = stats # course -> [(qid, attempts, correct), ...]
+        self.histories = histories
+        self.base_builds = 0
+
+    def selection_base_stats(self, courses):
+        self.base_builds += 1
+        return sorted(row for course in courses for row in self.stats[course])
+
+    def user_history(self, user):
+        return self.histories.get(user, [])
+
+
+def test_selector_cache_shares_one_base_per_course_set():
+    repo = FakeRepository({"Law": [(1, 0, 0), (2, 0, 0)], "Finance": [(3, 0, 0)]}, {"ann": [(2, 1, 0)]})
+    cache = SelectorCache()
+    ann = cache.get(repo, "ann", ["Law", "Finance"])
+    bob = cache.get(repo, "bob", ["Finance", "Law"])
+    assert repo.base_builds == 1
+    assert ann.base is bob.base
+    assert cache.get(repo, "ann", ["Law", "Finance"]) is ann
+    assert cache.cached("bob", ["Law", "Finance"])
+    assert ann.weight(1) > bob.weight(1) # ann missed qid 2
+
+    cache.get(repo, "ann", ["Law"])
+    assert repo.base_builds == 2
+
+
+def test_selector_cache_records_answers():
+    repo = FakeRepository({"Law": [(1, 0, 0), (2, 0, 0)]}, {})
+    cache = SelectorCache()
+    ann = cache.get(repo, "ann", ["Law"])
+    bob = cache.get(repo, "bob", ["Law"])
+    cache.record([("ann", 1, True), (None, 2, False)])
+
+    assert ann.base.attempts.tolist() == [1, 1]
+    assert ann.history == {0: (1, 1)}
+    assert bob.history == {}
+    assert ann.weight(0) == pytest.approx(question_weight(1, 1, 1, 1))
+
+
+def test_selector_cache_forgets_changed_courses():
+    repo = FakeRepository({"Law": [(1, 0, 0)], "Finance": [(3, 0, 0)]}, {})
+    cache = SelectorCache()
+    cache.get(repo, "ann", ["Law"])
+    cache.get(repo, "ann", ["Finance"])
+    cache.forget(["Law"])
+    assert not cache.cached("ann", ["Law"])
+    assert cache.cached("ann", ["Finance"])
+    cache.get(repo, "ann", ["Law"])
+    assert repo.base_builds == 3
+
+
+def test_selector_cache_is_bounded():
+    repo = FakeRepository({"Law": [(1, 0, 0)]}, {})
+    cache = SelectorCache(max_selectors=2)
+    for user in ("a", "b", "c"):
+        cache.get(repo, user, ["Law"])
+    assert not cache.cached("a", ["Law"])
+    assert cache.cached("b", ["Law"]) and cache.cached("c", ["Law"])
@@ -0,0 +1,114 @@
+import pytest
+
+import migrations
+from migrations import migrate
+from quiz_db import RESPONSE_TIME_BUCKETS_MS, Database, course_id
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = Database(str(tmp_path / "quiz.db"), pool_size=0)
+    yield db
+    db.close()
+
+
+def qid(repo, course, q_id):
+    return repo.conn.execute(
+        "SELECT qid FROM questions WHERE course_id = ? AND id = ?", (course_id(course), q_id)
+    ).fetchone()[0]
+
+
+def add_questions(repo):
+    law = repo.add_question("Business Law", ("What makes a contract void?", "Illegality", "Consideration", "Acceptance", "Offer", "A"))
+    finance = repo.add_question("Managerial Finance", ("What does NPV discount?", "Cash flows", "Assets", "Sales", "Debt", "A"))
+    return qid(repo, "Business Law", law), qid(repo, "Managerial Finance", finance)
+
+
+def log_answers(repo, attempt_id, answers):
+    # answers: [(qid, selected, is_correct, response_ms), ...]
+    repo.write_answer_log(
+        [(attempt_id, "sam", "Business Law,Managerial Finance", 0.0, len(answers))],
+        [(attempt_id, "sam", qid, selected, is_correct, float(i), response_ms)
+         for i, (qid, selected, is_correct, response_ms) in enumerate(answers)],
+        [(attempt_id, sum(answer[2] for answer in answers), 100.0)]
+    )
+
+
+def test_aggregates_follow_the_answer_log(db):
+    migrate(db.connection)
+    repo = db.repository()
+    law, finance = add_questions(repo)
+
+    log_answers(repo, "a1", [(law, "B", False, 800), (law, "A", True, 2500), (law, "", False, None)])
+    log_answers(repo, "a2", [(law, "C", False, 120000), (law, "A", True, 1500), (finance, "A", True, 4000)])
+
+    analytics = repo.answer_analytics()
+    assert analytics["courses"] == [("Business Law", 5, 2), ("Managerial Finance", 1, 1)]
+    expected = [0] * (len(RESPONSE_TIME_BUCKETS_MS) + 1)
+    expected[0] += 1 # 800 ms
+    expected[1] += 1 # 1500 ms
+    expected[2] += 1 # 2500 ms
+    expected[3] += 1 # 4000 ms
+    expected[-1] += 1 # 120 s, slower than the last bucket
+    assert analytics["response_times"] == expected
+
+    # Only questions with MIN_DIFFICULTY_ATTEMPTS answers are ranked; the
+    # timeout counts as an attempt but has no response time
+    assert analytics["hardest"] == [
+        ("Business Law", 1, "What makes a contract void?", "A", 5, 2, 2, 1, 1, 0, 1, (800 + 2500 + 120000 + 1500) // 4)
+    ]
+
+    finance_only = repo.answer_analytics("Managerial Finance")
+    assert finance_only["courses"] == [("Managerial Finance", 1, 1)]
+    assert sum(finance_only["response_times"]) == 1
+    assert finance_only["hardest"] == []
+
+
+def test_hardest_questions_are_ordered_by_accuracy(db):
+    migrate(db.connection)
+    repo = db.repository()
+    easy = repo.add_question("Business Law", ("Easy?", "a", "b", "c", "d", "A"))
+    hard = repo.add_question("Business Law", ("Hard?", "a", "b", "c", "d", "A"))
+    easy_qid, hard_qid = qid(repo, "Business Law", easy), qid(repo, "Business Law", hard)
+    log_answers(repo, "a1", [(easy_qid, "A", True, 1000)] * 4 + [(easy_qid, "B", False, 1000)] +
+                            [(hard_qid, "B", False, 1000)] * 4 + [(hard_qid, "A", True, 1000)])
+
+    assert [row[2] for row in repo.answer_analytics()["hardest"]] == ["Hard?", "Easy?"]
+    assert [row[2] for row in repo.answer_analytics(limit=1)["hardest"]] == ["Hard?"]
+    repo.delete_question("Business Law", hard)
+    assert [row[2] for row in repo.answer_analytics()["hardest"]] == ["Easy?"]
+
+
+def test_migration_backfills_recorded_answers(db, monkeypatch):
+    # A database from before the analytics aggregates, with answers already logged
+    monkeypatch.setattr(migrations, "MIGRATIONS", migrations.MIGRATIONS[:-1])
+    migrate(db.connection)
+    monkeypatch.undo()
+    conn = db.connection
+    repo = db.repository()
+    law, finance = add_questions(repo)
+    with conn:
+        conn.executemany(
+            "INSERT INTO quiz_answers (attempt_id, qid, selected, is_correct, answered_at) VALUES ('a1', ?, ?, ?, 0)",
+            [(law, "A", 1), (law, "B", 0), (law, "B", 0), (law, "", 0), (finance, "D", 0)]
+        )
+        conn.executemany("INSERT INTO question_stats (qid, attempts, correct) VALUES (?, ?, ?)",
+                         [(law, 4, 1), (finance, 1, 0)])
+
+    assert migrate(conn) == ["answer analytics aggregates"]
+    analytics = repo.answer_analytics()
+    assert analytics["courses"] == [("Business Law", 4, 1), ("Managerial Finance", 1, 0)]
+    # Response times weren't recorded before, so the histogram starts empty
+    assert analytics["response_times"] == [0] * (len(RESPONSE_TIME_BUCKETS_MS) + 1)
+    picks = conn.execute(
+        "SELECT qid, picked_a, picked_b, picked_c, picked_d, timed_out FROM question_stats ORDER BY qid"
+    ).fetchall()
+    assert picks == [(law, 1, 2, 0, 0, 1), (finance, 0, 0, 0, 1, 0)]
+
+    # New answers add to the backfilled figures
+    log_answers(repo, "a2", [(law, "A", True, 1200)])
+    analytics = repo.answer_analytics()
+    assert analytics["courses"][0] == ("Business Law", 5, 2)
+    assert analytics["hardest"] == [
+        ("Business Law", 1, "What makes a contract void?", "A", 5, 2, 2, 2, 0, 0, 1, 1200)
+    ]
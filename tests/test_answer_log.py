@@ -0,0 +1,92 @@
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+import pytest
+
+import answer_log
+from answer_log import AnswerLog
+
+
+class FlakyDatabase:
+    # Stands in for Database: write_answer_log fails `failures` times first
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.batches = []
+        self.written = threading.Event()
+
+    @contextmanager
+    def pooled(self):
+        yield None
+
+    def repository(self, conn=None):
+        return self
+
+    def write_answer_log(self, started, answers, finished):
+        if self.failures > 0:
+            self.failures -= 1
+            raise sqlite3.OperationalError("database is locked")
+        self.batches.append((started, answers, finished))
+        self.written.set()
+
+    def answers(self):
+        return [row for _, answers, _ in self.batches for row in answers]
+
+
+@pytest.fixture(autouse=True)
+def quick_retries(monkeypatch):
+    monkeypatch.setattr(answer_log, "RETRY_DELAY", 0.01)
+
+
+def test_batches_are_written_in_order():
+    db = FlakyDatabase()
+    log = AnswerLog(db, flush_interval=60)
+    attempt = log.start_attempt("sam", ["Business Law"], 2)
+    log.log_answer(attempt, "sam", 1, "A", True, response_ms=900)
+    log.log_answer(attempt, "sam", 2, "C", False)
+    log.finish_attempt(attempt, 1)
+    assert db.written.wait(5)
+    log.close()
+
+    assert [row[2] for row in db.answers()] == [1, 2]
+    started = [row for batch in db.batches for row in batch[0]]
+    finished = [row for batch in db.batches for row in batch[2]]
+    assert [row[0] for row in started] == [attempt]
+    assert [row[:2] for row in finished] == [(attempt, 1)]
+
+
+def test_failed_write_is_retried():
+    db = FlakyDatabase(failures=2)
+    log = AnswerLog(db, flush_interval=60)
+    attempt = log.start_attempt("sam", ["Business Law"], 1)
+    log.log_answer(attempt, "sam", 1, "A", True)
+    log.flush()
+    assert db.written.wait(5)
+    assert isinstance(log.last_error, sqlite3.OperationalError)
+
+    # Answers logged while the retries were pending go out after the kept batch
+    log.log_answer(attempt, "sam", 2, "B", False)
+    log.close()
+    assert db.failures == 0
+    assert [row[2] for row in db.answers()] == [1, 2]
+
+
+def test_close_writes_what_is_buffered():
+    db = FlakyDatabase(failures=1)
+    log = AnswerLog(db, flush_interval=60)
+    attempt = log.start_attempt("sam", ["Business Law"], 1)
+    log.log_answer(attempt, "sam", 1, "D", False)
+    log.close()
+    assert [row[2] for row in db.answers()] == [1]
+    with pytest.raises(RuntimeError):
+        log.log_answer(attempt, "sam", 2, "A", True)
+
+
+def test_close_gives_up_after_close_attempts(capsys):
+    db = FlakyDatabase(failures=answer_log.CLOSE_ATTEMPTS)
+    log = AnswerLog(db, flush_interval=60)
+    log.start_attempt("sam", ["Business Law"], 1)
+    log.close()
+    assert db.batches == []
+    assert "could not save 1 events" in capsys.readouterr().err
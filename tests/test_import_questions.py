@@ -0,0 +1,105 @@
+import json
+
+import pytest
+
+from export_questions import export_questions
+from import_questions import import_file, iter_json_array
+from migrations import migrate
+from quiz_db import Database
+
+ROWS = [
+    {"course": "Business Law", "question": "What makes a contract void?", "option_a": "Illegality",
+     "option_b": "Consideration", "option_c": "Acceptance", "option_d": "Offer", "correct_answer": "a"},
+    {"course": "business_law", "question": "Who is the principal in agency?", "option_a": "The agent",
+     "option_b": "The party represented", "option_c": "A third party", "option_d": "The court", "correct_answer": "B"},
+    {"course": "Managerial Finance", "question": "What does NPV stand for?", "option_a": "Net present value",
+     "option_b": "New price volume", "option_c": "Net profit variance", "option_d": "None", "correct_answer": "A"},
+]
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = Database(str(tmp_path / "quiz.db"), pool_size=0)
+    migrate(db.connection)
+    yield db
+    db.close()
+
+
+def questions(db):
+    return db.connection.execute("""
+        SELECT c.name, q.id, q.question, q.correct_answer
+        FROM questions AS q JOIN courses AS c ON c.id = q.course_id
+        ORDER BY c.name, q.id
+    """).fetchall()
+
+
+def write_json(path, rows):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(rows, f)
+    return str(path)
+
+
+def test_import_json_array(db, tmp_path):
+    rows = ROWS + [{"course": "Business Law", "question": "Bad answer", "option_a": "a", "option_b": "b",
+                    "option_c": "c", "option_d": "d", "correct_answer": "E"}, "not an object"]
+    report = import_file(db.repository(), write_json(tmp_path / "q.json", rows), batch_size=2)
+    assert report.inserted == 3
+    assert [row for row, _ in report.errors] == [4, 5]
+    assert [row[:2] for row in questions(db)] == [("Business Law", 1), ("Business Law", 2), ("Managerial Finance", 1)]
+
+
+def test_json_array_is_streamed():
+    import io
+    text = json.dumps([{"n": 1}, 123456, -2.5e-3, "a,]b", [1, [2]], None, True])
+    for chunk_size in (1, 2, 3, 7, 64):
+        assert list(iter_json_array(io.StringIO(text), chunk_size)) == json.loads(text)
+    for bad in ("", "{}", "[1,", "[1 2]", "[1.]"):
+        with pytest.raises(ValueError):
+            list(iter_json_array(io.StringIO(bad), 2))
+
+
+def test_plain_import_renumbers(db, tmp_path):
+    path = write_json(tmp_path / "q.json", [dict(row, id=40) for row in ROWS])
+    import_file(db.repository(), path)
+    import_file(db.repository(), path)
+    assert [row[:2] for row in questions(db)] == [
+        ("Business Law", 1), ("Business Law", 2), ("Business Law", 3), ("Business Law", 4),
+        ("Managerial Finance", 1), ("Managerial Finance", 2),
+    ]
+
+
+def test_keep_ids_restores_an_export(db, tmp_path):
+    repo = db.repository()
+    import_file(repo, write_json(tmp_path / "q.json", ROWS))
+    repo.delete_question("Business Law", 1)
+    before = questions(db)
+    qids = db.connection.execute("SELECT qid FROM questions ORDER BY qid").fetchall()
+    backup = str(tmp_path / "backup.jsonl.gz")
+    assert export_questions(repo, backup) == 2
+
+    # Importing it again changes nothing and keeps every qid
+    report = import_file(repo, backup, keep_ids=True)
+    assert report.inserted == 2 and report.errors == []
+    assert questions(db) == before
+    assert db.connection.execute("SELECT qid FROM questions ORDER BY qid").fetchall() == qids
+
+    # Into an empty database: same ids, and new questions carry on after them
+    other = Database(str(tmp_path / "other.db"), pool_size=0)
+    try:
+        migrate(other.connection)
+        import_file(other.repository(), backup, keep_ids=True)
+        assert questions(other) == before
+        assert other.repository().add_question("Business Law", ("New?", "a", "b", "c", "d", "A")) == 3
+    finally:
+        other.close()
+
+
+def test_keep_ids_updates_in_place(db, tmp_path):
+    repo = db.repository()
+    import_file(repo, write_json(tmp_path / "q.json", ROWS[:1]))
+    changed = dict(ROWS[0], id=1, question="What makes a contract voidable?")
+    report = import_file(repo, write_json(tmp_path / "changed.json", [changed, dict(ROWS[1])]), keep_ids=True)
+    assert report.inserted == 1
+    assert report.errors[0][0] == 2 and "id" in report.errors[0][1]
+    assert questions(db) == [("Business Law", 1, "What makes a contract voidable?", "A")]
+    assert repo.search_questions("voidable")[0][1] == 1
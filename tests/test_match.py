@@ -0,0 +1,55 @@
+import pytest
+
+from match import BuzzerMatch, CORRECT_POINTS, WRONG_POINTS
+
+QUESTIONS = [
+    ("2 + 2?", "3", "4", "5", "6", "B"),
+    ("Capital of France?", "Paris", "Rome", "Madrid", "Berlin", "A"),
+]
+
+
+def test_first_buzz_wins_and_locks_out():
+    match = BuzzerMatch(["ann", "bob"], QUESTIONS)
+    match.open_buzzers()
+    first = match.buzz("ann", 100)
+    late = match.buzz("bob", 50)
+    assert first.won and not late.won
+    assert match.arbiter.holds(first)
+    assert first.latency_ns is not None
+
+
+def test_buzz_is_not_held_after_the_question_changes():
+    # A buzz still queued for the screen must not count on the next question
+    match = BuzzerMatch(["ann", "bob"], QUESTIONS)
+    match.open_buzzers()
+    stale = match.buzz("ann")
+    match.next_question()
+    match.open_buzzers()
+    assert not match.arbiter.holds(stale)
+    fresh = match.buzz("bob")
+    assert match.arbiter.holds(fresh) and not match.arbiter.holds(stale)
+
+
+def test_answered_buzz_is_not_held():
+    match = BuzzerMatch(["ann", "bob"], QUESTIONS)
+    match.open_buzzers()
+    buzz = match.buzz("ann")
+    result = match.answer("B")
+    assert result.is_correct and result.points == CORRECT_POINTS
+    assert not match.arbiter.holds(buzz)
+    with pytest.raises(ValueError):
+        match.answer("B")
+
+
+def test_wrong_answer_rebounds_to_the_others():
+    match = BuzzerMatch(["ann", "bob"], QUESTIONS)
+    match.open_buzzers()
+    match.buzz("ann")
+    result = match.answer("A")
+    assert not result.is_correct and result.rebound
+    assert match.scores["ann"] == WRONG_POINTS
+
+    match.open_buzzers()
+    assert not match.buzz("ann").won # Locked out for this question
+    assert match.buzz("bob").won
+    assert not match.answer("C").rebound
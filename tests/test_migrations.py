@@ -0,0 +1,84 @@
+import sqlite3
+
+import pytest
+
+import migrations
+from conftest import LEGACY_QUESTIONS
+from migrations import LATEST_VERSION, migrate, schema_version
+from quiz_db import Database, course_id, legacy_tables
+
+
+def test_migrate_moves_legacy_tables_into_questions(legacy_db):
+    conn = sqlite3.connect(legacy_db)
+    applied = migrate(conn)
+
+    assert len(applied) == LATEST_VERSION
+    assert schema_version(conn) == LATEST_VERSION
+    assert legacy_tables(conn) == []
+    for course, table in (("Business Law", "business_law"), ("Database Management", "database_management")):
+        rows = conn.execute(
+            "SELECT id, question, option_a, option_b, option_c, option_d, correct_answer "
+            "FROM questions WHERE course_id = ? ORDER BY id",
+            (course_id(course),)
+        ).fetchall()
+        assert rows == [(i, *row) for i, row in enumerate(LEGACY_QUESTIONS[table], start=1)]
+    conn.close()
+
+
+def test_migrate_keeps_autoincrement_ids(legacy_db):
+    conn = sqlite3.connect(legacy_db)
+    migrate(conn)
+    last_ids = dict(conn.execute("SELECT name, last_id FROM courses"))
+    assert last_ids["Business Law"] == 4 # The deleted id 4 is never handed out again
+    assert last_ids["Database Management"] == 2
+    assert last_ids["Business Analytics"] == 0
+    conn.close()
+
+    db = Database(legacy_db, pool_size=0)
+    try:
+        new_id = db.repository().add_question("Business Law", ("Q", "a", "b", "c", "d", "A"))
+    finally:
+        db.close()
+    assert new_id == 5
+
+
+def test_migrate_is_a_no_op_when_current(legacy_db):
+    conn = sqlite3.connect(legacy_db)
+    migrate(conn)
+    assert migrate(conn) == []
+    assert schema_version(conn) == LATEST_VERSION
+    conn.close()
+
+
+def test_migrate_creates_a_new_database(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "new.db"))
+    migrate(conn)
+    assert schema_version(conn) == LATEST_VERSION
+    assert conn.execute("SELECT COUNT(*) FROM questions").fetchone()[0] == 0
+    conn.close()
+
+
+def test_migrate_refuses_a_newer_database(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "newer.db"))
+    conn.execute(f"PRAGMA user_version = {LATEST_VERSION + 1}")
+    with pytest.raises(sqlite3.DatabaseError):
+        migrate(conn)
+    conn.close()
+
+
+def test_failed_migration_rolls_back(legacy_db, monkeypatch):
+    def broken(conn):
+        conn.execute("CREATE TABLE half_done (x)")
+        raise sqlite3.OperationalError("boom")
+
+    # Fail right after the legacy tables have been moved
+    monkeypatch.setattr(migrations, "MIGRATIONS", migrations.MIGRATIONS[:2] + [("broken", broken)])
+    monkeypatch.setattr(migrations, "LATEST_VERSION", 3)
+    conn = sqlite3.connect(legacy_db)
+    with pytest.raises(sqlite3.OperationalError):
+        migrate(conn)
+
+    assert schema_version(conn) == 2 # The good migrations stay applied
+    assert legacy_tables(conn) == []
+    assert conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'half_done'").fetchone() is None
+    conn.close()
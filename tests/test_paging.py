@@ -0,0 +1,76 @@
+import pytest
+
+from migrations import migrate
+from quiz_db import Database
+
+COURSE = "Business Law"
+
+
+@pytest.fixture
+def repo(tmp_path):
+    # Ids 1..12 with 4, 5 and 9 deleted, plus a question in another course
+    db = Database(str(tmp_path / "quiz.db"), pool_size=0)
+    migrate(db.connection)
+    repo = db.repository()
+    repo.add_questions([(COURSE, (f"Question {i}?", "a", "b", "c", "d", "A")) for i in range(1, 13)])
+    repo.add_question("Managerial Finance", ("Elsewhere?", "a", "b", "c", "d", "A"))
+    for q_id in (4, 5, 9):
+        repo.delete_question(COURSE, q_id)
+    yield repo
+    db.close()
+
+
+def page(repo, **kwargs):
+    rows, has_prev, has_next = repo.page_question_titles(COURSE, limit=3, **kwargs)
+    return [row[0] for row in rows], has_prev, has_next
+
+
+def test_first_and_last_pages(repo):
+    assert page(repo) == ([1, 2, 3], False, True)
+    assert page(repo, after_id=10) == ([11, 12], True, False)
+    assert page(repo, before_id=13) == ([10, 11, 12], True, False)
+
+
+def test_next_and_prev_skip_deleted_ids(repo):
+    assert page(repo, after_id=3) == ([6, 7, 8], True, True)
+    assert page(repo, after_id=8) == ([10, 11, 12], True, False)
+    assert page(repo, before_id=10) == ([6, 7, 8], True, True)
+    assert page(repo, before_id=6) == ([1, 2, 3], False, True)
+
+
+def test_page_ending_exactly_at_the_last_id(repo):
+    # has_next is False without needing an empty page after it
+    assert page(repo, after_id=8)[2] is False
+    assert page(repo, after_id=12) == ([], False, False)
+    assert page(repo, before_id=1) == ([], False, False)
+
+
+def test_jump_to_an_id(repo):
+    assert page(repo, from_id=6) == ([6, 7, 8], True, True)
+    assert page(repo, from_id=4) == ([6, 7, 8], True, True) # Deleted: starts at the next one
+    assert page(repo, from_id=0) == ([1, 2, 3], False, True)
+    assert page(repo, from_id=50) == ([10, 11, 12], True, False) # Past the end: the last page
+
+
+def test_walking_forward_then_back_visits_every_question(repo):
+    forward, after_id, has_next = [], None, True
+    while has_next:
+        ids, _, has_next = page(repo, after_id=after_id)
+        forward += ids
+        after_id = ids[-1]
+    assert forward == [1, 2, 3, 6, 7, 8, 10, 11, 12]
+
+    backward, before_id, has_prev = [], forward[-1] + 1, True
+    while has_prev:
+        ids, has_prev, _ = page(repo, before_id=before_id)
+        backward = ids + backward
+        before_id = ids[0]
+    assert backward == forward
+
+
+def test_full_rows_and_empty_course(repo):
+    rows, has_prev, has_next = repo.page_questions(COURSE, after_id=11, limit=3)
+    assert rows == [(12, "Question 12?", "a", "b", "c", "d", "A")]
+    assert (has_prev, has_next) == (True, False)
+    assert repo.page_questions("Business Analytics") == ([], False, False)
+    assert repo.page_questions("Business Analytics", from_id=5) == ([], False, False)
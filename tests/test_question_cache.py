@@ -0,0 +1,131 @@
+import random
+
+import pytest
+
+from migrations import migrate
+from question_cache import CourseBank, QuestionCache
+from quiz_db import Database
+
+
+def rows(first_qid, count):
+    return [(qid, f"Question {qid}?", "a", "b", "c", "d", "A") for qid in range(first_qid, first_qid + count)]
+
+
+def bank_bytes(count):
+    bank = CourseBank()
+    for row in rows(1, count):
+        bank.add(row[0], row[1:])
+    return bank.nbytes
+
+
+def test_least_recently_used_course_is_evicted():
+    # Room for two courses of 100 questions but not three
+    cache = QuestionCache(max_bytes=bank_bytes(100) * 5 // 2)
+    cache.load("Business Law", [rows(1, 100)])
+    cache.load("Managerial Finance", [rows(1001, 100)])
+    assert cache.get("Business Law") is not None # Now the most recently used
+
+    cache.load("Business Analytics", [rows(2001, 100)])
+    assert cache.get("Managerial Finance") is None
+    assert cache.get("Business Law") is not None
+    assert cache.get("Business Analytics") is not None
+    assert cache.nbytes <= cache.max_bytes
+
+
+def test_growing_course_evicts_others_but_not_itself():
+    cache = QuestionCache(max_bytes=bank_bytes(100) * 5 // 2)
+    cache.load("Business Law", [rows(1, 100)])
+    cache.load("Managerial Finance", [rows(1001, 100)])
+    for row in rows(1101, 80):
+        cache.add("Managerial Finance", row[0], row[1:])
+    assert cache.get("Business Law") is None
+    assert len(cache.get("Managerial Finance")) == 180
+
+
+def test_course_too_big_for_the_cache():
+    cache = QuestionCache(max_bytes=bank_bytes(100))
+    read = []
+
+    def chunks():
+        for start in range(1, 1001, 50):
+            read.append(start)
+            yield rows(start, 50)
+
+    assert cache.load("Business Law", chunks()) is None
+    assert cache.is_too_big("Business Law")
+    assert len(read) < 20 # Stopped reading once it couldn't fit
+    cache.invalidate("Business Law")
+    assert not cache.is_too_big("Business Law")
+
+
+@pytest.mark.parametrize("write", [
+    lambda cache: cache.add("Business Law", 500, ("New?", "a", "b", "c", "d", "A")),
+    lambda cache: cache.update("Business Law", 1, ("Edited?", "a", "b", "c", "d", "A")),
+    lambda cache: cache.remove("Business Law", 1),
+    lambda cache: cache.invalidate(),
+])
+def test_load_that_raced_a_write_is_dropped(write):
+    cache = QuestionCache()
+
+    def chunks():
+        yield rows(1, 10)
+        write(cache) # Lands after the first chunk was read
+        yield rows(11, 10)
+
+    assert cache.load("Business Law", chunks()) is None
+    assert cache.get("Business Law") is None
+    # The next load sees the write
+    assert cache.load("Business Law", [rows(1, 20)]) is not None
+
+
+def test_writes_to_other_courses_do_not_drop_a_load():
+    cache = QuestionCache()
+
+    def chunks():
+        yield rows(1, 10)
+        cache.remove("Managerial Finance", 1001)
+
+    assert cache.load("Business Law", chunks()) is not None
+
+
+def test_sample_and_lookup_span_courses():
+    cache = QuestionCache()
+    cache.load("Business Law", [rows(1, 5)])
+    cache.load("Managerial Finance", [rows(101, 5)])
+    courses = ["Business Law", "Managerial Finance"]
+
+    sample = cache.sample(courses, 20, random.Random(1))
+    assert len(sample) == 10 and len(set(sample)) == 10
+    assert [qid for qid, _ in cache.lookup(courses, [103, 2])] == [103, 2]
+    assert cache.lookup(courses, [103, 999]) is None
+    assert cache.sample(["Business Law", "Business Analytics"], 3) is None
+
+
+def test_bank_keeps_qids_sorted():
+    bank = CourseBank()
+    for qid in (5, 1, 3):
+        bank.add(qid, (f"Q{qid}", "a", "b", "c", "d", "A"))
+    bank.remove(3)
+    bank.remove(4) # Not there
+    bank.update(5, ("Q5 edited", "a", "b", "c", "d", "A"))
+    assert list(bank.ids) == [1, 5]
+    assert bank.get(1)[0] == "Q1"
+    assert bank.get(5)[0] == "Q5 edited"
+    assert bank.get(3) is None
+
+
+def test_repository_keeps_the_cache_current(tmp_path):
+    db = Database(str(tmp_path / "quiz.db"), pool_size=0, cache=QuestionCache())
+    migrate(db.connection)
+    repo = db.repository()
+    for i in range(3):
+        repo.add_question("Business Law", (f"Question {i}?", "a", "b", "c", "d", "A"))
+    assert repo.warm_cache(["Business Law"])
+
+    repo.add_question("Business Law", ("Added later?", "a", "b", "c", "d", "A"))
+    repo.update_question("Business Law", 1, ("Edited?", "a", "b", "c", "d", "A"))
+    repo.delete_question("Business Law", 2)
+    cached = sorted(row[0] for row in repo.sample_questions(["Business Law"], 10))
+    assert cached == ["Added later?", "Edited?", "Question 2?"]
+    assert db.cache.misses == 1 # Served from the cache after the first load
+    db.close()
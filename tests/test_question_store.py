@@ -0,0 +1,34 @@
+from question_store import CompactQuestionStore
+
+ROWS = [
+    ("What is 2 + 2?", "3", "4", "5", "6", "B"),
+    ("Café owner's liability?", "Limited", "Unlimited", "None", "Shared", "A"),
+    ("Which is a bond?", "Debt", "Equity", "Cash", "Goodwill", "A"),
+]
+
+
+def test_rows_round_trip():
+    store = CompactQuestionStore(ROWS)
+    assert len(store) == 3
+    assert list(store) == ROWS
+    assert store[-1] == ROWS[-1]
+    assert store[0:2] == ROWS[0:2]
+
+
+def test_insert_and_remove_keep_order():
+    store = CompactQuestionStore(ROWS)
+    new = ("Inserted?", "a", "b", "c", "d", "D")
+    store.insert(1, new)
+    assert list(store) == [ROWS[0], new, ROWS[1], ROWS[2]]
+    store.remove(0)
+    store.remove(2)
+    assert list(store) == [new, ROWS[1]]
+
+
+def test_set_and_compact():
+    store = CompactQuestionStore(ROWS)
+    store.set(1, ("Changed?", "w", "x", "y", "z", "C"))
+    store.remove(0)
+    store.compact()
+    assert list(store) == [("Changed?", "w", "x", "y", "z", "C"), ROWS[2]]
+    assert len(store._text) == sum(len(text.encode("utf-8")) for row in store for text in row[:5])
@@ -0,0 +1,130 @@
+import os
+
+import pytest
+
+from conftest import LEGACY_QUESTIONS
+from migrations import migrate
+from quiz_db import Database
+from quiz_pack import HEADER, QuizPack, QuizPackError, build_pack
+
+COURSES = ["Business Law", "Database Management"]
+ALL_ROWS = LEGACY_QUESTIONS["business_law"] + LEGACY_QUESTIONS["database_management"]
+
+
+@pytest.fixture
+def repo(legacy_db):
+    db = Database(legacy_db, pool_size=0)
+    migrate(db.connection)
+    yield db.repository()
+    db.close()
+
+
+@pytest.fixture
+def pack_path(repo, tmp_path):
+    path = str(tmp_path / "exam.qpack")
+    build_pack(repo, path, COURSES, name="Exam")
+    return path
+
+
+def rewrite(path, change):
+    with open(path, "rb") as f:
+        data = bytearray(f.read())
+    with open(path, "wb") as f:
+        f.write(change(data))
+
+
+def test_round_trip(pack_path):
+    with QuizPack(pack_path) as pack:
+        assert pack.name == "Exam"
+        assert pack.courses == COURSES
+        assert len(pack) == len(ALL_ROWS)
+        assert list(pack) == ALL_ROWS
+        assert pack[-1] == ALL_ROWS[-1]
+        assert len(set(pack.qids)) == len(ALL_ROWS)
+
+
+def test_keyed_round_trip(repo, tmp_path):
+    path = str(tmp_path / "keyed.qpack")
+    build_pack(repo, path, COURSES, key=b"secret")
+    with QuizPack(path, key=b"secret") as pack:
+        assert list(pack) == ALL_ROWS
+
+
+def test_shuffled_pack_is_reproducible(repo, tmp_path):
+    first, second = str(tmp_path / "a.qpack"), str(tmp_path / "b.qpack")
+    build_pack(repo, first, COURSES, shuffle=True, seed=3)
+    build_pack(repo, second, COURSES, shuffle=True, seed=3)
+    with QuizPack(first) as a, QuizPack(second) as b:
+        assert a.shuffled
+        assert list(a) == list(b)
+        assert sorted(a) == sorted(ALL_ROWS)
+
+
+@pytest.mark.parametrize("offset", [HEADER.size, HEADER.size + 200, -1])
+def test_changed_byte_fails_checksum(pack_path, offset):
+    def flip(data):
+        data[offset] ^= 0x01
+        return data
+
+    rewrite(pack_path, flip)
+    with pytest.raises(QuizPackError, match="checksum"):
+        QuizPack(pack_path)
+
+
+def test_changed_answer_fails_checksum(pack_path):
+    # Quietly change the first "A" answer to "B", the edit a cheat would make
+    with QuizPack(pack_path) as pack:
+        answer_at = pack._answers_start
+    rewrite(pack_path, lambda data: data[:answer_at] + b"B" + data[answer_at + 1:])
+    with pytest.raises(QuizPackError, match="checksum"):
+        QuizPack(pack_path)
+
+
+def test_truncated_pack(pack_path):
+    rewrite(pack_path, lambda data: data[:HEADER.size + 16])
+    with pytest.raises(QuizPackError, match="truncated"):
+        QuizPack(pack_path)
+
+
+def test_missing_tail_fails(pack_path):
+    rewrite(pack_path, lambda data: data[:-3])
+    with pytest.raises(QuizPackError):
+        QuizPack(pack_path)
+
+
+def test_not_a_pack(tmp_path):
+    empty = str(tmp_path / "empty.qpack")
+    open(empty, "wb").close()
+    with pytest.raises(QuizPackError, match="not a quiz pack"):
+        QuizPack(empty)
+
+    other = str(tmp_path / "other.qpack")
+    with open(other, "wb") as f:
+        f.write(os.urandom(HEADER.size * 2))
+    with pytest.raises(QuizPackError, match="not a quiz pack"):
+        QuizPack(other)
+
+
+def test_keyed_pack_needs_its_key(repo, tmp_path):
+    path = str(tmp_path / "keyed.qpack")
+    build_pack(repo, path, COURSES, key=b"secret")
+    with pytest.raises(QuizPackError, match="keyed pack"):
+        QuizPack(path)
+    with pytest.raises(QuizPackError, match="checksum"):
+        QuizPack(path, key=b"wrong")
+
+
+def test_unkeyed_pack_refused_when_a_key_is_set(pack_path):
+    # Otherwise an edited pack could be re-saved without the key
+    with pytest.raises(QuizPackError, match="not keyed"):
+        QuizPack(pack_path, key=b"secret")
+
+
+def test_unverified_open_skips_the_checksum(pack_path):
+    def flip(data):
+        data[-1] ^= 0x01
+        return data
+
+    rewrite(pack_path, flip)
+    with QuizPack(pack_path, verify=False) as pack:
+        assert len(pack) == len(ALL_ROWS)
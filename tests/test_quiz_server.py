@@ -0,0 +1,144 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+import quiz_server
+from adaptive import SelectorCache
+from answer_log import AnswerLog
+from migrations import migrate
+from quiz_db import Database
+from quiz_server import QuizServer
+from remote import RemoteDatabase, RemoteError
+
+PASSWORD = "letmein"
+COURSE = "Business Law"
+
+
+@pytest.fixture
+def server(legacy_db):
+    # A real server on a free localhost port, run on its own event loop thread
+    db = Database(legacy_db, pool_size=4, selectors=SelectorCache())
+    migrate(db.connection)
+    server = QuizServer(db, workers=4, admin_password=PASSWORD)
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    server.address = asyncio.run_coroutine_threadsafe(server.start("127.0.0.1", 0), loop).result(5)
+    yield server
+    asyncio.run_coroutine_threadsafe(server.close(), loop).result(5)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(5)
+    loop.close()
+    db.close()
+
+
+@pytest.fixture
+def client(server):
+    db = RemoteDatabase(*server.address)
+    yield db
+    db.close()
+
+
+def course_qids(server, course=COURSE):
+    return {row[0] for row in server.db.connection.execute(
+        "SELECT q.qid FROM questions AS q JOIN courses AS c ON c.id = q.course_id WHERE c.name = ?", (course,)
+    )}
+
+
+def test_client_start(client):
+    repo = client.repository()
+    assert repo.ping() == "pong"
+    rows = repo.sample_questions([COURSE], 2)
+    assert len(rows) == 2
+    assert all(len(row) == 6 for row in rows)
+
+
+def test_adaptive_pick(server, client):
+    picked = client.repository().adaptive_selector("ann", [COURSE]).pick(10)
+    assert sorted(picked) == sorted(course_qids(server))
+    assert server.db.selectors.cached("ann", [COURSE])
+
+
+def test_anonymous_picks_share_no_selector(server, client):
+    picked = client.repository().adaptive_selector(None, [COURSE]).pick(2)
+    assert len(set(picked)) == 2 and set(picked) <= course_qids(server)
+    assert not server.db.selectors.cached(None, [COURSE])
+
+
+def test_answer_log_write(server, client):
+    qid = min(course_qids(server))
+    client.repository().adaptive_selector("ann", [COURSE]).pick(1)
+    log = AnswerLog(client, flush_interval=60)
+    attempt = log.start_attempt("ann", [COURSE], 1)
+    log.log_answer(attempt, "ann", qid, "A", True, response_ms=1200)
+    log.finish_attempt(attempt, 1)
+    log.close()
+    assert log.last_error is None
+
+    conn = server.db.connection
+    assert conn.execute("SELECT user, score FROM quiz_attempts").fetchall() == [("ann", 1)]
+    assert conn.execute("SELECT qid, selected, response_ms FROM quiz_answers").fetchall() == [(qid, "A", 1200)]
+    assert conn.execute("SELECT attempts, streak FROM user_question_stats WHERE user = 'ann'").fetchall() == [(1, 1)]
+    # The server's selector for ann saw the answer too
+    selector = server.db.selectors.get(None, "ann", [COURSE])
+    assert selector.history == {selector.base.position(qid): (1, 1)}
+
+
+def test_admin_requests_need_a_login(server, client):
+    repo = client.repository()
+    values = ("New?", "a", "b", "c", "d", "A")
+    with pytest.raises(RemoteError, match="needs an admin login"):
+        repo.add_question(COURSE, values)
+
+    client.login("wrong")
+    with pytest.raises(RemoteError, match="needs an admin login"):
+        repo.add_question(COURSE, values)
+
+    other = RemoteDatabase(*server.address)
+    try:
+        other.login(PASSWORD)
+        new_id = other.repository().add_question(COURSE, values)
+        assert other.repository().get_question(COURSE, new_id)[0] == "New?"
+    finally:
+        other.close()
+
+
+def test_admin_write_drops_selectors(server):
+    admin = RemoteDatabase(*server.address)
+    try:
+        admin.login(PASSWORD)
+        repo = admin.repository()
+        repo.adaptive_selector("ann", [COURSE]).pick(1)
+        new_id = repo.add_question(COURSE, ("New?", "a", "b", "c", "d", "A"))
+        assert not server.db.selectors.cached("ann", [COURSE])
+        assert len(repo.adaptive_selector("ann", [COURSE]).pick(99)) == len(course_qids(server))
+        repo.delete_question(COURSE, new_id)
+        assert not server.db.selectors.cached("ann", [COURSE])
+    finally:
+        admin.close()
+
+
+def test_selector_builds_are_limited_per_connection(server, client, monkeypatch):
+    monkeypatch.setattr(quiz_server, "SELECTOR_BUILDS", 2)
+    repo = client.repository()
+    for user in ("a", "b", "c"):
+        assert len(repo.adaptive_selector(user, [COURSE]).pick(2)) == 2
+    selectors = server.db.selectors
+    assert selectors.cached("a", [COURSE]) and selectors.cached("b", [COURSE])
+    assert not selectors.cached("c", [COURSE]) # Served by the plain sampler instead
+    repo.adaptive_selector("a", [COURSE]).pick(1) # Cached students don't count
+
+    # A new connection has its own allowance, and old builds age out
+    fresh = RemoteDatabase(*server.address)
+    try:
+        fresh.repository().adaptive_selector("c", [COURSE]).pick(1)
+    finally:
+        fresh.close()
+    assert selectors.cached("c", [COURSE])
+
+    monkeypatch.setattr(quiz_server, "SELECTOR_WINDOW", 0.05)
+    time.sleep(0.1)
+    repo.adaptive_selector("d", [COURSE]).pick(1)
+    assert selectors.cached("d", [COURSE])
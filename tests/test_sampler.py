@@ -0,0 +1,98 @@
+import random
+
+import pytest
+
+import sampler
+from migrations import migrate
+from quiz_db import Database, course_id
+from sampler import SMALL_BANK_IDS, sample_question_ids, sample_questions
+
+COURSES = ["Business Law", "Managerial Finance"]
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = Database(str(tmp_path / "quiz.db"), pool_size=0)
+    migrate(db.connection)
+    yield db
+    db.close()
+
+
+def fill(db, count):
+    # count questions in each of COURSES, with ids 1..count; returns their qids.
+    # Written straight to the table: the sampler only reads questions.
+    with db.connection:
+        db.connection.executemany(
+            "INSERT INTO questions (course_id, id, question, option_a, option_b, option_c, option_d, correct_answer) "
+            "VALUES (?, ?, ?, 'a', 'b', 'c', 'd', 'A')",
+            [(course_id(course), i + 1, f"{course} {i}?") for course in COURSES for i in range(count)]
+        )
+    return [row[0] for row in db.connection.execute("SELECT qid FROM questions")]
+
+
+def delete_ids(db, keep):
+    # Delete every question of COURSES except those whose per-course id is in keep
+    with db.connection:
+        db.connection.execute(
+            f"DELETE FROM questions WHERE id NOT IN ({', '.join('?' * len(keep))})", list(keep)
+        )
+    return {row[0] for row in db.connection.execute("SELECT qid FROM questions")}
+
+
+def course_ids():
+    return [course_id(course) for course in COURSES]
+
+
+@pytest.mark.parametrize("count", [50, SMALL_BANK_IDS]) # Id scan, then random probing
+def test_sample_is_distinct_and_capped(db, count):
+    qids = set(fill(db, count))
+    cursor = db.connection.cursor()
+    chosen = sample_question_ids(cursor, course_ids(), 40, random.Random(1))
+    assert len(chosen) == 40 == len(set(chosen))
+    assert set(chosen) <= qids
+
+    everything = sample_question_ids(cursor, course_ids(), 10 * count, random.Random(1))
+    assert sorted(everything) == sorted(qids)
+
+
+@pytest.mark.parametrize("count", [50, SMALL_BANK_IDS])
+def test_deleted_ids_are_never_sampled(db, count):
+    fill(db, count)
+    # Every other id gone, plus the ends of each range
+    live = delete_ids(db, range(2, count, 2))
+    cursor = db.connection.cursor()
+    for seed in range(20):
+        chosen = sample_question_ids(cursor, course_ids(), 30, random.Random(seed))
+        assert len(chosen) == 30 == len(set(chosen))
+        assert set(chosen) <= live
+
+
+def test_sparse_bank_falls_back_to_an_id_scan(db, monkeypatch):
+    fill(db, SMALL_BANK_IDS)
+    live = delete_ids(db, [1, SMALL_BANK_IDS // 2, SMALL_BANK_IDS])
+    scans = []
+    scan = sampler._sample_from_id_scan
+    monkeypatch.setattr(sampler, "_sample_from_id_scan", lambda *args: scans.append(args) or scan(*args))
+
+    chosen = sample_question_ids(db.connection.cursor(), course_ids(), 10, random.Random(3))
+    assert sorted(chosen) == sorted(live)
+    assert len(scans) == 1
+
+
+def test_empty_and_missing_courses(db):
+    fill(db, 5)
+    cursor = db.connection.cursor()
+    assert sample_question_ids(cursor, [], 5) == []
+    assert sample_question_ids(cursor, course_ids(), 0) == []
+    assert sample_question_ids(cursor, [course_id("Business Analytics")], 5) == []
+    assert len(sample_question_ids(cursor, [course_id("Business Analytics"), course_id("Business Law")], 10)) == 5
+
+
+def test_sample_questions_returns_rows_in_sampled_order(db):
+    fill(db, 5)
+    delete_ids(db, [1, 3])
+    rows = sample_questions(db.connection.cursor(), course_ids(), 10, random.Random(2))
+    assert sorted(row[0] for row in rows) == ["Business Law 0?", "Business Law 2?",
+                                              "Managerial Finance 0?", "Managerial Finance 2?"]
+    # qids 1 and 6 are left (id 1 of each course); 2 was deleted and 999 never existed
+    assert [qid for qid, _ in db.repository().fetch_questions_with_ids([6, 2, 999, 1])] == [6, 1]
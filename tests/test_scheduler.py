@@ -0,0 +1,134 @@
+import heapq
+import itertools
+import types
+
+import pytest
+
+import scheduler
+from scheduler import QuizScheduler
+
+
+class FakeTk:
+    # after()/after_cancel() on a fake clock that only moves in advance()
+
+    def __init__(self):
+        self.now = 1000.0
+        self._queue = []
+        self._ids = itertools.count()
+        self._cancelled = set()
+
+    def monotonic(self):
+        return self.now
+
+    def after(self, ms, callback):
+        after_id = next(self._ids)
+        heapq.heappush(self._queue, (self.now + ms / 1000, after_id, callback))
+        return after_id
+
+    def after_cancel(self, after_id):
+        self._cancelled.add(after_id)
+
+    def pending(self):
+        return sum(1 for _, after_id, _ in self._queue if after_id not in self._cancelled)
+
+    def advance(self, seconds):
+        until = self.now + seconds
+        while self._queue and self._queue[0][0] <= until:
+            due, after_id, callback = heapq.heappop(self._queue)
+            if after_id in self._cancelled:
+                continue
+            self.now = max(self.now, due)
+            callback()
+        self.now = until
+
+
+@pytest.fixture
+def tk(monkeypatch):
+    tk = FakeTk()
+    monkeypatch.setattr(scheduler, "time", types.SimpleNamespace(monotonic=tk.monotonic))
+    return tk
+
+
+def test_after_runs_once(tk):
+    sched = QuizScheduler(tk)
+    fired = []
+    sched.after(200, lambda: fired.append(tk.now))
+    tk.advance(0.1)
+    assert fired == []
+    tk.advance(0.5)
+    assert fired == [pytest.approx(1000.2)]
+    assert tk.pending() == 0
+
+
+def test_many_timers_share_one_after(tk):
+    sched = QuizScheduler(tk)
+    fired = []
+    for ms in (300, 100, 200):
+        sched.after(ms, lambda ms=ms: fired.append(ms))
+    assert tk.pending() == 1
+    tk.advance(1)
+    assert fired == [100, 200, 300]
+
+
+def test_every_repeats_until_cancelled(tk):
+    sched = QuizScheduler(tk)
+    runs = []
+    timer = sched.every(100, lambda: runs.append(tk.now))
+    tk.advance(0.35)
+    assert len(runs) == 3
+    sched.cancel(timer)
+    tk.advance(1)
+    assert len(runs) == 3
+    assert tk.pending() == 0
+
+
+def test_countdown_ticks_then_expires(tk):
+    sched = QuizScheduler(tk, frame_ms=50)
+    ticks, expired = [], []
+    sched.countdown(0.5, ticks.append, lambda: expired.append(tk.now))
+    assert ticks == [0.5] # Drawn straight away
+    tk.advance(0.3)
+    assert ticks[-1] == pytest.approx(0.2, abs=0.05)
+    assert expired == []
+    tk.advance(0.3)
+    assert expired == [pytest.approx(1000.5)]
+    assert all(a >= b for a, b in zip(ticks, ticks[1:]))
+
+
+def test_pause_freezes_deadlines(tk):
+    sched = QuizScheduler(tk)
+    fired = []
+    sched.after(200, lambda: fired.append(tk.now))
+    tk.advance(0.1)
+    sched.pause()
+    assert sched.paused and tk.pending() == 0
+    tk.advance(5)
+    assert fired == []
+    sched.resume()
+    tk.advance(0.05)
+    assert fired == []
+    tk.advance(0.1)
+    assert fired == [pytest.approx(1005.2)]
+
+
+def test_cancel_all_drops_pending_timers(tk):
+    sched = QuizScheduler(tk)
+    fired = []
+    sched.after(100, lambda: fired.append(1))
+    sched.every(50, lambda: fired.append(2))
+    sched.pause()
+    sched.cancel_all()
+    assert not sched.paused
+    tk.advance(1)
+    assert fired == []
+    assert tk.pending() == 0
+
+
+def test_cancel_from_a_callback(tk):
+    # Skipping a question cancels the match timer from inside another timer
+    sched = QuizScheduler(tk)
+    fired = []
+    match_timer = sched.after(200, lambda: fired.append("match"))
+    sched.after(100, lambda: sched.cancel(match_timer))
+    tk.advance(1)
+    assert fired == []
@@ -0,0 +1,77 @@
+import pytest
+
+from migrations import migrate
+from quiz_db import Database
+
+
+@pytest.fixture
+def repo(tmp_path):
+    db = Database(str(tmp_path / "quiz.db"), pool_size=0)
+    migrate(db.connection)
+    repo = db.repository()
+    repo.add_question("Business Law", ("What makes a contract void?", "Illegality", "Consideration", "Acceptance", "Offer", "A"))
+    repo.add_question("Business Law", ("Who signs a bond indenture?", "The issuer", "A court", "The buyer", "Nobody", "A"))
+    repo.add_question("Managerial Finance", ("How is bond depreciation of value measured?", "Duration", "Beta", "EPS", "ROE", "A"))
+    repo.add_question("Managerial Finance", ("What is 100% equity financing?", "No_debt", "All debt", "Leases", "Bonds", "A"))
+    repo.add_question("Database Management", ("Which SQL wildcard matches one character?", "%", "_", "*", "?", "B"))
+    yield repo
+    db.close()
+
+
+@pytest.fixture(params=["fts5", "like"])
+def search(request, repo, monkeypatch):
+    # Every test runs against the FTS5 index and against the LIKE fallback
+    if request.param == "like":
+        monkeypatch.setattr(repo, "has_search_index", lambda: False)
+    else:
+        assert repo.has_search_index()
+    return repo.search_questions
+
+
+def test_every_word_must_match_as_a_prefix(search):
+    assert search("depreci bond") == [("Managerial Finance", 1, "How is bond depreciation of value measured?")]
+    assert search("contract void") == [("Business Law", 1, "What makes a contract void?")]
+    assert search("contract bond") == []
+
+
+def test_options_are_searched(search):
+    assert search("illegality") == [("Business Law", 1, "What makes a contract void?")]
+
+
+def test_courses_filter(search):
+    assert {row[0] for row in search("bond")} == {"Business Law", "Managerial Finance"}
+    assert search("bond", courses=["Business Law"]) == [("Business Law", 2, "Who signs a bond indenture?")]
+
+
+def test_limit(search):
+    assert len(search("bond", limit=1)) == 1
+
+
+def test_blank_and_punctuation_are_harmless(search):
+    assert search("") == []
+    assert search("   ") == []
+    assert search('"contract" AND NOT) (*') == []
+
+
+def test_question_text_outranks_options(repo):
+    # bm25 weights the question column above the options
+    repo.add_question("Business Law", ("Pick one", "Is a tort a crime?", "b", "c", "d", "A"))
+    repo.add_question("Business Law", ("When is a tort actionable?", "a", "b", "c", "d", "A"))
+    assert [row[2] for row in repo.search_questions("tort")] == ["When is a tort actionable?", "Pick one"]
+
+
+def test_like_fallback_escapes_wildcards(repo, monkeypatch):
+    monkeypatch.setattr(repo, "has_search_index", lambda: False)
+    assert [row[2] for row in repo.search_questions("100%")] == ["What is 100% equity financing?"]
+    assert [row[2] for row in repo.search_questions("no_debt")] == ["What is 100% equity financing?"]
+    assert [row[2] for row in repo.search_questions("%")] == ["What is 100% equity financing?",
+                                                              "Which SQL wildcard matches one character?"]
+    assert repo.search_questions("n_debt") == []
+
+
+def test_index_follows_edits_and_deletes(repo):
+    repo.update_question("Business Law", 1, ("What makes an agreement voidable?", "Fraud", "Offer", "Acceptance", "Capacity", "A"))
+    assert repo.search_questions("contract") == []
+    assert repo.search_questions("voidable") == [("Business Law", 1, "What makes an agreement voidable?")]
+    repo.delete_question("Business Law", 1)
+    assert repo.search_questions("voidable") == []
@@ -0,0 +1,40 @@
+import pytest
+
+from migrations import migrate
+from quiz_db import Database
+
+COURSE = "Business Law"
+
+
+@pytest.fixture
+def repo(tmp_path):
+    db = Database(str(tmp_path / "quiz.db"), pool_size=0)
+    migrate(db.connection)
+    yield db.repository()
+    db.close()
+
+
+def add(repo, question, options=("Offer", "Acceptance", "Consideration", "Capacity")):
+    return repo.add_question(COURSE, (question, *options, "A"))
+
+
+def test_near_duplicates_are_found_when_adding(repo):
+    original = add(repo, "Which element makes an agreement a legally binding contract?")
+    add(repo, "What is the statute of limitations for a written contract in most states?")
+    matches = repo.find_similar(COURSE, ("Which element makes an agreement a legally binding contract ?",
+                                         "Offer", "Acceptance", "Consideration", "Capacity", "A"))
+    assert [match[0] for match in matches] == [original]
+    assert repo.find_similar(COURSE, ("Which element makes an agreement a legally binding contract?",
+                                      "Offer", "Acceptance", "Consideration", "Capacity", "A"),
+                             exclude_id=original) == []
+
+
+def test_duplicate_groups(repo):
+    pair = [add(repo, "Which element makes an agreement a legally binding contract?"),
+            add(repo, "Which element makes an agreement a legally binding contract ?")]
+    boilerplate = [add(repo, "Read the case study and choose the best answer.") for _ in range(250)]
+    add(repo, "What is the statute of limitations for a written contract in most states?",
+        ("Two years", "Four years", "Six years", "Ten years"))
+
+    groups = repo.find_duplicate_groups(COURSE)
+    assert [[row[0] for row in group] for group in groups] == [boilerplate, pair]